@@ -1,10 +1,30 @@
 # combustion_app/admin.py
 from django.contrib import admin
-from .models import FurnaceRun, Fuel
+from .models import FurnaceRun, Fuel, FuelBlendComponent, ModelCalibration, SimulationJob
+
+class FuelBlendComponentInline(admin.TabularInline):
+    model = FuelBlendComponent
+    fk_name = 'blend'
+    readonly_fields = ('component', 'mass_fraction')
+    can_delete = False
+    extra = 0
+    max_num = 0
 
 class FuelAdmin(admin.ModelAdmin):
-    list_display = ('name', 'hhv_mj_kg', 'cost_per_tonne', 'C', 'H', 'O', 'Ash')
+    list_display = ('name', 'is_blend', 'hhv_mj_kg', 'cost_per_tonne', 'C', 'H', 'O', 'Ash')
+    list_filter = ('is_blend',)
+    inlines = [FuelBlendComponentInline]
+
+class SimulationJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
+
+class ModelCalibrationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'fuel', 'created_at', 'rows', 'rmse_before', 'rmse_after', 'is_active')
+    list_filter = ('fuel', 'is_active')
 
 # Register your models here.
 admin.site.register(Fuel, FuelAdmin)
-admin.site.register(FurnaceRun)
\ No newline at end of file
+admin.site.register(FurnaceRun)
+admin.site.register(ModelCalibration, ModelCalibrationAdmin)
+admin.site.register(SimulationJob, SimulationJobAdmin)
\ No newline at end of file
@@ -0,0 +1,169 @@
+# combustion_app/api.py
+# JSON endpoints for machine clients (e.g. SCADA scoring); no templates, columnar payloads.
+import json
+
+import numpy as np
+from django.db import transaction
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .furnace_model import BATCH_RESULT_KEYS, DEFAULT_FIDELITY, FIDELITIES
+from .runs import INPUT_COLUMNS, UnknownFuelError, bulk_insert_runs, evaluate_points
+from .surrogate import evaluate_points_surrogate
+
+# Largest batch accepted in one request
+MAX_API_POINTS = 200000
+# Rows per INSERT when a batch is persisted
+PERSIST_CHUNK_SIZE = 1000
+
+class APIError(ValueError):
+    """A client error, reported as HTTP 400 with its message."""
+
+
+def column_to_list(values):
+    """Array -> JSON list, with NaN/inf as null (they are not valid JSON)."""
+    values = np.asarray(values)
+    finite = np.isfinite(values)
+    if finite.all():
+        return values.tolist()
+    return [value if ok else None for value, ok in zip(values.tolist(), finite.tolist())]
+
+
+def parse_points(payload):
+    """
+    Accepts operating points either as columns
+        {"points": {"fuel_id": [...], "moisture_percent": [...], ...}}
+    or as rows
+        {"points": [{"fuel_id": 1, "moisture_percent": 10, ...}, ...]}
+    A top-level "fuel_id" applies to every point without one; a missing load is 1.0.
+    Returns (fuel_ids, inputs) as equal-length arrays.
+    """
+    points = payload.get('points')
+    if isinstance(points, list):
+        if not all(isinstance(row, dict) for row in points):
+            raise APIError("Every point in a list of rows must be an object.")
+        # Rows may omit the load or (with a top-level default) the fuel; anything else they must all have
+        defaults = {'furnace_load_gj_hour': 1.0}
+        if 'fuel_id' in payload:
+            defaults['fuel_id'] = payload['fuel_id']
+        columns = {}
+        for name in ('fuel_id',) + INPUT_COLUMNS:
+            if not any(name in row for row in points):
+                continue
+            if name not in defaults and not all(name in row for row in points):
+                raise APIError(f"Every point must have '{name}'.")
+            columns[name] = [row.get(name, defaults.get(name)) for row in points]
+    elif isinstance(points, dict):
+        columns = dict(points)
+    else:
+        raise APIError("'points' must be an object of columns or a list of rows.")
+
+    if 'fuel_id' not in columns and 'fuel_id' in payload:
+        columns['fuel_id'] = payload['fuel_id']
+    columns.setdefault('furnace_load_gj_hour', 1.0)
+
+    missing = [name for name in ('fuel_id',) + INPUT_COLUMNS if name not in columns]
+    if missing:
+        raise APIError("Missing column(s): " + ", ".join(missing) + ".")
+
+    try:
+        float_ids = np.asarray(columns['fuel_id'], dtype=float)
+        fuel_ids = float_ids.astype(np.int64)
+        inputs = [np.asarray(columns[name], dtype=float) for name in INPUT_COLUMNS]
+        arrays = np.broadcast_arrays(fuel_ids, *inputs)
+    except (TypeError, ValueError, OverflowError):
+        raise APIError("Columns must be numbers (or lists of numbers) of the same length.")
+    # Casting would silently truncate 3.7 to fuel 3 (and nan/inf to garbage)
+    if not np.array_equal(fuel_ids, float_ids):
+        raise APIError("'fuel_id' values must be whole numbers.")
+
+    if arrays[0].ndim != 1:
+        arrays = [np.atleast_1d(array).ravel() for array in arrays]
+    if len(arrays[0]) > MAX_API_POINTS:
+        raise APIError(f"At most {MAX_API_POINTS} points per request.")
+    return arrays[0], dict(zip(INPUT_COLUMNS, arrays[1:]))
+
+
+def persist_runs(name, fuel_ids, inputs, results):
+    """Stores each point as a FurnaceRun with its results: one INSERT per chunk, not two writes per row."""
+    created = 0
+    with transaction.atomic():
+        for start in range(0, len(fuel_ids), PERSIST_CHUNK_SIZE):
+            chunk = slice(start, start + PERSIST_CHUNK_SIZE)
+            created += bulk_insert_runs(
+                fuel_ids[chunk],
+                {key: values[chunk] for key, values in inputs.items()},
+                {key: values[chunk] for key, values in results.items()},
+                name,
+            )
+    return created
+
+
+@csrf_exempt
+@require_POST
+def simulate_api(request):
+    """
+    POST a batch of operating points, get columnar results back.
+
+    Request:  {"points": {...columns...} or [...rows...], "fuel_id": optional default,
+               "outputs": optional list of result names, "persist": false, "name": "API Run",
+               "surrogate": false, "fidelity": "constant_cp" or "variable_cp"}
+    Response: {"count": n, "results": {"efficiency": [...], ...}, "persisted": 0}
+
+    With "surrogate": true, results are interpolated from the fuels' lookup tables (surrogate.py)
+    and the response adds "error_bounds" (largest error per output) and "exact_points".
+    "persist" cannot be combined with "surrogate" or a non-default "fidelity".
+    """
+    try:
+        payload = json.loads(request.body)
+        if not isinstance(payload, dict):
+            raise APIError("The request body must be a JSON object.")
+        fuel_ids, inputs = parse_points(payload)
+
+        outputs = payload.get('outputs') or list(BATCH_RESULT_KEYS)
+        if not isinstance(outputs, list) or not all(isinstance(name, str) for name in outputs):
+            raise APIError("'outputs' must be a list of result names.")
+        unknown = [name for name in outputs if name not in BATCH_RESULT_KEYS]
+        if unknown:
+            raise APIError("Unknown output(s): " + ", ".join(unknown) + ".")
+
+        persist = payload.get('persist', False)
+        if not isinstance(persist, bool):
+            raise APIError("'persist' must be true or false.")
+
+        fidelity = payload.get('fidelity') or DEFAULT_FIDELITY
+        if fidelity not in FIDELITIES:
+            raise APIError("'fidelity' must be one of: " + ", ".join(FIDELITIES) + ".")
+        # FurnaceRun has no record of how its results were computed, so only
+        # exact, default-fidelity results may be stored next to the others
+        if persist and (payload.get('surrogate') or fidelity != DEFAULT_FIDELITY):
+            raise APIError(f"'persist' is only supported for exact results at the default fidelity "
+                           f"('{DEFAULT_FIDELITY}', no surrogate).")
+
+        surrogate = None
+        if payload.get('surrogate'):
+            results, error_bounds, exact_points = evaluate_points_surrogate(fuel_ids, inputs, fidelity=fidelity)
+            surrogate = {
+                'error_bounds': {name: error_bounds[name] for name in outputs},
+                'exact_points': exact_points,
+            }
+        else:
+            results = evaluate_points(fuel_ids, inputs, fidelity=fidelity)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        return JsonResponse({'error': f"Invalid JSON: {e}"}, status=400)
+    except (APIError, UnknownFuelError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    persisted = 0
+    if persist:
+        persisted = persist_runs(payload.get('name') or 'API Run', fuel_ids, inputs, results)
+
+    response = {
+        'count': len(fuel_ids),
+        'results': {name: column_to_list(results[name]) for name in outputs},
+        'persisted': persisted,
+    }
+    if surrogate is not None:
+        response.update(surrogate)
+    return JsonResponse(response)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CombustionAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'combustion_app'
+
+    def ready(self):
+        # Connect signal handlers (cache invalidation on Fuel edits)
+        from . import signals  # noqa: F401
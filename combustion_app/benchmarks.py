@@ -0,0 +1,376 @@
+# combustion_app/benchmarks.py
+# Reproducible performance benchmarks, run by the `run_benchmarks` management command.
+import datetime
+import io
+import json
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+
+import django
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+
+from . import urls as app_urls
+from .cache import get_result_cache
+from .calibration import fit_model_parameters
+from .furnace_model import run_combustion_model, run_combustion_model_batch
+from .ingest import run_validation_stream
+from .telemetry import replay_telemetry
+from .models import Fuel, FurnaceRun, ModelCalibration, SimulationJob
+from .runs import bulk_insert_runs, evaluate_points
+from .sensitivity import SENSITIVITY_FACTORS
+from .surrogate import SurrogateStore
+from .sweeps import run_adaptive_sweep, run_parametric_sweep
+
+DEFAULT_DATASET_RUNS = 20000
+DEFAULT_SEED = 12345
+# A result more than this fraction worse than the baseline counts as a regression
+DEFAULT_THRESHOLD = 0.2
+
+SWEEP_SIZES = [50, 5000, 500000]
+QUICK_SWEEP_SIZES = [50, 5000]
+
+
+# --- Dataset ---
+
+def generate_dataset(n_runs=DEFAULT_DATASET_RUNS, seed=DEFAULT_SEED):
+    """
+    Fills the (empty, freshly migrated) database with `n_runs` runs spread over two years,
+    one finished job and one (inactive) calibration, all from a fixed seed so every
+    benchmark run sees the same data.
+    """
+    rng = np.random.default_rng(seed)
+    fuel_ids = np.array(sorted(Fuel.objects.values_list('id', flat=True)))
+    start = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+    for offset in range(0, n_runs, 5000):
+        n = min(5000, n_runs - offset)
+        point_fuels = rng.choice(fuel_ids, n)
+        inputs = {
+            'moisture_percent': rng.uniform(5, 40, n),
+            'excess_air_percent': rng.uniform(10, 150, n),
+            'furnace_load_gj_hour': rng.uniform(0.5, 5, n),
+        }
+        minutes = rng.integers(0, 2 * 365 * 24 * 60, n)
+        run_dates = [start + datetime.timedelta(minutes=int(m)) for m in minutes]
+        results = evaluate_points(point_fuels, inputs)
+        bulk_insert_runs(point_fuels, inputs, results, "Benchmark Run", run_dates)
+
+    fuel = Fuel.objects.get(id=fuel_ids[0])
+    SimulationJob.objects.create(
+        kind=SimulationJob.KIND_ANALYSIS,
+        status=SimulationJob.STATUS_SUCCEEDED,
+        params={'fuel_id': fuel.id, 'variable_to_sweep': 'excess_air_percent', 'start_value': 10,
+                'end_value': 100, 'steps': 50, 'constant_moisture': 10, 'constant_excess_air': 40,
+                'constant_load': 1},
+        result={'chart_data': run_parametric_sweep(fuel, 'excess_air_percent', 10, 100, 50, 10, 40, 1)},
+        progress=1.0,
+        started_at=timezone.now(),
+        finished_at=timezone.now(),
+    )
+    ModelCalibration.objects.create(fuel=fuel, name="Benchmark Calibration", parameters={},
+                                    moisture_percent=10, furnace_load_gj_hour=1)
+
+
+def validation_csv(size_mb, seed=DEFAULT_SEED):
+    """A validation upload of about `size_mb` MB (excess_air, measured_efficiency)."""
+    rng = np.random.default_rng(seed)
+    n = int(size_mb * 1024 * 1024 / 14)
+    excess_air = rng.uniform(10, 150, n)
+    efficiency = rng.uniform(60, 85, n)
+    lines = ["excess_air,measured_efficiency"]
+    lines += [f"{x:.2f},{y:.2f}" for x, y in zip(excess_air.tolist(), efficiency.tolist())]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def telemetry_csv(rows, seed=DEFAULT_SEED):
+    """A historian export of `rows` one-second samples (timestamp, inputs, measured_efficiency)."""
+    rng = np.random.default_rng(seed)
+    timestamps = 1704067200 + np.arange(rows)
+    drift = np.sin(np.arange(rows) / 3600.0)
+    moisture = 12 + 3 * drift + rng.normal(0, 0.5, rows)
+    excess_air = 45 + 20 * drift + rng.normal(0, 4, rows)
+    load = 1 + 0.2 * drift
+    efficiency = rng.uniform(60, 85, rows)
+    lines = ["timestamp,moisture_percent,excess_air_percent,furnace_load_gj_hour,measured_efficiency"]
+    lines += [f"{t},{m:.2f},{x:.2f},{l:.3f},{y:.2f}" for t, m, x, l, y in zip(
+        timestamps.tolist(), moisture.tolist(), excess_air.tolist(), load.tolist(), efficiency.tolist())]
+    return ("\n".join(lines) + "\n").encode()
+
+
+# --- Timing ---
+
+def time_call(func, repeat=5, number=1):
+    """Median seconds per call of `func` over `repeat` rounds of `number` calls."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return statistics.median(timings)
+
+
+def _result(value, unit, better='lower'):
+    return {'value': value, 'unit': unit, 'better': better}
+
+
+def bench_model(results, quick=False):
+    fuel = Fuel.objects.order_by('id').first()
+    results['model.scalar_per_point'] = _result(
+        time_call(lambda: run_combustion_model(fuel, 10.0, 40.0, 1.0), number=200) * 1e6, 'us'
+    )
+    n = 10000 if quick else 1000000
+    rng = np.random.default_rng(DEFAULT_SEED)
+    moisture, excess_air = rng.uniform(5, 40, n), rng.uniform(10, 150, n)
+    seconds = time_call(lambda: run_combustion_model_batch(fuel, moisture, excess_air, 1.0), repeat=3)
+    results['model.batch_per_point'] = _result(seconds / n * 1e9, 'ns')
+    seconds = time_call(lambda: run_combustion_model_batch(fuel, moisture, excess_air, 1.0, fidelity='variable_cp'),
+                        repeat=3)
+    results['model.batch_per_point_variable_cp'] = _result(seconds / n * 1e9, 'ns')
+
+
+def bench_sweeps(results, quick=False):
+    fuel = Fuel.objects.order_by('id').first()
+    cache = get_result_cache()
+    for steps in (QUICK_SWEEP_SIZES if quick else SWEEP_SIZES):
+        def sweep():
+            # Cold cache: measure the model, not the memo
+            cache.clear()
+            run_parametric_sweep(fuel, 'excess_air_percent', 10, 150, steps, 10, 40, 1)
+        seconds = time_call(sweep, repeat=3)
+        results[f'sweep.{steps}_points'] = _result(steps / seconds, 'points/s', better='higher')
+
+    # Adaptive sampling of the CO knee at low excess air: evaluations needed for the default tolerance
+    cache.clear()
+    adaptive = run_adaptive_sweep(fuel, 'excess_air_percent', 0, 200, 10, 10, 40, 1)
+    results['sweep.adaptive_evaluations'] = _result(adaptive['evaluations'], 'points')
+
+
+def bench_validation(results, quick=False):
+    fuel = Fuel.objects.order_by('id').first()
+    data = validation_csv(1 if quick else 10)
+    size_mb = len(data) / (1024 * 1024)
+    seconds = time_call(lambda: run_validation_stream(fuel, 10, 1, io.TextIOWrapper(io.BytesIO(data), newline='')),
+                        repeat=3)
+    results['validation.throughput'] = _result(size_mb / seconds, 'MB/s', better='higher')
+
+
+def bench_telemetry(results, quick=False):
+    fuel = Fuel.objects.order_by('id').first()
+    rows = 20000 if quick else 200000
+    data = telemetry_csv(rows)
+    seconds = time_call(lambda: replay_telemetry(fuel, io.TextIOWrapper(io.BytesIO(data), newline='')), repeat=3)
+    results['telemetry.throughput'] = _result(rows / seconds, 'rows/s', better='higher')
+
+
+def bench_calibration(results, quick=False):
+    fuel = Fuel.objects.order_by('id').first()
+    n = 10000 if quick else 100000
+    rng = np.random.default_rng(DEFAULT_SEED)
+    excess_air = rng.uniform(10, 150, n)
+    measured = run_combustion_model_batch(fuel, 10, excess_air, 1)['efficiency'] * 0.95 + rng.normal(0, 0.5, n)
+    seconds = time_call(lambda: fit_model_parameters(fuel, excess_air, measured, 10, 1,
+                                                     ['q_loss_fraction', 't_exhaust_k']), repeat=3)
+    results[f'calibration.fit_{n}_rows'] = _result(seconds, 's')
+
+
+def bench_surrogate(results, quick=False):
+    fuel = Fuel.objects.order_by('id').first()
+    directory = tempfile.mkdtemp()
+    try:
+        store = SurrogateStore(directory)
+        results['surrogate.build'] = _result(time_call(lambda: store.build(fuel), repeat=1 if quick else 3), 's')
+        store.table(fuel)
+        results['surrogate.single_point'] = _result(
+            time_call(lambda: store.evaluate(fuel, 10.0, 40.0, 1.0), number=200) * 1e6, 'us'
+        )
+        n = 10000 if quick else 1000000
+        rng = np.random.default_rng(DEFAULT_SEED)
+        moisture, excess_air = rng.uniform(5, 40, n), rng.uniform(10, 150, n)
+        seconds = time_call(lambda: store.evaluate(fuel, moisture, excess_air, 1.0), repeat=3)
+        results['surrogate.batch_per_point'] = _result(seconds / n * 1e9, 'ns')
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def request_specs():
+    """
+    (method, kwargs, data) for each named URL in combustion_app/urls.py.
+    Compute pages are POSTed with typical inputs so their latency includes the work.
+    """
+    fuel = Fuel.objects.order_by('id').first()
+    fuels = list(Fuel.objects.values_list('id', flat=True))
+    run_ids = list(FurnaceRun.objects.order_by('-run_date').values_list('id', flat=True)[:200])
+    job = SimulationJob.objects.filter(status=SimulationJob.STATUS_SUCCEEDED).first()
+    calibration = ModelCalibration.objects.first()
+    sweep = {
+        'fuel': fuel.id, 'variable_to_sweep': 'excess_air_percent', 'start_value': 10, 'end_value': 100,
+        'steps': 50, 'constant_moisture': 10, 'constant_excess_air': 40, 'constant_load': 1,
+    }
+
+    def validation():
+        return {'fuel': fuel.id, 'constant_moisture': 10, 'constant_load': 1,
+                'validation_file': _upload(validation_csv(0.1))}
+
+    return {
+        'simulation_input': ('get', {}, None),
+        'simulation_results': ('get', {'run_id': run_ids[0]}, None),
+        'analysis_view': ('post', {}, sweep),
+        'analysis_stream': ('post', {}, sweep),
+        'grid_analysis_view': ('post', {}, {
+            'fuel': fuel.id, 'moisture_start': 5, 'moisture_end': 50, 'moisture_steps': 100,
+            'excess_air_start': 10, 'excess_air_end': 200, 'excess_air_steps': 100, 'loads': '1, 2',
+        }),
+        'compare_view': ('get', {}, {'run_ids': run_ids}),
+        'validation_view': ('post', {}, validation),
+        'validation_stream': ('post', {}, validation),
+        'telemetry_view': ('post', {}, lambda: {
+            'fuel': fuel.id, 'window_seconds': 900, 'telemetry_file': _upload(telemetry_csv(20000)),
+        }),
+        'calibration_view': ('get', {}, None),
+        # Deactivating the (inactive) benchmark calibration: a write that changes nothing
+        'calibration_activate': ('post', {'calibration_id': calibration.id}, {'active': '0'}),
+        'history_view': ('get', {}, {'fuel': fuel.id}),
+        'import_runs_view': ('get', {}, None),
+        'export_runs': ('get', {}, {'format': 'columnar', 'fuel': fuel.id, 'start_date': '2024-01-01',
+                                    'end_date': '2024-03-31'}),
+        'uncertainty_view': ('post', {}, {
+            'fuel': fuel.id, 'moisture': 10, 'excess_air': 40, 'load': 1, 'n_samples': 10000,
+            'distribution': 'normal', 'composition_spread': 5, 'hhv_spread': 3, 'cost_spread': 10,
+            'moisture_spread': 2, 'excess_air_spread': 5,
+        }),
+        'sensitivity_view': ('post', {}, {
+            'fuel': fuel.id, 'method': 'sobol', 'n_evaluations': 100000, 'factors': list(SENSITIVITY_FACTORS),
+            'moisture_min': 5, 'moisture_max': 30, 'excess_air_min': 10, 'excess_air_max': 100, 'load': 1,
+            'composition_spread': 10, 'hhv_spread': 5, 'cost_spread': 20,
+        }),
+        'optimize_view': ('post', {}, {
+            'objective': 'min_cost', 'moisture': 10, 'load': 1, 'co_limit': 100, 'nox_limit': 20,
+            'excess_air_min': 0, 'excess_air_max': 200,
+        }),
+        'pareto_view': ('post', {}, {
+            'fuels': fuels, 'objectives': ['cost_per_gj', 'emissions_nox_ppm'], 'moisture_start': 5,
+            'moisture_end': 40, 'excess_air_start': 0, 'excess_air_end': 200, 'steps': 100,
+        }),
+        'blends_view': ('get', {}, None),
+        'blend_optimizer_view': ('post', {}, {
+            'fuels': fuels[:3], 'moisture': 10, 'load': 1, 'co_limit': 100, 'nox_limit': 20,
+            'excess_air_min': 0, 'excess_air_max': 200, 'divisions': 20,
+        }),
+        'cache_stats': ('get', {}, None),
+        'timing_stats': ('get', {}, None),
+        'job_detail': ('get', {'job_id': job.id}, None),
+        'job_status': ('get', {'job_id': job.id}, None),
+        'job_result': ('get', {'job_id': job.id}, None),
+        'simulate_api': ('json', {}, {
+            'points': {'fuel_id': [fuels[i % len(fuels)] for i in range(1000)],
+                       'moisture_percent': 10, 'excess_air_percent': list(np.linspace(10, 150, 1000))},
+        }),
+    }
+
+
+async def _drain(response):
+    # Server-sent event views stream from async generators
+    async for _ in response.streaming_content:
+        pass
+
+
+def _upload(data):
+    return SimpleUploadedFile('validation.csv', data, content_type='text/csv')
+
+
+def bench_requests(results, quick=False):
+    """Median and 95th percentile latency for every named URL; unknown URLs are reported as skipped."""
+    specs = request_specs()
+    client = Client()
+    cache = get_result_cache()
+    repeat = 3 if quick else 15
+    skipped = []
+
+    for pattern in get_resolver(app_urls).url_patterns:
+        name = pattern.name
+        if name not in specs:
+            skipped.append(name)
+            continue
+        method, kwargs, data = specs[name]
+        url = reverse(name, kwargs=kwargs)
+
+        timings = []
+        for i in range(repeat + 1):
+            payload = data() if callable(data) else data
+            # Cold result cache, so compute pages are timed with their model work
+            cache.clear()
+            start = time.perf_counter()
+            if method == 'json':
+                response = client.post(url, json.dumps(payload), content_type='application/json')
+            else:
+                response = getattr(client, method)(url, payload or {})
+            if response.streaming and response.is_async:
+                async_to_sync(_drain)(response)
+            elif response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name} returned HTTP {response.status_code}")
+            if i:  # the first request warms imports and database pages
+                timings.append(elapsed)
+
+        results[f'request.{name}.median'] = _result(statistics.median(timings) * 1000, 'ms')
+        results[f'request.{name}.p95'] = _result(float(np.percentile(timings, 95)) * 1000, 'ms')
+    return skipped
+
+
+BENCHMARKS = [bench_model, bench_sweeps, bench_validation, bench_telemetry, bench_calibration, bench_surrogate, bench_requests]
+
+
+def run_benchmarks(quick=False, progress=None):
+    """Runs every benchmark against the current database and returns a JSON-serializable report."""
+    results = {}
+    skipped = []
+    for bench in BENCHMARKS:
+        if progress:
+            progress(bench.__name__)
+        skipped += bench(results, quick=quick) or []
+
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'quick': quick,
+            'dataset_runs': FurnaceRun.objects.count(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+        'skipped_urls': skipped,
+    }
+
+
+def compare_to_baseline(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares each result with the same key in `baseline`.
+    Returns rows of (key, baseline value, current value, relative change, status), where the
+    change is positive when the result got worse and status is 'regression', 'improved' or 'ok'.
+    """
+    rows = []
+    for key, current in sorted(report['results'].items()):
+        previous = baseline.get('results', {}).get(key)
+        if previous is None or not previous['value']:
+            rows.append((key, None, current['value'], None, 'new'))
+            continue
+        change = (current['value'] - previous['value']) / previous['value']
+        if current['better'] == 'higher':
+            change = -change
+        status = 'regression' if change > threshold else 'improved' if change < -threshold else 'ok'
+        rows.append((key, previous['value'], current['value'], change, status))
+    return rows
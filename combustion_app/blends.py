@@ -0,0 +1,150 @@
+# combustion_app/blends.py
+# Fuel blends: properties mass-weighted from component fuels, and a blend-ratio optimizer.
+import math
+from itertools import combinations
+
+import numpy as np
+from django.db import transaction
+
+from .furnace_model import PROFILE_FIELDS, FuelProfile, compile_fuel_profile
+from .models import Fuel, FuelBlendComponent
+from .optimize import OPTIMUM_OUTPUTS, search_excess_air
+
+MAX_BLEND_COMPONENTS = 5
+# Most candidate blends evaluated by one optimization
+MAX_CANDIDATES = 20000
+TOP_BLENDS = 10
+# Most candidates sent to the cost / NOx scatter chart
+MAX_CLOUD_POINTS = 5000
+
+
+class BlendError(ValueError):
+    """Raised for an invalid blend (too few components, negative fractions, blends of blends)."""
+
+
+def property_matrix(fuels):
+    """(fuels, PROFILE_FIELDS) array of each fuel's composition, HHV and cost."""
+    profiles = [compile_fuel_profile(fuel) for fuel in fuels]
+    return np.array([[getattr(profile, name) for name in PROFILE_FIELDS] for profile in profiles], dtype=float)
+
+
+def blend_properties(fuels, fractions):
+    """
+    {property: value} of a blend of `fuels` in the given mass fractions (summing to 1).
+    Ultimate analysis, HHV and cost per tonne all mix linearly by mass. `fractions` may
+    also be a (candidates, fuels) array, giving one value per candidate blend.
+    """
+    values = np.asarray(fractions, dtype=float) @ property_matrix(fuels)
+    return {name: values[..., i] for i, name in enumerate(PROFILE_FIELDS)}
+
+
+def normalize_fractions(fuels, fractions):
+    """Checks a blend recipe and returns its fractions scaled to sum to 1 (zeros dropped)."""
+    pairs = [(fuel, float(fraction)) for fuel, fraction in zip(fuels, fractions) if fraction]
+    if any(fraction < 0 for _, fraction in pairs):
+        raise BlendError("Blend fractions cannot be negative.")
+    if len(pairs) < 2:
+        raise BlendError("A blend needs at least two component fuels.")
+    if len(pairs) > MAX_BLEND_COMPONENTS:
+        raise BlendError(f"A blend can have at most {MAX_BLEND_COMPONENTS} component fuels.")
+    if any(fuel.is_blend for fuel, _ in pairs):
+        raise BlendError("Blends can only be made from single fuels.")
+    if len({fuel.pk for fuel, _ in pairs}) < len(pairs):
+        raise BlendError("Each fuel can appear in a blend only once.")
+    total = sum(fraction for _, fraction in pairs)
+    return [fuel for fuel, _ in pairs], [fraction / total for _, fraction in pairs]
+
+
+def create_blend(name, fuels, fractions):
+    """Stores a blend as a Fuel (usable anywhere a fuel is) with its component rows."""
+    fuels, fractions = normalize_fractions(fuels, fractions)
+    properties = {key: float(value) for key, value in blend_properties(fuels, fractions).items()}
+    with transaction.atomic():
+        blend = Fuel.objects.create(name=name, is_blend=True, **properties)
+        FuelBlendComponent.objects.bulk_create([
+            FuelBlendComponent(blend=blend, component_id=fuel.pk, mass_fraction=fraction)
+            for fuel, fraction in zip(fuels, fractions)
+        ])
+    return blend
+
+
+def refresh_blends_containing(fuel):
+    """Re-weights every blend made from `fuel`, after the fuel itself was edited."""
+    blends = Fuel.objects.filter(blend_components__component=fuel).distinct()
+    for blend in blends:
+        components = list(blend.blend_components.select_related('component'))
+        properties = blend_properties([c.component for c in components], [c.mass_fraction for c in components])
+        for key, value in properties.items():
+            setattr(blend, key, float(value))
+        blend.save(update_fields=list(PROFILE_FIELDS))
+
+
+def simplex_grid(n_fuels, divisions):
+    """
+    Every blend of n_fuels whose fractions are multiples of 1 / divisions (the pure fuels included):
+    a (comb(divisions + n_fuels - 1, n_fuels - 1), n_fuels) array whose rows sum to 1.
+    """
+    # Stars and bars: choosing n_fuels - 1 bar positions among divisions + n_fuels - 1 slots
+    bars = np.array(list(combinations(range(divisions + n_fuels - 1), n_fuels - 1)), dtype=float)
+    bars = bars.reshape(-1, n_fuels - 1)
+    edges = np.hstack([np.full((len(bars), 1), -1.0), bars, np.full((len(bars), 1), divisions + n_fuels - 1.0)])
+    return (np.diff(edges, axis=1) - 1.0) / divisions
+
+
+def candidate_count(n_fuels, divisions):
+    return math.comb(divisions + n_fuels - 1, n_fuels - 1)
+
+
+def optimize_blend(fuels, moisture_percent, furnace_load_gj_hour, divisions=20, co_limit_ppm=None,
+                   nox_limit_ppm=None, excess_air_min=0.0, excess_air_max=200.0, top=TOP_BLENDS):
+    """
+    Lowest-cost (₹/GJ) blend of `fuels` under the CO and NOx limits.
+
+    Every blend on the simplex grid (fractions in steps of 1 / divisions) becomes one row of an
+    array-valued FuelProfile, and the batched excess air search (optimize.search_excess_air)
+    finds each row's cheapest feasible operating point in the same vectorized calls.
+    Returns the `top` blends by cost plus feasible candidates' cost and NOx for plotting.
+    """
+    fuels = list(fuels)
+    if len(fuels) < 2:
+        raise BlendError("Choose at least two fuels to blend.")
+    if candidate_count(len(fuels), divisions) > MAX_CANDIDATES:
+        raise BlendError(f"Too many candidate blends; use fewer fuels or coarser steps "
+                         f"(at most {MAX_CANDIDATES} candidates).")
+
+    fractions = simplex_grid(len(fuels), divisions)
+    properties = blend_properties(fuels, fractions)
+    profile = FuelProfile(None, 'blend candidates', *(properties[name][:, None] for name in PROFILE_FIELDS))
+    feasible, best_x, final, evaluations = search_excess_air(
+        profile, len(fractions), moisture_percent, furnace_load_gj_hour, 'min_cost',
+        co_limit_ppm=co_limit_ppm, nox_limit_ppm=nox_limit_ppm,
+        excess_air_min=excess_air_min, excess_air_max=excess_air_max,
+    )
+
+    cost = final['cost_per_gj'][:, 0]
+    order = np.flatnonzero(feasible)[np.argsort(cost[feasible], kind='stable')]
+    blends = []
+    for i in order[:top]:
+        row = {
+            'fractions': [float(value) for value in fractions[i]],
+            'excess_air_percent': float(best_x[i]),
+        }
+        for key in OPTIMUM_OUTPUTS:
+            row[key] = float(final[key][i, 0])
+        blends.append(row)
+
+    cloud = np.flatnonzero(feasible)
+    if len(cloud) > MAX_CLOUD_POINTS:
+        cloud = np.sort(np.random.default_rng(0).choice(cloud, MAX_CLOUD_POINTS, replace=False))
+
+    return {
+        'fuels': [{'fuel_id': fuel.pk, 'fuel_name': fuel.name} for fuel in fuels],
+        'candidates': len(fractions),
+        'feasible_candidates': int(feasible.sum()),
+        'evaluations': evaluations,
+        'blends': blends,
+        'cloud': {
+            'cost_per_gj': cost[cloud].tolist(),
+            'emissions_nox_ppm': final['emissions_nox_ppm'][cloud, 0].tolist(),
+        },
+    }
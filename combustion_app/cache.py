@@ -0,0 +1,208 @@
+# combustion_app/cache.py
+import hashlib
+import math
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+from .furnace_model import DEFAULT_FIDELITY, run_combustion_model, run_combustion_model_batch
+
+# Defaults, overridable with settings.COMBUSTION_RESULT_CACHE
+DEFAULT_MAX_ENTRIES = 4096
+# Batches larger than this (in points) are not worth keeping in the cache
+DEFAULT_MAX_BATCH_POINTS = 250000
+# Points held by the local cache in total (a point is one float64 per result key, ~72 bytes),
+# so a few large batches cannot grow it to gigabytes the way MAX_ENTRIES alone would allow
+DEFAULT_MAX_POINTS = 1000000
+
+
+def fuel_fingerprint(fuel):
+    """Everything about a fuel that changes the model's answer, calibrated parameters included."""
+    return (fuel.C, fuel.H, fuel.O, fuel.N, fuel.S, fuel.Ash, fuel.hhv_mj_kg, fuel.cost_per_tonne,
+            getattr(fuel, 'model_params', None))
+
+
+class ResultCache:
+    """
+    LRU cache of combustion model results, bounded by entry count and by the points
+    stored (a single-point result counts as one, a batch as its size).
+
+    Entries are keyed on the fuel's id, composition, HHV and cost plus the operating
+    inputs. By default entries live in this process; when `alias` names a Django cache
+    (e.g. a shared Redis or file cache), it is used as the backend instead.
+    Each fuel has a version number that is bumped when the fuel is edited, which
+    makes all of its existing entries unreachable.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, alias=None, timeout=None,
+                 max_batch_points=DEFAULT_MAX_BATCH_POINTS, max_points=DEFAULT_MAX_POINTS):
+        self.max_entries = max_entries
+        self.alias = alias
+        self.timeout = timeout
+        self.max_batch_points = max_batch_points
+        self.max_points = max_points
+        # key -> (value, points)
+        self._entries = OrderedDict()
+        self._points = 0
+        self._fuel_versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Backend ---
+
+    @property
+    def backend(self):
+        if self.alias is None:
+            return None
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def _fuel_version(self, fuel_id):
+        backend = self.backend
+        if backend is None:
+            return self._fuel_versions.get(fuel_id, 0)
+        return backend.get(f'combustion:fuel-version:{fuel_id}', 0)
+
+    def _backend_key(self, key):
+        digest = hashlib.blake2b(pickle.dumps(key), digest_size=20).hexdigest()
+        return f'combustion:result:{digest}'
+
+    # --- Public API ---
+
+    def make_key(self, fuel, kind, inputs):
+        return (fuel.pk, self._fuel_version(fuel.pk), fuel_fingerprint(fuel), kind, inputs)
+
+    def get(self, key):
+        backend = self.backend
+        if backend is not None:
+            value = backend.get(self._backend_key(key))
+        else:
+            with self._lock:
+                value, _ = self._entries.get(key, (None, 0))
+                if value is not None:
+                    self._entries.move_to_end(key)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, points=1):
+        backend = self.backend
+        if backend is not None:
+            backend.set(self._backend_key(key), value, self.timeout)
+            return
+        if points > self.max_points:
+            return
+
+        with self._lock:
+            _, replaced = self._entries.pop(key, (None, 0))
+            self._entries[key] = (value, points)
+            self._points += points - replaced
+            while len(self._entries) > self.max_entries or self._points > self.max_points:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._points -= evicted
+                self.evictions += 1
+
+    def invalidate_fuel(self, fuel_id):
+        """Drops every entry for a fuel (called when the fuel is saved or deleted)."""
+        backend = self.backend
+        if backend is not None:
+            version_key = f'combustion:fuel-version:{fuel_id}'
+            backend.add(version_key, 0, None)
+            backend.incr(version_key)
+            return
+
+        with self._lock:
+            self._fuel_versions[fuel_id] = self._fuel_versions.get(fuel_id, 0) + 1
+            stale = [key for key in self._entries if key[0] == fuel_id]
+            for key in stale:
+                self._points -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._points = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.alias or 'local',
+                'entries': len(self._entries) if self.alias is None else None,
+                'max_entries': self.max_entries,
+                'points': self._points if self.alias is None else None,
+                'max_points': self.max_points,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else None,
+            }
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    """Returns the process-wide result cache, configured from settings on first use."""
+    global _result_cache
+    if _result_cache is None:
+        config = getattr(settings, 'COMBUSTION_RESULT_CACHE', {})
+        _result_cache = ResultCache(
+            max_entries=config.get('MAX_ENTRIES', DEFAULT_MAX_ENTRIES),
+            alias=config.get('ALIAS'),
+            timeout=config.get('TIMEOUT'),
+            max_batch_points=config.get('MAX_BATCH_POINTS', DEFAULT_MAX_BATCH_POINTS),
+            max_points=config.get('MAX_POINTS', DEFAULT_MAX_POINTS),
+        )
+    return _result_cache
+
+
+def cached_combustion_model(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour=1.0):
+    """run_combustion_model with memoization. Callers must not mutate the returned dict."""
+    cache = get_result_cache()
+    key = cache.make_key(fuel, 'point', (
+        float(moisture_percent), float(excess_air_percent), float(furnace_load_gj_hour)
+    ))
+    results = cache.get(key)
+    if results is None:
+        results = run_combustion_model(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour)
+        cache.set(key, results)
+    return results
+
+
+def cached_combustion_model_batch(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour=1.0,
+                                  fidelity=DEFAULT_FIDELITY):
+    """
+    run_combustion_model_batch with memoization of whole batches (e.g. a repeated sweep).
+    Returned arrays are read-only since they may be shared between callers.
+    """
+    cache = get_result_cache()
+    inputs = [np.asarray(value, dtype=float) for value in
+              (moisture_percent, excess_air_percent, furnace_load_gj_hour)]
+    shape = np.broadcast_shapes(*(value.shape for value in inputs))
+    points = math.prod(shape)
+    if points > cache.max_batch_points:
+        return run_combustion_model_batch(fuel, *inputs, fidelity=fidelity)
+
+    digest = hashlib.blake2b(digest_size=20)
+    for value in inputs:
+        digest.update(repr(value.shape).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    key = cache.make_key(fuel, ('batch', fidelity), digest.hexdigest())
+
+    results = cache.get(key)
+    if results is None:
+        results = run_combustion_model_batch(fuel, *inputs, fidelity=fidelity)
+        for values in results.values():
+            values.flags.writeable = False
+        cache.set(key, results, points)
+    return results
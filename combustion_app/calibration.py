@@ -0,0 +1,200 @@
+# combustion_app/calibration.py
+# Fits model constants (ModelParameters) to measured plant efficiency, per fuel.
+import time
+
+import numpy as np
+
+from .furnace_model import (
+    DEFAULT_MODEL_PARAMETERS, MODEL_PARAMETERS, ModelParameters, compile_fuel_profile, run_combustion_model_batch,
+)
+from .ingest import MAX_CHART_POINTS, VALIDATION_X_HEADER, VALIDATION_Y_HEADER, ReservoirSample, iter_csv_chunks
+
+# name: (label, lower bound, upper bound)
+CALIBRATION_PARAMETERS = {
+    'q_loss_fraction': ("Unaccounted Heat Loss (fraction of LHV)", 0.0, 0.5),
+    'cp_fg_dry': ("Dry Flue Gas Cp (kJ/kg·K)", 0.8, 1.5),
+    't_exhaust_k': ("Exhaust Temperature (K)", 330.0, 900.0),
+}
+
+# Larger uploads are fitted on a uniform random sample of this many rows
+MAX_CALIBRATION_ROWS = 250000
+MAX_ITERATIONS = 50
+# Stop when an iteration improves the sum of squares by less than this fraction
+TOLERANCE = 1e-10
+# Levenberg-Marquardt damping factors tried together, relative to the current damping
+DAMPING_STEPS = (0.1, 1.0, 10.0, 100.0)
+# Above this condition number of the column-scaled Jacobian, the data cannot separate the
+# fitted parameters (e.g. Cp and exhaust temperature together with the heat loss)
+MAX_CONDITION = 1e6
+
+
+class CalibrationError(ValueError):
+    """Raised when a dataset cannot be fitted (no usable rows, unknown parameters)."""
+
+
+def load_calibration_data(text_stream, max_rows=MAX_CALIBRATION_ROWS):
+    """
+    Reads a validation-style CSV (excess_air, measured_efficiency) in bounded chunks.
+    Returns (excess_air, measured, rows, bad_rows); beyond max_rows the arrays are a uniform sample.
+    """
+    sample = ReservoirSample(max_rows, (VALIDATION_X_HEADER, VALIDATION_Y_HEADER))
+    bad_rows = 0
+    for arrays, chunk_bad_rows in iter_csv_chunks(text_stream, (VALIDATION_X_HEADER, VALIDATION_Y_HEADER)):
+        bad_rows += chunk_bad_rows
+        if len(arrays[VALIDATION_X_HEADER]):
+            sample.add(arrays)
+    data = sample.as_dict()
+    return data[VALIDATION_X_HEADER], data[VALIDATION_Y_HEADER], sample.seen, bad_rows
+
+
+def _predict(profile, start, names, values, moisture_percent, furnace_load_gj_hour, excess_air):
+    """
+    Model efficiency for several candidate parameter sets in one batch call.
+    `values` has one row per candidate and one column per fitted name; returns (candidates, points).
+    """
+    params = start.as_dict()
+    for i, name in enumerate(names):
+        params[name] = values[:, i, None]
+    results = run_combustion_model_batch(
+        profile.with_params(ModelParameters(**params)), moisture_percent, excess_air, furnace_load_gj_hour
+    )
+    return np.broadcast_to(results['efficiency'], (len(values), len(excess_air)))
+
+
+def fit_model_parameters(fuel, excess_air, measured, moisture_percent, furnace_load_gj_hour,
+                         names, max_iterations=MAX_ITERATIONS, tolerance=TOLERANCE):
+    """
+    Least-squares fit of the named ModelParameters to measured efficiency (%).
+
+    Bounded Levenberg-Marquardt: every iteration makes two batch model calls, one for
+    the base point plus a forward-difference step per parameter (the Jacobian), and one
+    for the candidate steps at all DAMPING_STEPS. The fit starts from the fuel's current
+    parameters (its active calibration, else the defaults); parameters that are not
+    fitted keep those values.
+    """
+    unknown = [name for name in names if name not in CALIBRATION_PARAMETERS]
+    if unknown or not names:
+        raise CalibrationError(f"Choose parameters to fit from {', '.join(CALIBRATION_PARAMETERS)}.")
+    names = [name for name in MODEL_PARAMETERS if name in names]
+    excess_air = np.asarray(excess_air, dtype=float)
+    measured = np.asarray(measured, dtype=float)
+    if len(excess_air) < len(names) + 1:
+        raise CalibrationError(f"At least {len(names) + 1} data rows are needed to fit {len(names)} parameter(s).")
+
+    started = time.perf_counter()
+    profile = compile_fuel_profile(fuel)
+    start = profile.model_params or DEFAULT_MODEL_PARAMETERS
+    args = (profile, start, names)
+    inputs = (moisture_percent, furnace_load_gj_hour, excess_air)
+
+    # Work in units of the default values so the normal equations are well scaled
+    scale = np.array([abs(getattr(DEFAULT_MODEL_PARAMETERS, name)) or 1.0 for name in names])
+    lower = np.array([CALIBRATION_PARAMETERS[name][1] for name in names]) / scale
+    upper = np.array([CALIBRATION_PARAMETERS[name][2] for name in names]) / scale
+    initial = np.array([getattr(start, name) for name in names], dtype=float)
+    residual = _predict(*args, initial[None, :], *inputs)[0] - measured
+    rmse_before = float(np.sqrt(np.mean(np.square(residual))))
+    x = np.clip(initial / scale, lower, upper)
+    cost = float(residual @ residual)
+    damping = 1e-3
+    converged = False
+    iterations = 0
+    jacobian = None
+
+    for iterations in range(1, max_iterations + 1):
+        if jacobian is None:
+            # --- Jacobian: base point and one forward step per parameter, evaluated together ---
+            steps = 1e-6 * np.maximum(np.abs(x), 1.0)
+            steps = np.where(x + steps > upper, -steps, steps)
+            points = np.vstack([x, x + np.diag(steps)])
+            predictions = _predict(*args, points * scale, *inputs)
+            residual = predictions[0] - measured
+            cost = float(residual @ residual)
+            jacobian = ((predictions[1:] - predictions[0]) / steps[:, None]).T
+            normal = jacobian.T @ jacobian
+            gradient = jacobian.T @ residual
+            diagonal = np.maximum(np.diag(normal), 1e-12 * max(float(np.diag(normal).max()), 1e-12))
+
+        # --- Candidate steps for several damping factors, evaluated together ---
+        candidates = []
+        for factor in DAMPING_STEPS:
+            try:
+                delta = np.linalg.solve(normal + damping * factor * np.diag(diagonal), -gradient)
+            except np.linalg.LinAlgError:
+                continue
+            candidates.append(np.clip(x + delta, lower, upper))
+        if not candidates:
+            break
+        candidates = np.array(candidates)
+        candidate_residuals = _predict(*args, candidates * scale, *inputs) - measured
+        costs = np.einsum('ij,ij->i', candidate_residuals, candidate_residuals)
+        best = int(np.argmin(costs))
+
+        if costs[best] < cost:
+            improvement = (cost - costs[best]) / max(cost, 1e-300)
+            step = np.abs(candidates[best] - x).max()
+            x, cost = candidates[best], float(costs[best])
+            jacobian = None
+            damping = max(damping * DAMPING_STEPS[best] / 3.0, 1e-12)
+            if improvement < tolerance or step < 1e-12:
+                converged = True
+                break
+        else:
+            # No candidate helped: the current point is a (bounded) minimum at this resolution
+            if damping * DAMPING_STEPS[-1] > 1e12:
+                converged = True
+                break
+            damping *= DAMPING_STEPS[-1] * 10.0
+
+    fitted = {name: float(value) for name, value in zip(names, x * scale)}
+    parameters = ModelParameters(**{**start.as_dict(), **fitted})
+
+    # Standard errors from the Gauss-Newton covariance, sigma^2 (J^T J)^-1, at the last
+    # linearization point (the fitted one, or one step before it)
+    n = len(measured)
+    identifiable = True
+    standard_errors = {}
+    if iterations:
+        norms = np.sqrt(np.diag(normal))
+        identifiable = bool(norms.all() and np.linalg.cond(normal / np.outer(norms, norms)) < MAX_CONDITION ** 2)
+        if not identifiable:
+            standard_errors = {name: None for name in names}
+        elif n > len(names):
+            covariance = cost / (n - len(names)) * np.linalg.inv(normal)
+            standard_errors = {name: float(np.sqrt(max(covariance[i, i], 0.0)) * scale[i])
+                               for i, name in enumerate(names)}
+
+    return {
+        'parameters': parameters,
+        'start': start,
+        'fitted': names,
+        'standard_errors': standard_errors,
+        'rows': n,
+        'rmse_before': rmse_before,
+        'rmse_after': float(np.sqrt(cost / n)),
+        'identifiable': identifiable,
+        'iterations': iterations,
+        'converged': converged,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def calibration_chart_data(fuel, fit, excess_air, measured, moisture_percent, furnace_load_gj_hour,
+                           max_points=MAX_CHART_POINTS, seed=0):
+    """Scatter chart payload: measured efficiency with the model before and after the fit."""
+    if len(excess_air) > max_points:
+        keep = np.random.default_rng(seed).choice(len(excess_air), max_points, replace=False)
+        excess_air, measured = excess_air[keep], measured[keep]
+    profile = compile_fuel_profile(fuel)
+    before, after = (
+        run_combustion_model_batch(profile.with_params(params), moisture_percent, excess_air,
+                                   furnace_load_gj_hour)['efficiency']
+        for params in (fit['start'], fit['parameters'])
+    )
+    return {
+        'labels': excess_air.tolist(),
+        'actual_data': measured.tolist(),
+        'before_data': before.tolist(),
+        'after_data': after.tolist(),
+        'x_axis_label': 'Excess Air (%)',
+    }
@@ -0,0 +1,116 @@
+# combustion_app/catalogue.py
+import threading
+import time
+
+from django.conf import settings
+
+from .furnace_model import compile_fuel_profile
+from .models import Fuel, ModelCalibration
+
+# Defaults, overridable with settings.COMBUSTION_FUEL_CATALOGUE
+DEFAULT_MAX_AGE = 300
+VERSION_KEY = 'combustion:fuel-catalogue-version'
+
+
+class FuelCatalogue:
+    """
+    In-process copy of the Fuel table, loaded with two queries and reused by forms and model calls.
+    Each Fuel carries the parameters of its active calibration as `model_params`.
+
+    Saving or deleting a Fuel invalidates it (signals.py). Other processes only see that
+    through `alias` (a shared Django cache holding a catalogue version) or, without one,
+    once their copy is `max_age` seconds old. The Fuel objects are shared: treat them as read-only.
+    Activating or deactivating a calibration invalidates it the same way.
+    """
+
+    def __init__(self, max_age=DEFAULT_MAX_AGE, alias=None):
+        self.max_age = max_age
+        self.alias = alias
+        self._lock = threading.Lock()
+        self._fuels = None
+        self._by_id = {}
+        self._profiles = {}
+        self._loaded_at = 0.0
+        self._version = None
+        self.loads = 0
+
+    @property
+    def backend(self):
+        if self.alias is None:
+            return None
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def _shared_version(self):
+        backend = self.backend
+        return backend.get(VERSION_KEY, 0) if backend is not None else None
+
+    def _current(self):
+        """(fuels, by_id, profiles), reloading from the database when stale."""
+        version = self._shared_version()
+        with self._lock:
+            fresh = (
+                self._fuels is not None
+                and time.monotonic() - self._loaded_at < self.max_age
+                and version == self._version
+            )
+            if fresh:
+                return self._fuels, self._by_id, self._profiles
+
+        fuels = list(Fuel.objects.order_by('pk'))
+        calibrated = ModelCalibration.active_params()
+        for fuel in fuels:
+            fuel.model_params = calibrated.get(fuel.pk)
+        by_id = {fuel.pk: fuel for fuel in fuels}
+        profiles = {fuel.pk: compile_fuel_profile(fuel) for fuel in fuels}
+        with self._lock:
+            self._fuels, self._by_id, self._profiles = fuels, by_id, profiles
+            self._loaded_at = time.monotonic()
+            self._version = version
+            self.loads += 1
+        return fuels, by_id, profiles
+
+    # --- Public API ---
+
+    def all(self):
+        """Every fuel, in primary key order (the order of Fuel.objects.all())."""
+        return list(self._current()[0])
+
+    def get(self, pk):
+        """The Fuel with this primary key, or None."""
+        return self._current()[1].get(pk)
+
+    def in_bulk(self, pks):
+        """{pk: Fuel} for the pks that exist, like QuerySet.in_bulk."""
+        by_id = self._current()[1]
+        return {pk: by_id[pk] for pk in pks if pk in by_id}
+
+    def profile(self, pk):
+        """The compiled FuelProfile for a fuel, or None."""
+        return self._current()[2].get(pk)
+
+    def invalidate(self):
+        """Forgets the loaded fuels; the next access reloads them (called when a Fuel changes)."""
+        backend = self.backend
+        if backend is not None:
+            backend.add(VERSION_KEY, 0, None)
+            backend.incr(VERSION_KEY)
+        with self._lock:
+            self._fuels = None
+            self._by_id = {}
+            self._profiles = {}
+
+
+_fuel_catalogue = None
+
+
+def get_fuel_catalogue():
+    """Returns the process-wide fuel catalogue, configured from settings on first use."""
+    global _fuel_catalogue
+    if _fuel_catalogue is None:
+        config = getattr(settings, 'COMBUSTION_FUEL_CATALOGUE', {})
+        _fuel_catalogue = FuelCatalogue(
+            max_age=config.get('MAX_AGE', DEFAULT_MAX_AGE),
+            alias=config.get('ALIAS'),
+        )
+    return _fuel_catalogue
@@ -0,0 +1,144 @@
+# combustion_app/export.py
+# Streams FurnaceRun history out as CSV, JSONL or a compact columnar binary format.
+import csv
+import datetime
+import io
+import json
+import struct
+from itertools import islice
+
+import numpy as np
+
+# Rows fetched from the database cursor (and written per block) at a time
+EXPORT_CHUNK_SIZE = 2000
+
+# (query field, exported column, columnar dtype)
+EXPORT_COLUMNS = [
+    ('id', 'id', '<i8'),
+    ('name', 'name', 'str'),
+    ('run_date', 'run_date', '<i8'),
+    ('fuel_id', 'fuel_id', '<i8'),
+    ('fuel__name', 'fuel_name', 'str'),
+    ('moisture_percent', 'moisture_percent', '<f8'),
+    ('excess_air_percent', 'excess_air_percent', '<f8'),
+    ('furnace_load_gj_hour', 'furnace_load_gj_hour', '<f8'),
+    ('calculated_efficiency', 'calculated_efficiency', '<f8'),
+    ('exhaust_temp_c', 'exhaust_temp_c', '<f8'),
+    ('flue_gas_co2_percent', 'flue_gas_co2_percent', '<f8'),
+    ('t_adiabatic_c', 't_adiabatic_c', '<f8'),
+    ('cost_per_gj', 'cost_per_gj', '<f8'),
+    ('cost_per_hour', 'cost_per_hour', '<f8'),
+    ('emissions_co_ppm', 'emissions_co_ppm', '<f8'),
+    ('emissions_nox_ppm', 'emissions_nox_ppm', '<f8'),
+]
+COLUMN_NAMES = [name for _, name, _ in EXPORT_COLUMNS]
+
+# Columnar format: MAGIC, then blocks of <uint32 header length><JSON header><column data>,
+# ended by a zero header length. Numbers are little-endian arrays; strings are
+# int32 offsets (rows + 1) followed by the UTF-8 bytes. run_date is microseconds
+# since the Unix epoch (UTC); a missing fuel_id is -1 and missing results are NaN.
+COLUMNAR_MAGIC = b'FRUNCOL1'
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def iter_row_chunks(runs, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields lists of value tuples (in EXPORT_COLUMNS order) read through a server-side
+    iterator, so memory use does not grow with the size of the table.
+    """
+    rows = runs.values_list(*[field for field, _, _ in EXPORT_COLUMNS]).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# --- Formats ---
+
+def stream_csv(runs):
+    yield ','.join(COLUMN_NAMES) + '\r\n'
+    date_index = COLUMN_NAMES.index('run_date')
+    for chunk in iter_row_chunks(runs):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in chunk:
+            row = list(row)
+            row[date_index] = row[date_index].isoformat()
+            writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def stream_jsonl(runs):
+    for chunk in iter_row_chunks(runs):
+        lines = []
+        for row in chunk:
+            record = dict(zip(COLUMN_NAMES, row))
+            record['run_date'] = record['run_date'].isoformat()
+            lines.append(json.dumps(record))
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_columnar(runs):
+    yield COLUMNAR_MAGIC
+    for chunk in iter_row_chunks(runs):
+        columns = list(zip(*chunk))
+        parts = []
+        header_columns = []
+        for (_, name, dtype), values in zip(EXPORT_COLUMNS, columns):
+            data = _encode_column(name, dtype, values)
+            header_columns.append({'name': name, 'dtype': dtype, 'nbytes': len(data)})
+            parts.append(data)
+        header = json.dumps({'rows': len(chunk), 'columns': header_columns}).encode()
+        yield struct.pack('<I', len(header)) + header + b''.join(parts)
+    yield struct.pack('<I', 0)
+
+
+def _encode_column(name, dtype, values):
+    if dtype == 'str':
+        encoded = [(value or '').encode() for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype='<i4')
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return offsets.tobytes() + b''.join(encoded)
+    if name == 'run_date':
+        values = [(value - EPOCH) // datetime.timedelta(microseconds=1) for value in values]
+    elif dtype == '<i8':
+        values = [-1 if value is None else value for value in values]
+    else:
+        values = [np.nan if value is None else value for value in values]
+    return np.asarray(values, dtype=dtype).tobytes()
+
+
+def read_columnar(stream):
+    """Reads a columnar export back into {column: array} (strings as lists). Used by clients and tests."""
+    if stream.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a FurnaceRun columnar export.")
+    blocks = {name: [[] if dtype == 'str' else np.empty(0, dtype=dtype)] for _, name, dtype in EXPORT_COLUMNS}
+    while True:
+        (header_length,) = struct.unpack('<I', stream.read(4))
+        if header_length == 0:
+            break
+        header = json.loads(stream.read(header_length))
+        rows = header['rows']
+        for column in header['columns']:
+            data = stream.read(column['nbytes'])
+            if column['dtype'] == 'str':
+                offsets = np.frombuffer(data[:4 * (rows + 1)], dtype='<i4')
+                text = data[4 * (rows + 1):]
+                values = [text[offsets[i]:offsets[i + 1]].decode() for i in range(rows)]
+            else:
+                values = np.frombuffer(data, dtype=column['dtype'])
+            blocks.setdefault(column['name'], []).append(values)
+
+    return {
+        name: ([value for part in parts for value in part] if isinstance(parts[0], list) else np.concatenate(parts))
+        for name, parts in blocks.items()
+    }
+
+
+EXPORT_FORMATS = {
+    # format -> (generator, content type, file extension)
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson', 'jsonl'),
+    'columnar': (stream_columnar, 'application/octet-stream', 'frcol'),
+}
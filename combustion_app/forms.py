@@ -1,11 +1,107 @@
 # combustion_app/forms.py
+import math
+
 from django import forms
-from .models import FurnaceRun, Fuel
+from .models import FurnaceRun
+from .catalogue import get_fuel_catalogue
+from .calibration import CALIBRATION_PARAMETERS
+from .sensitivity import SENSITIVITY_FACTORS
+from .blends import MAX_BLEND_COMPONENTS, MAX_CANDIDATES, candidate_count
+from .furnace_model import DEFAULT_FIDELITY
+from .sweeps import SAMPLING_UNIFORM, SAMPLING_ADAPTIVE, DEFAULT_ADAPTIVE_TOLERANCE
+
+
+# --- Fuel fields backed by the in-process fuel catalogue (no queries once it is warm) ---
+
+class FuelChoiceField(forms.ChoiceField):
+    """A ModelChoiceField for Fuel that reads choices and cleaned values from the fuel catalogue."""
+
+    def __init__(self, empty_label="---------", **kwargs):
+        self.empty_label = empty_label
+        super().__init__(choices=self._catalogue_choices, **kwargs)
+
+    def _catalogue_choices(self):
+        return [('', self.empty_label)] + [(fuel.pk, str(fuel)) for fuel in get_fuel_catalogue().all()]
+
+    def prepare_value(self, value):
+        return getattr(value, 'pk', value)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            fuel = get_fuel_catalogue().get(int(getattr(value, 'pk', value)))
+        except (TypeError, ValueError):
+            fuel = None
+        if fuel is None:
+            raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice',
+                                        params={'value': value})
+        return fuel
+
+    def validate(self, value):
+        # to_python already checked the choice against the catalogue
+        forms.Field.validate(self, value)
+
+
+class FuelMultipleChoiceField(forms.MultipleChoiceField):
+    """
+    ModelMultipleChoiceField for Fuel, backed by the fuel catalogue. Cleans to a list of Fuel.
+    With include_blends=False only single fuels are offered (e.g. as blend components).
+    """
+
+    def __init__(self, include_blends=True, **kwargs):
+        self.include_blends = include_blends
+        super().__init__(choices=self._catalogue_choices, **kwargs)
+
+    def _fuels(self):
+        return [fuel for fuel in get_fuel_catalogue().all() if self.include_blends or not fuel.is_blend]
+
+    def _catalogue_choices(self):
+        return [(fuel.pk, str(fuel)) for fuel in self._fuels()]
+
+    def to_python(self, value):
+        if not value:
+            return []
+        if not isinstance(value, (list, tuple)):
+            raise forms.ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+        catalogue = get_fuel_catalogue()
+        fuels = []
+        for item in value:
+            try:
+                fuel = catalogue.get(int(item))
+            except (TypeError, ValueError):
+                fuel = None
+            if fuel is None or (fuel.is_blend and not self.include_blends):
+                raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice',
+                                            params={'value': item})
+            fuels.append(fuel)
+        return fuels
+
+    def validate(self, value):
+        if self.required and not value:
+            raise forms.ValidationError(self.error_messages['required'], code='required')
+
+
+FIDELITY_CHOICES = [
+    ('constant_cp', "Constant Cp (fastest)"),
+    ('variable_cp', "Temperature-dependent Cp (more accurate flame temperature)"),
+]
+
+
+class FidelityField(forms.ChoiceField):
+    """Model fidelity (see furnace_model.FIDELITIES); a missing value means the default."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('label', "Model Fidelity")
+        super().__init__(choices=FIDELITY_CHOICES, required=False, initial=DEFAULT_FIDELITY, **kwargs)
+
+    def clean(self, value):
+        return super().clean(value) or DEFAULT_FIDELITY
+
 
 class FurnaceRunForm(forms.ModelForm):
-    fuel = forms.ModelChoiceField(queryset=Fuel.objects.all(), 
-                                  empty_label="--- Select a Fuel ---",
-                                  widget=forms.Select(attrs={'class': 'form-control'}))
+    fuel = FuelChoiceField(empty_label="--- Select a Fuel ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
 
     class Meta:
         model = FurnaceRun
@@ -17,12 +113,17 @@ class FurnaceRunForm(forms.ModelForm):
             'furnace_load_gj_hour': forms.NumberInput(attrs={'step': 0.1, 'min': 0.1, 'max': 100}), # <-- NEW
         }
 
+    def _get_validation_exclusions(self):
+        # The fuel was already checked against the catalogue; skip the model's FK lookup query
+        exclude = super()._get_validation_exclusions()
+        exclude.add('fuel')
+        return exclude
+
 
 # --- NEW FORM FOR ANALYSIS PAGE ---
 class AnalysisForm(forms.Form):
-    fuel = forms.ModelChoiceField(queryset=Fuel.objects.all(), 
-                                  empty_label="--- Select a Fuel ---",
-                                  widget=forms.Select(attrs={'class': 'form-control'}))
+    fuel = FuelChoiceField(empty_label="--- Select a Fuel ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
     
     VARIABLE_CHOICES = [
         ('moisture_percent', 'Moisture Content'),
@@ -32,21 +133,350 @@ class AnalysisForm(forms.Form):
     
     start_value = forms.FloatField(initial=10, min_value=1)
     end_value = forms.FloatField(initial=50, min_value=1)
-    steps = forms.IntegerField(initial=10, min_value=2, max_value=50, label="Number of Steps")
+    steps = forms.IntegerField(initial=10, min_value=2, max_value=50, label="Number of Steps",
+                               help_text="With adaptive sampling, the size of the starting grid.")
+
+    SAMPLING_CHOICES = [
+        (SAMPLING_UNIFORM, 'Uniform grid'),
+        (SAMPLING_ADAPTIVE, 'Adaptive (refine where results bend or jump)'),
+    ]
+    sampling = forms.TypedChoiceField(choices=SAMPLING_CHOICES, required=False, empty_value=SAMPLING_UNIFORM,
+                                      initial=SAMPLING_UNIFORM, label="Sampling")
+    tolerance = forms.FloatField(required=False, initial=DEFAULT_ADAPTIVE_TOLERANCE, min_value=0.01, max_value=50,
+                                 label="Adaptive Tolerance (% of each result's range)")
     
     # Constant values for the simulation
     constant_moisture = forms.FloatField(initial=10, label="Constant Moisture (%)")
     constant_excess_air = forms.FloatField(initial=40, label="Constant Excess Air (%)")
     constant_load = forms.FloatField(initial=1, label="Constant Furnace Load (GJ/hr)")
+    fidelity = FidelityField()
+    run_in_background = forms.BooleanField(required=False, label="Run in background (for large jobs)")
+
+    def clean_tolerance(self):
+        tolerance = self.cleaned_data['tolerance']
+        return DEFAULT_ADAPTIVE_TOLERANCE if tolerance is None else tolerance
+
+
+# --- GRID SWEEP FORM (moisture x excess air x load) ---
+class GridAnalysisForm(forms.Form):
+    MAX_GRID_STEPS = 250
+    MAX_LOADS = 10
+
+    fuel = FuelChoiceField(empty_label="--- Select a Fuel ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
+
+    moisture_start = forms.FloatField(initial=5, min_value=0, label="Moisture From (%)")
+    moisture_end = forms.FloatField(initial=50, min_value=0, label="Moisture To (%)")
+    moisture_steps = forms.IntegerField(initial=100, min_value=2, max_value=MAX_GRID_STEPS, label="Moisture Steps")
+
+    excess_air_start = forms.FloatField(initial=10, min_value=0, label="Excess Air From (%)")
+    excess_air_end = forms.FloatField(initial=200, min_value=0, label="Excess Air To (%)")
+    excess_air_steps = forms.IntegerField(initial=100, min_value=2, max_value=MAX_GRID_STEPS, label="Excess Air Steps")
+
+    loads = forms.CharField(initial="1", label="Furnace Loads (GJ/hr, comma separated)")
+    fidelity = FidelityField()
+    run_in_background = forms.BooleanField(required=False, label="Run in background (for large jobs)")
+
+    def clean_loads(self):
+        raw = self.cleaned_data['loads']
+        try:
+            loads = [float(value) for value in raw.split(',') if value.strip()]
+        except ValueError:
+            raise forms.ValidationError("Loads must be numbers separated by commas.")
+        if not loads:
+            raise forms.ValidationError("Enter at least one furnace load.")
+        if len(loads) > self.MAX_LOADS:
+            raise forms.ValidationError(f"Enter at most {self.MAX_LOADS} furnace loads.")
+        if not all(math.isfinite(load) for load in loads):
+            raise forms.ValidationError("Furnace loads must be finite numbers.")
+        if any(load <= 0 for load in loads):
+            raise forms.ValidationError("Furnace loads must be greater than zero.")
+        return loads
     
     
 class ValidationForm(forms.Form):
-    fuel = forms.ModelChoiceField(queryset=Fuel.objects.all(), 
-                                  label="Select Fuel for Model",
-                                  empty_label="--- Select a Fuel ---",
-                                  widget=forms.Select(attrs={'class': 'form-control'}))
+    fuel = FuelChoiceField(label="Select Fuel for Model",
+                           empty_label="--- Select a Fuel ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
     
     constant_moisture = forms.FloatField(initial=10, label="Constant Moisture (%) for this test")
     constant_load = forms.FloatField(initial=1, label="Constant Furnace Load (GJ/hr) for this test")
 
-    validation_file = forms.FileField(label="Upload CSV File")
\ No newline at end of file
+    validation_file = forms.FileField(label="Upload CSV File")
+    run_in_background = forms.BooleanField(required=False, label="Run in background (for large jobs)")
+
+
+class TelemetryForm(forms.Form):
+    WINDOW_CHOICES = [(60, '1 minute'), (900, '15 minutes'), (3600, '1 hour'), (86400, '1 day')]
+
+    fuel = FuelChoiceField(label="Select Fuel for Model",
+                           empty_label="--- Select a Fuel ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
+
+    window_seconds = forms.TypedChoiceField(choices=WINDOW_CHOICES, coerce=int, initial=3600,
+                                            label="Rolling Average Window")
+    fidelity = FidelityField()
+
+    telemetry_file = forms.FileField(label="Upload Historian CSV File")
+    run_in_background = forms.BooleanField(required=False, label="Run in background (for large jobs)")
+
+
+class CalibrationForm(forms.Form):
+    PARAMETER_CHOICES = [(name, label) for name, (label, _, _) in CALIBRATION_PARAMETERS.items()]
+
+    fuel = FuelChoiceField(label="Select Fuel to Calibrate",
+                           empty_label="--- Select a Fuel ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
+
+    constant_moisture = forms.FloatField(initial=10, label="Constant Moisture (%) for this data")
+    constant_load = forms.FloatField(initial=1, label="Constant Furnace Load (GJ/hr) for this data")
+
+    calibration_file = forms.FileField(label="Upload CSV File")
+    parameters = forms.MultipleChoiceField(choices=PARAMETER_CHOICES,
+                                           initial=['q_loss_fraction', 't_exhaust_k'],
+                                           widget=forms.CheckboxSelectMultiple,
+                                           label="Parameters to Fit")
+    name = forms.CharField(max_length=100, initial="Plant Calibration", label="Calibration Name")
+    activate = forms.BooleanField(required=False, initial=True,
+                                  label="Use the fitted parameters for later simulations of this fuel")
+
+
+class RunImportForm(forms.Form):
+    FORMAT_CHOICES = [('csv', 'CSV (with header row)'), ('jsonl', 'JSON Lines (one run per line)')]
+
+    runs_file = forms.FileField(label="Upload Runs File")
+    file_format = forms.ChoiceField(choices=FORMAT_CHOICES, initial='csv', label="File Format")
+    default_name = forms.CharField(max_length=100, initial="Imported Run",
+                                   label="Run Name (for rows without a name)")
+
+
+class RunFilterForm(forms.Form):
+    start_date = forms.DateField(required=False, label="From Date (YYYY-MM-DD)")
+    end_date = forms.DateField(required=False, label="To Date (YYYY-MM-DD)")
+    fuel = FuelMultipleChoiceField(required=False,
+                                   widget=forms.CheckboxSelectMultiple,
+                                   label="Fuels (none selected means all)")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('start_date') and cleaned_data.get('end_date'):
+            if cleaned_data['start_date'] > cleaned_data['end_date']:
+                raise forms.ValidationError("The start date must not be after the end date.")
+        return cleaned_data
+
+
+class RunExportForm(RunFilterForm):
+    FORMAT_CHOICES = [('csv', 'CSV'), ('jsonl', 'JSON Lines'), ('columnar', 'Columnar (binary)')]
+
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, initial='csv', required=False, label="Export Format")
+
+    field_order = ['format', 'start_date', 'end_date', 'fuel']
+
+
+class UncertaintyForm(forms.Form):
+    fuel = FuelChoiceField(empty_label="--- Select a Fuel ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
+
+    moisture = forms.FloatField(initial=10, min_value=0, max_value=99, label="Moisture (%)")
+    excess_air = forms.FloatField(initial=40, min_value=0, label="Excess Air (%)")
+    load = forms.FloatField(initial=1, min_value=0.01, label="Furnace Load (GJ/hr)")
+
+    SAMPLE_CHOICES = [
+        (10000, '10,000'),
+        (100000, '100,000'),
+        (1000000, '1,000,000'),
+    ]
+    n_samples = forms.TypedChoiceField(choices=SAMPLE_CHOICES, coerce=int, initial=100000, label="Number of Samples")
+    DISTRIBUTION_CHOICES = [
+        ('normal', 'Normal (spread = 1 std. dev.)'),
+        ('uniform', 'Uniform (spread = half-width)'),
+        ('triangular', 'Triangular (spread = half-width)'),
+    ]
+    distribution = forms.ChoiceField(choices=DISTRIBUTION_CHOICES, label="Distribution")
+
+    # Spreads, relative to the fuel's assay values or in absolute input units
+    composition_spread = forms.FloatField(initial=5, min_value=0, label="C / H / O / Ash Spread (% of value)")
+    hhv_spread = forms.FloatField(initial=3, min_value=0, label="HHV Spread (% of value)")
+    cost_spread = forms.FloatField(initial=10, min_value=0, label="Fuel Cost Spread (% of value)")
+    moisture_spread = forms.FloatField(initial=2, min_value=0, label="Moisture Spread (percentage points)")
+    excess_air_spread = forms.FloatField(initial=5, min_value=0, label="Excess Air Spread (percentage points)")
+
+
+
+class SensitivityForm(forms.Form):
+    fuel = FuelChoiceField(empty_label="--- Select a Fuel ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
+
+    METHOD_CHOICES = [
+        ('morris', 'Morris Screening (cheap first pass)'),
+        ('sobol', 'Sobol Indices (first-order and total)'),
+    ]
+    method = forms.ChoiceField(choices=METHOD_CHOICES, label="Method")
+    EVALUATION_CHOICES = [
+        (10000, '10,000'),
+        (100000, '100,000'),
+        (1000000, '1,000,000'),
+    ]
+    n_evaluations = forms.TypedChoiceField(choices=EVALUATION_CHOICES, coerce=int, initial=100000,
+                                           label="Model Evaluations")
+
+    factors = forms.MultipleChoiceField(choices=list(SENSITIVITY_FACTORS.items()),
+                                        initial=list(SENSITIVITY_FACTORS),
+                                        widget=forms.CheckboxSelectMultiple,
+                                        label="Inputs to Vary")
+
+    # Ranges: operating inputs in absolute units, fuel properties relative to the fuel's values
+    moisture_min = forms.FloatField(initial=5, min_value=0, max_value=99, label="Moisture From (%)")
+    moisture_max = forms.FloatField(initial=30, min_value=0, max_value=99, label="Moisture To (%)")
+    excess_air_min = forms.FloatField(initial=10, min_value=0, label="Excess Air From (%)")
+    excess_air_max = forms.FloatField(initial=100, min_value=0, label="Excess Air To (%)")
+    load = forms.FloatField(initial=1, min_value=0.01, label="Furnace Load (GJ/hr)")
+    composition_spread = forms.FloatField(initial=10, min_value=0, max_value=100,
+                                          label="C / H / O / Ash Range (± % of value)")
+    hhv_spread = forms.FloatField(initial=5, min_value=0, max_value=100, label="HHV Range (± % of value)")
+    cost_spread = forms.FloatField(initial=20, min_value=0, max_value=100, label="Fuel Price Range (± % of value)")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for name in ('moisture', 'excess_air'):
+            low, high = cleaned_data.get(f'{name}_min'), cleaned_data.get(f'{name}_max')
+            if low is not None and high is not None and low > high:
+                self.add_error(f'{name}_max', "The upper end of the range must not be below the lower end.")
+        return cleaned_data
+
+
+class OptimizationForm(forms.Form):
+    fuel = FuelChoiceField(required=False,
+                           empty_label="--- Whole Fuel Library ---",
+                           widget=forms.Select(attrs={'class': 'form-control'}))
+
+    OBJECTIVE_CHOICES = [
+        ('min_cost', 'Minimise Cost of Energy (₹/GJ)'),
+        ('max_efficiency', 'Maximise Efficiency'),
+    ]
+    objective = forms.ChoiceField(choices=OBJECTIVE_CHOICES, label="Objective")
+
+    moisture = forms.FloatField(initial=10, min_value=0, max_value=99, label="Moisture (%)")
+    load = forms.FloatField(initial=1, min_value=0.01, label="Furnace Load (GJ/hr)")
+
+    co_limit = forms.FloatField(required=False, initial=100, min_value=0, label="CO Limit (ppm, blank = none)")
+    nox_limit = forms.FloatField(required=False, initial=20, min_value=0, label="NOx Limit (ppm, blank = none)")
+
+    excess_air_min = forms.FloatField(initial=0, min_value=0, label="Search Excess Air From (%)")
+    excess_air_max = forms.FloatField(initial=200, min_value=0, label="Search Excess Air To (%)")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('excess_air_min') is not None and cleaned_data.get('excess_air_max') is not None:
+            if cleaned_data['excess_air_min'] >= cleaned_data['excess_air_max']:
+                raise forms.ValidationError("The search range must go from a lower to a higher excess air.")
+        return cleaned_data
+
+
+
+class BlendForm(forms.Form):
+    """A blend recipe: one mass-percentage field per single fuel in the catalogue (blank = not used)."""
+
+    name = forms.CharField(max_length=100, label="Blend Name")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.component_fuels = [fuel for fuel in get_fuel_catalogue().all() if not fuel.is_blend]
+        for fuel in self.component_fuels:
+            self.fields[f'fraction_{fuel.pk}'] = forms.FloatField(required=False, min_value=0,
+                                                                  label=f"{fuel.name} (% of mass)")
+
+    def clean_name(self):
+        name = self.cleaned_data['name']
+        if any(fuel.name == name for fuel in get_fuel_catalogue().all()):
+            raise forms.ValidationError("A fuel with this name already exists.")
+        return name
+
+    def clean(self):
+        cleaned_data = super().clean()
+        components = [(fuel, cleaned_data.get(f'fraction_{fuel.pk}')) for fuel in self.component_fuels]
+        components = [(fuel, share) for fuel, share in components if share]
+        if len(components) < 2:
+            raise forms.ValidationError("Enter a percentage for at least two fuels.")
+        if len(components) > MAX_BLEND_COMPONENTS:
+            raise forms.ValidationError(f"A blend can have at most {MAX_BLEND_COMPONENTS} component fuels.")
+        # Percentages that do not add up to 100 are scaled to do so
+        cleaned_data['components'] = components
+        return cleaned_data
+
+    def fraction_fields(self):
+        return [self[f'fraction_{fuel.pk}'] for fuel in self.component_fuels]
+
+
+class BlendOptimizationForm(forms.Form):
+    fuels = FuelMultipleChoiceField(include_blends=False,
+                                    widget=forms.CheckboxSelectMultiple,
+                                    label="Fuels to Blend")
+
+    moisture = forms.FloatField(initial=10, min_value=0, max_value=99, label="Moisture (%)")
+    load = forms.FloatField(initial=1, min_value=0.01, label="Furnace Load (GJ/hr)")
+
+    co_limit = forms.FloatField(required=False, initial=100, min_value=0, label="CO Limit (ppm, blank = none)")
+    nox_limit = forms.FloatField(required=False, initial=20, min_value=0, label="NOx Limit (ppm, blank = none)")
+
+    excess_air_min = forms.FloatField(initial=0, min_value=0, label="Search Excess Air From (%)")
+    excess_air_max = forms.FloatField(initial=200, min_value=0, label="Search Excess Air To (%)")
+
+    divisions = forms.IntegerField(initial=20, min_value=1, max_value=100,
+                                   label="Fraction Steps (20 = blends in 5% steps)")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        fuels = cleaned_data.get('fuels')
+        if fuels is not None:
+            if not 2 <= len(fuels) <= MAX_BLEND_COMPONENTS:
+                self.add_error('fuels', f"Choose between 2 and {MAX_BLEND_COMPONENTS} fuels.")
+            elif cleaned_data.get('divisions') and \
+                    candidate_count(len(fuels), cleaned_data['divisions']) > MAX_CANDIDATES:
+                self.add_error('divisions', f"Too many candidate blends (at most {MAX_CANDIDATES}); "
+                                            "use coarser steps or fewer fuels.")
+        if cleaned_data.get('excess_air_min') is not None and cleaned_data.get('excess_air_max') is not None:
+            if cleaned_data['excess_air_min'] >= cleaned_data['excess_air_max']:
+                raise forms.ValidationError("The search range must go from a lower to a higher excess air.")
+        return cleaned_data
+
+
+class ParetoForm(forms.Form):
+    MAX_GRID_STEPS = 500
+    # With four objectives nearly every grid point is non-dominated and the k-D filter is quadratic
+    MAX_GRID_STEPS_MANY_OBJECTIVES = 60
+
+    fuels = FuelMultipleChoiceField(widget=forms.CheckboxSelectMultiple,
+                                    label="Fuels")
+
+    OBJECTIVE_CHOICES = [
+        ('cost_per_gj', 'Cost of Energy (₹/GJ)'),
+        ('efficiency', 'Efficiency (%)'),
+        ('emissions_co_ppm', 'CO (ppm)'),
+        ('emissions_nox_ppm', 'NOx (ppm)'),
+    ]
+    objectives = forms.MultipleChoiceField(choices=OBJECTIVE_CHOICES,
+                                           initial=['cost_per_gj', 'emissions_co_ppm', 'emissions_nox_ppm'],
+                                           widget=forms.CheckboxSelectMultiple,
+                                           label="Objectives (first two are plotted)")
+
+    moisture_start = forms.FloatField(initial=5, min_value=0, label="Moisture From (%)")
+    moisture_end = forms.FloatField(initial=40, min_value=0, label="Moisture To (%)")
+    excess_air_start = forms.FloatField(initial=0, min_value=0, label="Excess Air From (%)")
+    excess_air_end = forms.FloatField(initial=200, min_value=0, label="Excess Air To (%)")
+    steps = forms.IntegerField(initial=150, min_value=2, max_value=MAX_GRID_STEPS, label="Grid Steps per Axis",
+                               help_text=f"At most {MAX_GRID_STEPS_MANY_OBJECTIVES} with all four objectives.")
+
+    def clean_objectives(self):
+        objectives = self.cleaned_data['objectives']
+        if len(objectives) < 2:
+            raise forms.ValidationError("Select at least two objectives.")
+        # Keep the order of OBJECTIVE_CHOICES so the plotted axes are predictable
+        return [value for value, _ in self.OBJECTIVE_CHOICES if value in objectives]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        objectives, steps = cleaned_data.get('objectives'), cleaned_data.get('steps')
+        if objectives and steps and len(objectives) > 3 and steps > self.MAX_GRID_STEPS_MANY_OBJECTIVES:
+            self.add_error('steps', f"With four objectives, use at most {self.MAX_GRID_STEPS_MANY_OBJECTIVES} steps.")
+        return cleaned_data
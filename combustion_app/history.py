@@ -0,0 +1,104 @@
+# combustion_app/history.py
+# Keyset-paginated run history and server-side statistics for comparing many runs.
+import datetime
+import math
+
+from django.db.models import Avg, Count, F, Max, Min
+
+HISTORY_PAGE_SIZE = 50
+# Runs shown side by side in compare_view; larger selections get summary statistics only
+COMPARE_MAX_COLUMNS = 6
+# Upper limit on runs in one comparison
+MAX_COMPARE_RUNS = 1000
+
+# (field, label, decimals)
+COMPARE_METRICS = [
+    ('cost_per_gj', 'Cost of Energy (₹/GJ)', 2),
+    ('cost_per_hour', 'Operational Cost (₹/hr)', 2),
+    ('calculated_efficiency', 'Efficiency (%)', 2),
+    ('t_adiabatic_c', 'Adiabatic Temp (°C)', 0),
+    ('emissions_co_ppm', 'CO (ppm)', 0),
+    ('emissions_nox_ppm', 'NOx (ppm)', 0),
+    ('moisture_percent', 'Moisture (%)', 1),
+    ('excess_air_percent', 'Excess Air (%)', 1),
+    ('furnace_load_gj_hour', 'Furnace Load (GJ/hr)', 1),
+]
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def encode_cursor(run):
+    """Position after `run` in newest-first order, as '<run_date microseconds>.<id>'."""
+    return f"{(run.run_date - EPOCH) // datetime.timedelta(microseconds=1)}.{run.id}"
+
+
+def decode_cursor(cursor):
+    """Returns (run_date, id), or None for a missing or malformed cursor."""
+    try:
+        micros, run_id = (int(part) for part in cursor.split('.'))
+        return EPOCH + datetime.timedelta(microseconds=micros), run_id
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def history_page(runs, cursor=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    One page of `runs`, newest first, starting after `cursor`.
+
+    Keyset pagination: each page seeks straight to (run_date, id) < cursor on the
+    run_date index instead of counting past an OFFSET, so page 10,000 costs the same
+    as page 1. Returns (runs on the page, cursor for the next page or None).
+    """
+    runs = runs.select_related('fuel').order_by('-run_date', '-id')
+    position = decode_cursor(cursor)
+    if position is not None:
+        run_date, run_id = position
+        runs = runs.filter(run_date__lte=run_date).exclude(run_date=run_date, id__gte=run_id)
+
+    # One extra row tells us whether there is a next page
+    page = list(runs[:page_size + 1])
+    next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+    return page[:page_size], next_cursor
+
+
+def compare_summary(runs):
+    """
+    Count / mean / min / max / standard deviation of every compared metric, plus
+    per-fuel counts and means, computed by the database in two queries.
+    """
+    aggregates = {}
+    for field, _, _ in COMPARE_METRICS:
+        aggregates.update({
+            f'{field}__avg': Avg(field),
+            f'{field}__min': Min(field),
+            f'{field}__max': Max(field),
+            # Mean of squares rather than StdDev, which fails on NULLs in SQLite
+            f'{field}__sq': Avg(F(field) * F(field)),
+        })
+    totals = runs.aggregate(count=Count('id'), **aggregates)
+
+    metrics = [
+        {
+            'label': label,
+            'decimals': decimals,
+            'mean': totals[f'{field}__avg'],
+            'min': totals[f'{field}__min'],
+            'max': totals[f'{field}__max'],
+            'std': _std(totals[f'{field}__avg'], totals[f'{field}__sq']),
+        }
+        for field, label, decimals in COMPARE_METRICS
+    ]
+    by_fuel = list(
+        runs.values('fuel__name')
+        .annotate(count=Count('id'), cost_per_gj=Avg('cost_per_gj'), efficiency=Avg('calculated_efficiency'),
+                  emissions_co_ppm=Avg('emissions_co_ppm'), emissions_nox_ppm=Avg('emissions_nox_ppm'))
+        .order_by('cost_per_gj')
+    )
+    return {'count': totals['count'], 'metrics': metrics, 'by_fuel': by_fuel}
+
+
+def _std(mean, mean_of_squares):
+    """Population standard deviation from E[x] and E[x^2]."""
+    if mean is None:
+        return None
+    return math.sqrt(max(mean_of_squares - mean * mean, 0.0))
@@ -0,0 +1,178 @@
+# combustion_app/ingest.py
+import csv
+import io
+
+import numpy as np
+
+from .furnace_model import run_combustion_model_batch, compile_fuel_profile
+
+# Rows parsed and evaluated per batch; bounds peak memory regardless of file size
+DEFAULT_CHUNK_ROWS = 20000
+
+# Most points sent to the validation scatter chart
+MAX_CHART_POINTS = 5000
+
+VALIDATION_X_HEADER = 'excess_air'
+VALIDATION_Y_HEADER = 'measured_efficiency'
+
+
+class CSVColumnsError(ValueError):
+    """Raised when an uploaded CSV is missing required columns."""
+
+
+def open_text_stream(uploaded_file, encoding='utf-8'):
+    """
+    Wraps an uploaded file in a text stream that decodes lazily,
+    so the upload is never read into memory as a whole.
+    Undecodable bytes are replaced and end up counted as bad rows.
+    """
+    uploaded_file.seek(0)
+    return io.TextIOWrapper(uploaded_file.file, encoding=encoding, errors='replace', newline='')
+
+
+def iter_csv_chunks(text_stream, columns, chunk_size=DEFAULT_CHUNK_ROWS):
+    """
+    Parses a CSV stream in bounded-size chunks.
+    Yields (arrays, bad_rows): a dict of float arrays, one per requested column,
+    and the number of rows in the chunk that could not be parsed.
+    """
+    reader = csv.reader(text_stream)
+    header = next(reader, None)
+    if header is None:
+        raise CSVColumnsError("The CSV file is empty.")
+
+    header = [name.strip() for name in header]
+    missing = [name for name in columns if name not in header]
+    if missing:
+        raise CSVColumnsError(
+            "CSV file must contain columns named " + ", ".join(f"'{name}'" for name in columns) + "."
+        )
+    indexes = [header.index(name) for name in columns]
+
+    buffers = np.empty((len(columns), chunk_size), dtype=float)
+    filled = 0
+    bad_rows = 0
+
+    for row in reader:
+        if not row:
+            continue  # blank lines are not data
+        try:
+            buffers[:, filled] = [float(row[index]) for index in indexes]
+        except (ValueError, IndexError):
+            bad_rows += 1
+            continue
+        filled += 1
+
+        if filled == chunk_size:
+            yield _chunk_arrays(columns, buffers, filled, bad_rows)
+            filled = 0
+            bad_rows = 0
+
+    if filled or bad_rows:
+        yield _chunk_arrays(columns, buffers, filled, bad_rows)
+
+
+def _chunk_arrays(columns, buffers, filled, bad_rows):
+    # Non-finite values (nan, inf) parse as floats but are still bad rows
+    finite = np.isfinite(buffers[:, :filled]).all(axis=0)
+    arrays = {name: buffers[i, :filled][finite].copy() for i, name in enumerate(columns)}
+    return arrays, bad_rows + int(filled - finite.sum())
+
+
+class ReservoirSample:
+    """
+    Keeps a uniform random sample of at most `size` points from a stream of chunks,
+    so chart payloads stay bounded however many rows are processed.
+    """
+
+    def __init__(self, size, columns, seed=0):
+        self.size = size
+        self.seen = 0
+        self.columns = columns
+        self.data = np.empty((len(columns), size), dtype=float)
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, arrays):
+        values = np.vstack([arrays[name] for name in self.columns])
+        n = values.shape[1]
+
+        # Fill the reservoir first
+        take = min(max(self.size - self.seen, 0), n)
+        if take:
+            self.data[:, self.seen:self.seen + take] = values[:, :take]
+
+        # Then replace entries with probability size / (index + 1) (Algorithm R)
+        rest = values[:, take:]
+        if rest.shape[1]:
+            positions = np.arange(self.seen + take, self.seen + n) + 1
+            slots = (self.rng.random(rest.shape[1]) * positions).astype(np.int64)
+            keep = slots < self.size
+            self.data[:, slots[keep]] = rest[:, keep]
+
+        self.seen += n
+
+    def as_dict(self):
+        count = min(self.seen, self.size)
+        return {name: self.data[i, :count] for i, name in enumerate(self.columns)}
+
+
+def run_validation_stream(fuel, moisture_percent, furnace_load_gj_hour, text_stream,
+                          chunk_size=DEFAULT_CHUNK_ROWS, max_points=MAX_CHART_POINTS,
+                          progress_callback=None):
+    """
+    Streams a validation CSV (excess_air, measured_efficiency) through the batch model.
+    Error statistics cover every row; the returned chart points are a bounded sample.
+    `progress_callback(rows)` is called after each chunk.
+    """
+    profile = compile_fuel_profile(fuel)
+    sample = ReservoirSample(max_points, ('excess_air', 'actual', 'model'))
+    rows = 0
+    bad_rows = 0
+    sum_error = 0.0
+    sum_abs_error = 0.0
+    sum_sq_error = 0.0
+
+    for arrays, chunk_bad_rows in iter_csv_chunks(
+            text_stream, (VALIDATION_X_HEADER, VALIDATION_Y_HEADER), chunk_size):
+        bad_rows += chunk_bad_rows
+        excess_air = arrays[VALIDATION_X_HEADER]
+        if not len(excess_air):
+            continue
+
+        model = run_combustion_model_batch(
+            profile, moisture_percent, excess_air, furnace_load_gj_hour
+        )['efficiency']
+        actual = arrays[VALIDATION_Y_HEADER]
+
+        error = model - actual
+        rows += len(error)
+        sum_error += float(error.sum())
+        sum_abs_error += float(np.abs(error).sum())
+        sum_sq_error += float(np.square(error).sum())
+
+        sample.add({'excess_air': excess_air, 'actual': actual, 'model': model})
+        if progress_callback is not None:
+            progress_callback(rows)
+
+    points = sample.as_dict()
+    return {
+        'rows': rows,
+        'bad_rows': bad_rows,
+        'plotted_rows': len(points['excess_air']),
+        'bias': sum_error / rows if rows else None,
+        'mae': sum_abs_error / rows if rows else None,
+        'rmse': (sum_sq_error / rows) ** 0.5 if rows else None,
+        'points': points,
+    }
+
+
+def validation_chart_data(summary):
+    """Scatter chart payload for the validation page."""
+    points = summary['points']
+    return {
+        'labels': points['excess_air'].tolist(),
+        'model_data': points['model'].tolist(),
+        'actual_data': points['actual'].tolist(),
+        'x_axis_label': VALIDATION_X_HEADER,
+        'y_axis_label': 'Efficiency (%)'
+    }
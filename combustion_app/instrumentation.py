@@ -0,0 +1,139 @@
+# combustion_app/instrumentation.py
+# Per-request timing of model, database and rendering work, plus per-view latency histograms.
+# No Django imports: furnace_model.py uses these hooks, and it also runs in pool workers.
+import functools
+import threading
+import time
+from contextvars import ContextVar
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_current = ContextVar('combustion_request_timings', default=None)
+
+
+class RequestTimings:
+    """Time and call counts per phase ('model', 'db', 'render', ...) for one request."""
+
+    __slots__ = ('phases', 'points')
+
+    def __init__(self):
+        self.phases = {}
+        self.points = 0
+
+    def add(self, phase, seconds, count=1):
+        total, calls = self.phases.get(phase, (0.0, 0))
+        self.phases[phase] = (total + seconds, calls + count)
+
+    def calls(self, phase):
+        return self.phases.get(phase, (0.0, 0))[1]
+
+
+def start_request():
+    """Starts collecting for the current request; returns (timings, token for end_request)."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def timed(phase):
+    """
+    Decorator adding the wrapped call's duration to `phase` of the current request.
+    Outside a request (management commands, pool workers) it costs one ContextVar lookup.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.add(phase, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def timed_model(func):
+    """Like timed('model'), and also counts the operating points the model evaluated."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        timings = _current.get()
+        if timings is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        results = func(*args, **kwargs)
+        timings.add('model', time.perf_counter() - start)
+        # Batch results are arrays; the scalar model returns one point
+        timings.points += getattr(results['efficiency'], 'size', 1)
+        return results
+    return wrapper
+
+
+class LatencyStats:
+    """
+    Per-view request counts, latency histograms and mean phase times, kept in process memory.
+    Memory is bounded by the number of views; updates take a lock for a few dict operations.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, total_seconds, timings):
+        total_ms = total_seconds * 1000.0
+        bucket = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if total_ms <= bound:
+                bucket = i
+                break
+
+        with self._lock:
+            view = self._views.get(view_name)
+            if view is None:
+                view = self._views[view_name] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'points': 0, 'queries': 0,
+                    'phase_ms': {}, 'histogram': [0] * (len(self.buckets) + 1),
+                }
+            view['count'] += 1
+            view['total_ms'] += total_ms
+            view['max_ms'] = max(view['max_ms'], total_ms)
+            view['points'] += timings.points
+            view['queries'] += timings.calls('db')
+            view['histogram'][bucket] += 1
+            for phase, (seconds, _) in timings.phases.items():
+                view['phase_ms'][phase] = view['phase_ms'].get(phase, 0.0) + seconds * 1000.0
+
+    def snapshot(self):
+        with self._lock:
+            views = {name: {**view, 'phase_ms': dict(view['phase_ms']), 'histogram': list(view['histogram'])}
+                     for name, view in self._views.items()}
+
+        labels = [f"<={bound}ms" for bound in self.buckets] + [f">{self.buckets[-1]}ms"]
+        report = {}
+        for name, view in sorted(views.items()):
+            count = view['count']
+            report[name] = {
+                'count': count,
+                'mean_ms': view['total_ms'] / count,
+                'max_ms': view['max_ms'],
+                'mean_phase_ms': {phase: total / count for phase, total in sorted(view['phase_ms'].items())},
+                'mean_points': view['points'] / count,
+                'mean_queries': view['queries'] / count,
+                'histogram': dict(zip(labels, view['histogram'])),
+            }
+        return report
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+
+# One per process, shared by all requests
+latency_stats = LatencyStats()
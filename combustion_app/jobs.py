@@ -0,0 +1,198 @@
+# combustion_app/jobs.py
+import os
+import time
+import traceback
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .furnace_model import DEFAULT_FIDELITY
+from .models import Fuel, ModelCalibration, SimulationJob
+from .sweeps import (run_parametric_sweep, run_adaptive_sweep, run_grid_sweep, grid_payload, SAMPLING_ADAPTIVE,
+                     DEFAULT_ADAPTIVE_TOLERANCE)
+from .ingest import open_text_stream, run_validation_stream, validation_chart_data
+from .telemetry import replay_telemetry, telemetry_chart_data
+
+# Minimum seconds between progress writes from a running job
+PROGRESS_INTERVAL = 0.5
+
+# Seconds without a heartbeat after which a running job is assumed to have lost its worker
+DEFAULT_STALE_AFTER = 3600
+
+
+def submit_job(kind, cleaned_data, input_file=None):
+    """
+    Queues a job from a form's cleaned_data. The fuel is stored by id,
+    uploads are saved to MEDIA_ROOT so the worker can read them.
+    """
+    params = {
+        key: value for key, value in cleaned_data.items()
+        if key not in ('fuel', 'validation_file', 'telemetry_file', 'run_in_background')
+    }
+    params['fuel_id'] = cleaned_data['fuel'].pk
+
+    job = SimulationJob(kind=kind, params=params)
+    if input_file is not None:
+        job.input_file.save(os.path.basename(input_file.name), input_file, save=False)
+    job.save()
+    return job
+
+
+def claim_next_job():
+    """
+    Atomically moves the oldest queued job to running and returns its id (or None).
+    The conditional UPDATE makes this safe with several workers on one database.
+    """
+    for job_id in SimulationJob.objects.filter(
+            status=SimulationJob.STATUS_QUEUED).values_list('id', flat=True)[:10]:
+        now = timezone.now()
+        claimed = SimulationJob.objects.filter(
+            id=job_id, status=SimulationJob.STATUS_QUEUED
+        ).update(status=SimulationJob.STATUS_RUNNING, started_at=now, heartbeat_at=now)
+        if claimed:
+            return job_id
+    return None
+
+
+def fail_stale_jobs(stale_after=None):
+    """
+    Marks running jobs with no heartbeat (claim or progress write) for `stale_after` seconds
+    (COMBUSTION_JOBS['STALE_AFTER']) as failed, so a job whose worker died does not show as
+    running forever, while a long job that still reports progress is left alone.
+    Returns the number of jobs failed.
+    """
+    if stale_after is None:
+        stale_after = getattr(settings, 'COMBUSTION_JOBS', {}).get('STALE_AFTER', DEFAULT_STALE_AFTER)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale_ids = list(SimulationJob.objects.filter(status=SimulationJob.STATUS_RUNNING).annotate(
+        last_seen=Coalesce('heartbeat_at', 'started_at')).filter(last_seen__lt=cutoff).values_list('id', flat=True))
+    if not stale_ids:
+        return 0
+    failed = SimulationJob.objects.filter(id__in=stale_ids, status=SimulationJob.STATUS_RUNNING).update(
+        status=SimulationJob.STATUS_FAILED,
+        error=f"The job reported no progress for {stale_after:g} seconds; its worker probably stopped.",
+        finished_at=timezone.now(),
+    )
+    for job_id in stale_ids:
+        discard_job_input(job_id)
+    return failed
+
+
+def discard_job_input(job_id):
+    """Deletes a finished job's uploaded input file; it is only needed while the job runs."""
+    job = SimulationJob.objects.filter(id=job_id).exclude(input_file='').first()
+    if job is not None:
+        job.input_file.delete(save=False)
+        SimulationJob.objects.filter(id=job_id).update(input_file='')
+
+
+class ProgressReporter:
+    """
+    Writes job progress, and with it the job's heartbeat, to the database,
+    at most every PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.last_write = 0.0
+
+    def __call__(self, fraction):
+        now = time.monotonic()
+        if now - self.last_write >= PROGRESS_INTERVAL:
+            SimulationJob.objects.filter(id=self.job_id).update(
+                progress=min(max(fraction, 0.0), 1.0), heartbeat_at=timezone.now())
+            self.last_write = now
+
+
+# --- Job Handlers ---
+# Each returns a JSON-serializable result: {'chart_data': ..., 'summary': ...}
+
+def _run_analysis(job, fuel, params, progress):
+    sweep_args = (
+        fuel, params['variable_to_sweep'],
+        params['start_value'], params['end_value'], params['steps'],
+        params['constant_moisture'], params['constant_excess_air'], params['constant_load'],
+    )
+    options = dict(x_axis_label=params.get('x_axis_label'), fidelity=params.get('fidelity') or DEFAULT_FIDELITY)
+    if params.get('sampling') == SAMPLING_ADAPTIVE:
+        return {'chart_data': run_adaptive_sweep(
+            *sweep_args, tolerance=params.get('tolerance') or DEFAULT_ADAPTIVE_TOLERANCE, **options)}
+    return {'chart_data': run_parametric_sweep(*sweep_args, **options)}
+
+
+def _run_grid_analysis(job, fuel, params, progress):
+    moisture_values = np.linspace(params['moisture_start'], params['moisture_end'], params['moisture_steps'])
+    excess_air_values = np.linspace(params['excess_air_start'], params['excess_air_end'], params['excess_air_steps'])
+    grid = run_grid_sweep(fuel, moisture_values, excess_air_values, params['loads'],
+                          fidelity=params.get('fidelity') or DEFAULT_FIDELITY)
+    return {'chart_data': grid_payload(grid)}
+
+
+def _run_validation(job, fuel, params, progress):
+    size = job.input_file.size or 1
+    with job.input_file.open('rb') as raw:
+        stream = open_text_stream(raw)
+        summary = run_validation_stream(
+            fuel, params['constant_moisture'], params['constant_load'], stream,
+            progress_callback=lambda rows: progress(raw.tell() / size),
+        )
+    chart_data = validation_chart_data(summary)
+    summary.pop('points')
+    return {'chart_data': chart_data, 'summary': summary}
+
+
+def _run_telemetry(job, fuel, params, progress):
+    size = job.input_file.size or 1
+    with job.input_file.open('rb') as raw:
+        stream = open_text_stream(raw)
+        summary = replay_telemetry(
+            fuel, stream, params['window_seconds'],
+            fidelity=params.get('fidelity') or DEFAULT_FIDELITY,
+            progress_callback=lambda rows: progress(raw.tell() / size),
+        )
+    chart_data = telemetry_chart_data(summary)
+    summary.pop('series')
+    return {'chart_data': chart_data, 'summary': summary}
+
+
+JOB_HANDLERS = {
+    SimulationJob.KIND_ANALYSIS: _run_analysis,
+    SimulationJob.KIND_GRID_ANALYSIS: _run_grid_analysis,
+    SimulationJob.KIND_VALIDATION: _run_validation,
+    SimulationJob.KIND_TELEMETRY: _run_telemetry,
+}
+
+
+def execute_job(job_id):
+    """
+    Runs one claimed job to completion and stores its result or error.
+    This is the function the worker's process pool executes.
+    """
+    close_old_connections()
+    job = SimulationJob.objects.get(id=job_id)
+    try:
+        fuel = Fuel.objects.get(pk=job.params['fuel_id'])
+        fuel.model_params = ModelCalibration.active_params([fuel.pk]).get(fuel.pk)
+        result = JOB_HANDLERS[job.kind](job, fuel, job.params, ProgressReporter(job.id))
+    except Exception as e:
+        SimulationJob.objects.filter(id=job.id).update(
+            status=SimulationJob.STATUS_FAILED,
+            error=f"{e}\n\n{traceback.format_exc()}",
+            finished_at=timezone.now(),
+        )
+        discard_job_input(job.id)
+        return SimulationJob.STATUS_FAILED
+
+    SimulationJob.objects.filter(id=job.id).update(
+        status=SimulationJob.STATUS_SUCCEEDED,
+        result=result,
+        progress=1.0,
+        finished_at=timezone.now(),
+    )
+    discard_job_input(job.id)
+    return SimulationJob.STATUS_SUCCEEDED
+
@@ -0,0 +1,40 @@
+# combustion_app/management/commands/build_surrogates.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from combustion_app.catalogue import get_fuel_catalogue
+from combustion_app.furnace_model import DEFAULT_FIDELITY, FIDELITIES
+from combustion_app.surrogate import get_surrogate_store
+
+
+class Command(BaseCommand):
+    help = ("Builds the memory-mapped lookup tables used for real-time scoring, so the first "
+            "queries after a deployment or fuel edit do not have to.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fuel', type=int, action='append', dest='fuel_ids',
+                            help="Only this fuel id (repeatable). Defaults to every fuel.")
+        parser.add_argument('--fidelity', choices=FIDELITIES, default=DEFAULT_FIDELITY,
+                            help="Model fidelity the tables are computed at.")
+        parser.add_argument('--force', action='store_true', help="Rebuild tables that are already current.")
+
+    def handle(self, *args, **options):
+        catalogue = get_fuel_catalogue()
+        if options['fuel_ids']:
+            fuels = catalogue.in_bulk(options['fuel_ids'])
+            missing = [str(fuel_id) for fuel_id in options['fuel_ids'] if fuel_id not in fuels]
+            if missing:
+                raise CommandError("Unknown fuel id(s): " + ", ".join(missing) + ".")
+            fuels = list(fuels.values())
+        else:
+            fuels = catalogue.all()
+
+        store = get_surrogate_store()
+        for fuel in fuels:
+            started = time.perf_counter()
+            fidelity = options['fidelity']
+            table = store.build(fuel, fidelity) if options['force'] else store.table(fuel, fidelity)
+            self.stdout.write(f"{fuel.name}: {table.coverage:.1%} of the grid within tolerance "
+                              f"({time.perf_counter() - started:.2f} s)")
+        self.stdout.write(f"Tables are in {store.directory}.")
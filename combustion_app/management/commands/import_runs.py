@@ -0,0 +1,40 @@
+# combustion_app/management/commands/import_runs.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from combustion_app.runs import IMPORT_CHUNK_SIZE, import_runs
+
+
+class Command(BaseCommand):
+    help = "Imports historical furnace runs from CSV or JSONL, calculating results in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for standard input.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="Input format. Defaults to the file extension (csv for standard input).")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                            help="Rows evaluated and inserted per transaction.")
+        parser.add_argument('--name', default="Imported Run",
+                            help="Run name for rows without a 'name' column.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        try:
+            report = import_runs(stream, file_format, default_name=options['name'], chunk_size=options['chunk_size'])
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in report['errors']:
+            self.stderr.write(error)
+        self.stdout.write(f"Imported {report['created']} run(s), skipped {report['bad_rows']} row(s).")
@@ -0,0 +1,85 @@
+# combustion_app/management/commands/run_benchmarks.py
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from combustion_app.benchmarks import (
+    DEFAULT_DATASET_RUNS, DEFAULT_THRESHOLD, compare_to_baseline, generate_dataset, run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = ("Benchmarks the model, sweeps, CSV validation and every page against a generated "
+            "SQLite dataset (your own database is not touched) and writes the results as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--baseline', help="Compare against a JSON report from an earlier run.")
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="Relative slowdown that counts as a regression (default 0.2 = 20%%).")
+        parser.add_argument('--runs', type=int, default=DEFAULT_DATASET_RUNS,
+                            help="FurnaceRun rows in the generated dataset.")
+        parser.add_argument('--quick', action='store_true', help="Smaller sizes and fewer repeats (a smoke test).")
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help="Exit with an error if any result regressed against the baseline.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline: {e}")
+
+        report = self._run_in_scratch_database(options)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            self.stdout.write(f"Report written to {options['output']}.")
+
+        if baseline is None:
+            for key, result in sorted(report['results'].items()):
+                self.stdout.write(f"{key:45s} {result['value']:14.3f} {result['unit']}")
+        else:
+            self._print_comparison(report, baseline, options)
+
+        for name in report['skipped_urls']:
+            self.stderr.write(f"No benchmark request defined for URL '{name}'.")
+
+    def _run_in_scratch_database(self, options):
+        """Migrates a throwaway SQLite file, fills it with the generated dataset and benchmarks it."""
+        with tempfile.TemporaryDirectory() as scratch:
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(scratch, 'benchmark.sqlite3')
+            setup_test_environment(debug=False)
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                self.stdout.write(f"Generating {options['runs']} runs...")
+                generate_dataset(options['runs'])
+                return run_benchmarks(
+                    quick=options['quick'], progress=lambda name: self.stdout.write(f"Running {name}...")
+                )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+    def _print_comparison(self, report, baseline, options):
+        regressions = 0
+        for key, previous, current, change, status in compare_to_baseline(report, baseline, options['threshold']):
+            if change is None:
+                self.stdout.write(f"{key:45s} {'':>12s} {current:12.3f}   new")
+                continue
+            line = f"{key:45s} {previous:12.3f} {current:12.3f} {change:+8.1%}   {status}"
+            if status == 'regression':
+                regressions += 1
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{regressions} benchmark(s) regressed by more than {options['threshold']:.0%}.")
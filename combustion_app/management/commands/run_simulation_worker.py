@@ -0,0 +1,105 @@
+# combustion_app/management/commands/run_simulation_worker.py
+import multiprocessing
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from combustion_app.jobs import claim_next_job, discard_job_input, execute_job, fail_stale_jobs
+from combustion_app import pool as job_pool
+from combustion_app.models import SimulationJob
+
+
+class Command(BaseCommand):
+    help = "Runs queued simulation jobs (sweeps, validations) on a local process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help="Number of worker processes. 0 runs jobs inline in this process.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to wait between checks for new jobs.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is empty instead of polling forever.")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        if workers == 0:
+            self._run_inline(options)
+            return
+
+        pool = job_pool.make_process_pool(workers)
+        self.stdout.write(f"Simulation worker started with {workers} process(es).")
+        running = {}
+        try:
+            while True:
+                self._fail_stale_jobs()
+                while len(running) < workers:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    try:
+                        future = pool.submit(job_pool.execute_job, job_id)
+                    except BrokenProcessPool:
+                        # A worker process died since the last check
+                        pool = self._replace_broken_pool(pool, running, workers)
+                        future = pool.submit(job_pool.execute_job, job_id)
+                    running[future] = job_id
+                    self.stdout.write(f"Job #{job_id} started.")
+
+                if not running:
+                    if options['once']:
+                        break
+                    connections.close_all()
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    self._report(job_id, future)
+                if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                    pool = self._replace_broken_pool(pool, running, workers)
+        finally:
+            pool.shutdown()
+
+    def _run_inline(self, options):
+        while True:
+            self._fail_stale_jobs()
+            job_id = claim_next_job()
+            if job_id is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll_interval'])
+                continue
+            self.stdout.write(f"Job #{job_id} {execute_job(job_id)}.")
+
+    def _replace_broken_pool(self, pool, running, workers):
+        """
+        A process pool breaks when one of its processes dies (e.g. out of memory), failing every
+        job it was running. Reports those jobs and returns a fresh pool for the rest of the queue.
+        """
+        for future in wait(running).done:
+            self._report(running.pop(future), future)
+        pool.shutdown(wait=False)
+        self.stderr.write("A worker process died; restarting the process pool.")
+        return job_pool.make_process_pool(workers)
+
+    def _report(self, job_id, future):
+        try:
+            self.stdout.write(f"Job #{job_id} {future.result()}.")
+        except Exception as e:
+            # The worker process itself died (e.g. out of memory). A job that had already
+            # stored its result before that keeps it.
+            SimulationJob.objects.filter(id=job_id, status=SimulationJob.STATUS_RUNNING).update(
+                status=SimulationJob.STATUS_FAILED, error=str(e), finished_at=timezone.now()
+            )
+            discard_job_input(job_id)
+            self.stderr.write(f"Job #{job_id} crashed: {e}")
+
+    def _fail_stale_jobs(self):
+        failed = fail_stale_jobs()
+        if failed:
+            self.stderr.write(f"Marked {failed} stale running job(s) as failed.")
@@ -0,0 +1,89 @@
+# combustion_app/management/commands/simulate.py
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from combustion_app.catalogue import get_fuel_catalogue
+from combustion_app.furnace_model import BATCH_RESULT_KEYS, DEFAULT_FIDELITY, FIDELITIES
+from combustion_app.pool import get_compute_pool
+from combustion_app.runs import MAX_REPORTED_ERRORS
+from combustion_app.scoring import DEFAULT_PRECISION, DEFAULT_SCORING_CHUNK, SCORING_FORMATS, ProfileTable, score_stream
+
+
+class Command(BaseCommand):
+    help = ("Scores operating points from CSV or JSONL (a file or standard input) and streams the "
+            "results to standard output, without storing runs. For example: "
+            "python manage.py simulate points.csv --output-format jsonl --workers 4 > results.jsonl")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Input file, or '-' (default) for standard input.")
+        parser.add_argument('--format', choices=SCORING_FORMATS,
+                            help="Input format. Defaults to the file extension (csv for standard input).")
+        parser.add_argument('--output-format', choices=SCORING_FORMATS,
+                            help="Output format. Defaults to the input format.")
+        parser.add_argument('--outputs', default=','.join(BATCH_RESULT_KEYS),
+                            help="Comma-separated results to write (default: all).")
+        parser.add_argument('--fidelity', choices=FIDELITIES, default=DEFAULT_FIDELITY)
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_SCORING_CHUNK,
+                            help="Input lines evaluated per batch model call.")
+        parser.add_argument('--workers', type=int, default=0,
+                            help="Worker processes scoring chunks (default 0: score in this process).")
+        parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                            help=f"Significant digits of numbers written (default {DEFAULT_PRECISION}; "
+                                 f"0 for the shortest exact representation).")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        output_format = options['output_format'] or input_format
+        outputs = [name.strip() for name in options['outputs'].split(',') if name.strip()]
+        unknown = [name for name in outputs if name not in BATCH_RESULT_KEYS]
+        if unknown or not outputs:
+            raise CommandError("Unknown output(s): " + ", ".join(unknown) + ". Choose from: "
+                               + ", ".join(BATCH_RESULT_KEYS) + ".")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        if options['workers'] < 0:
+            raise CommandError("--workers cannot be negative.")
+
+        # The only database access: fuels (with their active calibrations) are loaded once
+        table = ProfileTable(get_fuel_catalogue().all())
+        pool = get_compute_pool(options['workers']) if options['workers'] else None
+
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        reported = []
+
+        def report_errors(errors):
+            for error in errors[:MAX_REPORTED_ERRORS - len(reported)]:
+                reported.append(error)
+                self.stderr.write(error)
+
+        started = time.perf_counter()
+        try:
+            scored, skipped = score_stream(
+                stream, table, lambda text: self.stdout.write(text, ending=''),
+                file_format=input_format, output_format=output_format, outputs=outputs,
+                fidelity=options['fidelity'], precision=options['precision'] or None,
+                chunk_size=options['chunk_size'], pool=pool, max_pending=2 * options['workers'] or 1,
+                on_errors=report_errors,
+            )
+            self.stdout.flush()
+        except ValueError as e:
+            raise CommandError(str(e))
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`): stop quietly, as other shell tools do
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        seconds = time.perf_counter() - started
+        self.stderr.write(f"Scored {scored} point(s), skipped {skipped} row(s) in {seconds:.2f} s "
+                          f"({scored / max(seconds, 1e-9):,.0f} points/s).")
@@ -0,0 +1,131 @@
+# combustion_app/middleware.py
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .instrumentation import end_request, latency_stats, start_request
+
+logger = logging.getLogger('combustion_app.timing')
+
+DEFAULT_SLOW_REQUEST_MS = 1000
+
+# Phases reported in the Server-Timing header, in order
+SERVER_TIMING_PHASES = ('model', 'db', 'serialize', 'render')
+
+
+class ServerTimingMiddleware:
+    """
+    Times each request and breaks it down into model evaluation, database queries,
+    chart JSON serialization and template rendering.
+
+    The breakdown goes out as a Server-Timing header (shown in the browser's network panel),
+    as one JSON log line on the 'combustion_app.timing' logger (WARNING for slow requests,
+    INFO otherwise) and into the per-view histograms served at /stats/timing/.
+    Streamed responses are timed up to the first byte.
+
+    Works in both sync and async stacks, so async views stay async under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        config = getattr(settings, 'COMBUSTION_INSTRUMENTATION', {})
+        if not config.get('ENABLED', True):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.header = config.get('SERVER_TIMING_HEADER', True)
+        self.slow_request_ms = config.get('SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = start_request()
+        start = time.perf_counter()
+        try:
+            with _timed_queries(timings):
+                response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, time.perf_counter() - start, timings)
+
+    async def __acall__(self, request):
+        timings, token = start_request()
+        start = time.perf_counter()
+        try:
+            with _timed_queries(timings):
+                response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, time.perf_counter() - start, timings)
+
+    def _finish(self, request, response, total, timings):
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        latency_stats.record(view_name, total, timings)
+
+        if self.header:
+            response['Server-Timing'] = server_timing_header(timings, total)
+        self._log(request, response, view_name, total, timings)
+        return response
+
+    def _log(self, request, response, view_name, total, timings):
+        total_ms = total * 1000.0
+        level = logging.WARNING if total_ms >= self.slow_request_ms else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(level, json.dumps({
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 3),
+            'points': timings.points,
+            'queries': timings.calls('db'),
+            **{f'{phase}_ms': round(seconds * 1000.0, 3) for phase, (seconds, _) in timings.phases.items()},
+        }))
+
+
+def _timed_queries(timings):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(_QueryTimer(timings)))
+    return stack
+
+
+class _QueryTimer:
+    """Database execute wrapper that adds every query's duration to the request's 'db' phase."""
+
+    def __init__(self, timings):
+        self.timings = timings
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.timings.add('db', time.perf_counter() - start)
+
+
+def server_timing_header(timings, total):
+    metrics = []
+    for phase in SERVER_TIMING_PHASES:
+        if phase not in timings.phases:
+            continue
+        seconds, calls = timings.phases[phase]
+        metric = f'{phase};dur={seconds * 1000.0:.2f}'
+        if phase == 'model':
+            metric += f';desc="{timings.points} points"'
+        elif phase == 'db':
+            metric += f';desc="{calls} queries"'
+        metrics.append(metric)
+    metrics.append(f'total;dur={total * 1000.0:.2f}')
+    return ', '.join(metrics)
@@ -19,8 +19,7 @@ def create_initial_fuels(apps, schema_editor):
         N=0.005,
         S=0.005,
         Ash=0.20,
-        hhv_mj_kg=16.0,
-        cost_per_tonne=50.0
+        hhv_mj_kg=16.0
     )
 
     # Fuel 2: Wood Chips
@@ -32,8 +31,7 @@ def create_initial_fuels(apps, schema_editor):
         N=0.002,
         S=0.001,
         Ash=0.01,
-        hhv_mj_kg=19.5,
-        cost_per_tonne=50.0
+        hhv_mj_kg=19.5
     )
     
     # Fuel 3: Sugarcane Bagasse
@@ -45,8 +43,7 @@ def create_initial_fuels(apps, schema_editor):
         N=0.003,
         S=0.001,
         Ash=0.02,
-        hhv_mj_kg=17.5,
-        cost_per_tonne=50.0
+        hhv_mj_kg=17.5
     )
 
 def remove_initial_fuels(apps, schema_editor):
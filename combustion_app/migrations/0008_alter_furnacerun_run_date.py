@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combustion_app', '0007_simulationjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='furnacerun',
+            name='run_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
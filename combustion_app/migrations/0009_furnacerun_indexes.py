@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combustion_app', '0008_alter_furnacerun_run_date'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='furnacerun',
+            index=models.Index(fields=['-run_date', '-id'], name='furnacerun_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='furnacerun',
+            index=models.Index(fields=['fuel', '-run_date', '-id'], name='furnacerun_fuel_date_idx'),
+        ),
+    ]
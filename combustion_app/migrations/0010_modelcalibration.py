@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combustion_app', '0009_furnacerun_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelCalibration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='Plant Calibration', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('parameters', models.JSONField(default=dict)),
+                ('fitted', models.JSONField(default=list)),
+                ('standard_errors', models.JSONField(default=dict)),
+                ('rows', models.IntegerField(default=0, verbose_name='Rows Fitted')),
+                ('moisture_percent', models.FloatField(verbose_name='Moisture (%)')),
+                ('furnace_load_gj_hour', models.FloatField(verbose_name='Furnace Load (GJ/hr)')),
+                ('rmse_before', models.FloatField(blank=True, null=True, verbose_name='RMS Error Before (%)')),
+                ('rmse_after', models.FloatField(blank=True, null=True, verbose_name='RMS Error After (%)')),
+                ('is_active', models.BooleanField(default=False)),
+                ('fuel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calibrations', to='combustion_app.fuel')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('fuel',), name='one_active_calibration_per_fuel')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combustion_app', '0010_modelcalibration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fuel',
+            name='is_blend',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.CreateModel(
+            name='FuelBlendComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mass_fraction', models.FloatField(verbose_name='Mass Fraction (0-1)')),
+                ('blend', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blend_components', to='combustion_app.fuel')),
+                ('component', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='used_in_blends', to='combustion_app.fuel')),
+            ],
+            options={
+                'ordering': ['-mass_fraction', 'id'],
+                'constraints': [models.UniqueConstraint(fields=('blend', 'component'), name='unique_blend_component')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('combustion_app', '0011_fuel_blends'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='simulationjob',
+            name='kind',
+            field=models.CharField(choices=[('analysis', 'Parametric Analysis'), ('grid_analysis', 'Grid Analysis'), ('validation', 'Model Validation'), ('telemetry', 'Telemetry Replay')], max_length=30),
+        ),
+    ]
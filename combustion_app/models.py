@@ -1,5 +1,6 @@
 # combustion_app/models.py
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 class Fuel(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -16,6 +17,13 @@ class Fuel(models.Model):
     hhv_mj_kg = models.FloatField(default=16.0, verbose_name="HHV (MJ/kg)")
     cost_per_tonne = models.FloatField(default=50.0, verbose_name="Cost (₹/tonne)") # <-- NEW
 
+    # Blends get their properties mass-weighted from FuelBlendComponent rows (see blends.py)
+    is_blend = models.BooleanField(default=False, editable=False)
+
+    # Calibrated ModelParameters, or None for the model defaults.
+    # Set on the fuel catalogue's Fuel objects from the fuel's active ModelCalibration.
+    model_params = None
+
     def __str__(self):
         return self.name
 
@@ -25,10 +33,34 @@ class Fuel(models.Model):
             'N': self.N, 'S': self.S, 'Ash': self.Ash
         }
 
+    def get_profile(self):
+        # Compiled, immutable snapshot with the fuel-only model terms precomputed
+        from .furnace_model import compile_fuel_profile
+        return compile_fuel_profile(self)
+
+
+class FuelBlendComponent(models.Model):
+    """One component fuel of a blend and its share of the blend's (dry) mass."""
+
+    blend = models.ForeignKey(Fuel, on_delete=models.CASCADE, related_name='blend_components')
+    # Components cannot be deleted while a blend is made from them
+    component = models.ForeignKey(Fuel, on_delete=models.PROTECT, related_name='used_in_blends')
+    mass_fraction = models.FloatField(verbose_name="Mass Fraction (0-1)")
+
+    class Meta:
+        ordering = ['-mass_fraction', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['blend', 'component'], name='unique_blend_component'),
+        ]
+
+    def __str__(self):
+        return f"{self.mass_fraction:.0%} {self.component}"
+
 
 class FurnaceRun(models.Model):
     name = models.CharField(max_length=100, default="Simulation Run")
-    run_date = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add, so bulk imports can keep historical dates
+    run_date = models.DateTimeField(default=timezone.now, editable=False)
     
     # --- Input Parameters ---
     fuel = models.ForeignKey(Fuel, on_delete=models.SET_NULL, null=True)
@@ -46,6 +78,13 @@ class FurnaceRun(models.Model):
     emissions_co_ppm = models.FloatField(null=True, blank=True, verbose_name="CO (ppm)") 
     emissions_nox_ppm = models.FloatField(null=True, blank=True, verbose_name="NOx (ppm)") 
 
+    class Meta:
+        indexes = [
+            # History is listed newest first and paged by (run_date, id)
+            models.Index(fields=['-run_date', '-id'], name='furnacerun_date_idx'),
+            models.Index(fields=['fuel', '-run_date', '-id'], name='furnacerun_fuel_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.run_date.strftime('%Y-%m-%d %H:%M')}"
 
@@ -54,11 +93,15 @@ class FurnaceRun(models.Model):
         if not self.fuel:
             return None
             
-        from .furnace_model import run_combustion_model
-        
-        # 1. Run the core model
-        results = run_combustion_model(
-            self.fuel,
+        from .cache import cached_combustion_model
+        from .catalogue import get_fuel_catalogue
+
+        # The catalogue's copy carries the fuel's active calibration; the foreign key's does not
+        fuel = get_fuel_catalogue().get(self.fuel_id) or self.fuel
+
+        # 1. Run the core model (memoized on fuel + inputs)
+        results = cached_combustion_model(
+            fuel,
             self.moisture_percent, 
             self.excess_air_percent,
             self.furnace_load_gj_hour # Pass new input
@@ -76,4 +119,112 @@ class FurnaceRun(models.Model):
         
         # 3. Save the model instance
         self.save() 
-        return results
\ No newline at end of file
+        return results
+
+class SimulationJob(models.Model):
+    """A long-running sweep, validation or telemetry replay, run by the `run_simulation_worker` command."""
+
+    KIND_ANALYSIS = 'analysis'
+    KIND_GRID_ANALYSIS = 'grid_analysis'
+    KIND_VALIDATION = 'validation'
+    KIND_TELEMETRY = 'telemetry'
+    KIND_CHOICES = [
+        (KIND_ANALYSIS, 'Parametric Analysis'),
+        (KIND_GRID_ANALYSIS, 'Grid Analysis'),
+        (KIND_VALIDATION, 'Model Validation'),
+        (KIND_TELEMETRY, 'Telemetry Replay'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    params = models.JSONField(default=dict)
+    input_file = models.FileField(upload_to='job_inputs/', blank=True)
+    
+    progress = models.FloatField(default=0.0, verbose_name="Progress (0-1)")
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Last sign of life from the worker running the job: the claim, then each progress write
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} job #{self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+
+class ModelCalibration(models.Model):
+    """Model parameters fitted to a fuel's plant data (see calibration.py)."""
+
+    fuel = models.ForeignKey(Fuel, on_delete=models.CASCADE, related_name='calibrations')
+    name = models.CharField(max_length=100, default="Plant Calibration")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Every ModelParameters value ({name: value}), fitted or not, and the names that were fitted
+    parameters = models.JSONField(default=dict)
+    fitted = models.JSONField(default=list)
+    standard_errors = models.JSONField(default=dict)
+
+    # Conditions and quality of the fit
+    rows = models.IntegerField(default=0, verbose_name="Rows Fitted")
+    moisture_percent = models.FloatField(verbose_name="Moisture (%)")
+    furnace_load_gj_hour = models.FloatField(verbose_name="Furnace Load (GJ/hr)")
+    rmse_before = models.FloatField(null=True, blank=True, verbose_name="RMS Error Before (%)")
+    rmse_after = models.FloatField(null=True, blank=True, verbose_name="RMS Error After (%)")
+
+    # The active calibration (at most one per fuel) is used by every later simulation of the fuel
+    is_active = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['fuel'], condition=models.Q(is_active=True),
+                                    name='one_active_calibration_per_fuel'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.fuel}) - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
+
+    def get_model_params(self):
+        from .furnace_model import ModelParameters
+        return ModelParameters.from_dict(self.parameters)
+
+    def activate(self):
+        """Makes this the fuel's calibration, replacing the previously active one."""
+        with transaction.atomic():
+            ModelCalibration.objects.filter(fuel_id=self.fuel_id, is_active=True).exclude(pk=self.pk) \
+                .update(is_active=False)
+            self.is_active = True
+            self.save(update_fields=['is_active'])
+
+    def deactivate(self):
+        """Returns the fuel to the model defaults."""
+        self.is_active = False
+        self.save(update_fields=['is_active'])
+
+    @classmethod
+    def active_params(cls, fuel_ids=None):
+        """{fuel id: ModelParameters} of the active calibrations, optionally for some fuels only."""
+        calibrations = cls.objects.filter(is_active=True)
+        if fuel_ids is not None:
+            calibrations = calibrations.filter(fuel_id__in=fuel_ids)
+        return {calibration.fuel_id: calibration.get_model_params() for calibration in calibrations}
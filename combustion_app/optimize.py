@@ -0,0 +1,92 @@
+# combustion_app/optimize.py
+import numpy as np
+
+from .furnace_model import stack_fuel_profiles, run_combustion_model_batch
+
+# objective name -> (model output, sign); the search minimises sign * output
+OBJECTIVES = {
+    'min_cost': ('cost_per_gj', 1.0),
+    'max_efficiency': ('efficiency', -1.0),
+}
+
+# Model outputs reported for each optimum
+OPTIMUM_OUTPUTS = ('efficiency', 'cost_per_gj', 'emissions_co_ppm', 'emissions_nox_ppm', 't_adiabatic_c')
+
+
+def search_excess_air(profile, n_rows, moisture_percent, furnace_load_gj_hour, objective='min_cost',
+                      co_limit_ppm=None, nox_limit_ppm=None, excess_air_min=0.0, excess_air_max=200.0,
+                      grid_points=33, tolerance=0.01, max_iterations=20):
+    """
+    Finds the excess air (%) that optimises `objective` for each of `n_rows` fuels, subject to CO and NOx limits.
+    `profile` has one property row per fuel (shape (n_rows, 1)), e.g. from stack_fuel_profiles.
+
+    Batched bracketing search: every iteration evaluates `grid_points` candidates per fuel in one
+    vectorized call, keeps the best feasible candidate, and narrows each fuel's bracket to its two
+    neighbours. The bracket shrinks by about (grid_points - 1) / 2 per iteration, so the optimum
+    (including one that sits on a constraint boundary) is found to `tolerance` in a few iterations.
+
+    Returns (feasible, best excess air, model results at the optimum (n_rows, 1), evaluations);
+    rows without a feasible point have a NaN excess air.
+    """
+    output_key, sign = OBJECTIVES[objective]
+    lo = np.full(n_rows, float(excess_air_min))
+    hi = np.full(n_rows, float(excess_air_max))
+    feasible_found = np.ones(n_rows, dtype=bool)
+    best_x = np.full(n_rows, np.nan)
+    steps = np.linspace(0.0, 1.0, grid_points)
+    rows = np.arange(n_rows)
+    evaluations = 0
+
+    for _ in range(max_iterations):
+        x = lo[:, None] + (hi - lo)[:, None] * steps[None, :]
+        results = run_combustion_model_batch(profile, moisture_percent, x, furnace_load_gj_hour)
+        evaluations += x.size
+
+        # Infeasible: a constraint is violated or the point produces no useful heat
+        feasible = results['efficiency'] > 0
+        if co_limit_ppm is not None:
+            feasible &= results['emissions_co_ppm'] <= co_limit_ppm
+        if nox_limit_ppm is not None:
+            feasible &= results['emissions_nox_ppm'] <= nox_limit_ppm
+        score = np.where(feasible, sign * results[output_key], np.inf)
+
+        best = np.argmin(score, axis=1)
+        feasible_found &= np.isfinite(score[rows, best])
+        best_x = np.where(feasible_found, x[rows, best], np.nan)
+
+        # Narrow each bracket to the neighbours of its best candidate
+        lo = np.where(feasible_found, x[rows, np.maximum(best - 1, 0)], lo)
+        hi = np.where(feasible_found, x[rows, np.minimum(best + 1, grid_points - 1)], hi)
+        if not feasible_found.any() or np.max((hi - lo)[feasible_found]) < tolerance:
+            break
+
+    final = run_combustion_model_batch(profile, moisture_percent, np.nan_to_num(best_x)[:, None], furnace_load_gj_hour)
+    evaluations += n_rows
+    return feasible_found, best_x, final, evaluations
+
+
+def optimize_excess_air(fuels, moisture_percent, furnace_load_gj_hour, objective='min_cost', **search):
+    """
+    Optimal excess air for each fuel (see search_excess_air for the search and its options).
+    """
+    fuels = list(fuels)
+    n_fuels = len(fuels)
+    # One row per fuel, candidates along the columns
+    profile = stack_fuel_profiles(fuels, np.arange(n_fuels)[:, None])
+    feasible_found, best_x, final, evaluations = search_excess_air(
+        profile, n_fuels, moisture_percent, furnace_load_gj_hour, objective, **search
+    )
+
+    optima = []
+    for i, fuel in enumerate(fuels):
+        row = {
+            'fuel_id': fuel.pk,
+            'fuel_name': fuel.name,
+            'feasible': bool(feasible_found[i]),
+            'excess_air_percent': float(best_x[i]) if feasible_found[i] else None,
+        }
+        for key in OPTIMUM_OUTPUTS:
+            row[key] = float(final[key][i, 0]) if feasible_found[i] else None
+        optima.append(row)
+
+    return {'objective': objective, 'evaluations': evaluations, 'optima': optima}
@@ -0,0 +1,183 @@
+# combustion_app/pareto.py
+from bisect import bisect_right
+
+import numpy as np
+
+from .cache import get_result_cache
+from .furnace_model import compile_fuel_profile, run_combustion_model_batch
+
+# objective -> sign; the frontier minimises sign * output
+PARETO_OBJECTIVES = {
+    'cost_per_gj': 1.0,
+    'efficiency': -1.0,
+    'emissions_co_ppm': 1.0,
+    'emissions_nox_ppm': 1.0,
+}
+
+# Candidates compared against each other at once in the k-D filter (4+ objectives)
+BLOCK_SIZE = 256
+
+# Most frontier points sent to the chart; larger frontiers are thinned evenly
+MAX_PLOTTED_POINTS = 5000
+
+
+def pareto_mask(costs):
+    """
+    Boolean mask of the non-dominated rows of `costs` (n points x d objectives, all minimised).
+
+    Two and three objectives use O(n log n) sweeps. For more, points are sorted so that no
+    point can be dominated by one that comes after it, then filtered in blocks against the
+    frontier found so far: O(n * frontier size), which is O(n^2) when most points are on the
+    front (common with four objectives), so callers keep those grids small.
+    Exact duplicates are kept once.
+    """
+    costs = np.asarray(costs, dtype=float)
+    n, d = costs.shape
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+
+    if d == 2:
+        order = np.lexsort((costs[:, 1], costs[:, 0]))
+        second = costs[order, 1]
+        running_min = np.minimum.accumulate(second)
+        # Strictly better on the second objective than everything before it
+        frontier = np.r_[True, second[1:] < running_min[:-1]]
+        keep[order[frontier]] = True
+        return keep
+
+    if d == 3:
+        return _pareto_mask_3d(costs)
+
+    # Sorting by the sum of range-scaled objectives (ties: lexicographic) puts every
+    # dominating point before the points it dominates
+    span = np.ptp(costs, axis=0)
+    scaled = (costs - costs.min(axis=0)) / np.where(span > 0, span, 1.0)
+    order = np.lexsort(tuple(costs[:, ::-1].T) + (scaled.sum(axis=1),))
+    sorted_costs = costs[order]
+
+    front = np.empty((0, d))
+    front_index = []
+    for start in range(0, n, BLOCK_SIZE):
+        block = sorted_costs[start:start + BLOCK_SIZE]
+
+        # Drop candidates dominated by (or equal to) the frontier so far
+        if len(front):
+            dominated = _all_less_equal(front, block).any(axis=0)
+            block_ids = np.flatnonzero(~dominated)
+        else:
+            block_ids = np.arange(len(block))
+        candidates = block[block_ids]
+
+        # Then within the block: a candidate is beaten by an earlier one that is <= on every objective
+        earlier = np.triu(np.ones((len(candidates), len(candidates)), dtype=bool), k=1)
+        beaten = (_all_less_equal(candidates, candidates) & earlier).any(axis=0)
+
+        survivors = block_ids[~beaten]
+        front = np.vstack([front, block[survivors]])
+        front_index.extend(start + survivors)
+
+    keep[order[np.asarray(front_index, dtype=int)]] = True
+    return keep
+
+
+def _pareto_mask_3d(costs):
+    """
+    Three objectives in O(n log n): after a lexicographic sort only earlier points can dominate
+    a point, so one pass keeps the 2-D "staircase" of the points kept so far on the last two
+    objectives (ascending in the second, strictly descending in the third). A point is
+    dominated exactly when the staircase step at or left of its second objective is no higher
+    than its third.
+    """
+    order = np.lexsort((costs[:, 2], costs[:, 1], costs[:, 0]))
+    keep = np.zeros(len(costs), dtype=bool)
+    stair_y, stair_z = [], []
+    for index, y, z in zip(order.tolist(), costs[order, 1].tolist(), costs[order, 2].tolist()):
+        position = bisect_right(stair_y, y)
+        if position and stair_z[position - 1] <= z:
+            continue
+        keep[index] = True
+        # Remove the steps this point dominates: from `position` on, while they are no lower
+        end = position
+        while end < len(stair_z) and stair_z[end] >= z:
+            end += 1
+        stair_y[position:end] = [y]
+        stair_z[position:end] = [z]
+    return keep
+
+
+def _all_less_equal(a, b):
+    """result[i, j] is True when a[i] <= b[j] on every objective (built one objective at a time)."""
+    result = a[:, 0][:, None] <= b[:, 0][None, :]
+    for k in range(1, a.shape[1]):
+        result &= a[:, k][:, None] <= b[:, k][None, :]
+    return result
+
+
+def fuel_frontier(fuel, moisture_range, excess_air_range, steps, objectives, furnace_load_gj_hour=1.0):
+    """
+    Pareto frontier of one fuel over a steps x steps moisture x excess air grid.
+    Frontiers are memoized in the result cache per fuel, input range and objective set.
+    """
+    profile = compile_fuel_profile(fuel)
+    cache = get_result_cache()
+    key = cache.make_key(profile, 'pareto', (
+        tuple(moisture_range), tuple(excess_air_range), steps, tuple(objectives), furnace_load_gj_hour
+    ))
+    frontier = cache.get(key)
+    if frontier is not None:
+        return frontier
+
+    moisture = np.linspace(moisture_range[0], moisture_range[1], steps)
+    excess_air = np.linspace(excess_air_range[0], excess_air_range[1], steps)
+    results = run_combustion_model_batch(profile, moisture[:, None], excess_air[None, :], furnace_load_gj_hour)
+
+    # Points that produce no useful heat are not operating points
+    valid = (results['efficiency'] > 0).ravel()
+    costs = np.column_stack([PARETO_OBJECTIVES[name] * results[name].ravel() for name in objectives])[valid]
+    index = np.flatnonzero(valid)[pareto_mask(costs)]
+
+    rows, cols = np.unravel_index(index, (steps, steps))
+    frontier = {
+        'moisture_percent': moisture[rows],
+        'excess_air_percent': excess_air[cols],
+        **{name: results[name].ravel()[index] for name in PARETO_OBJECTIVES},
+        'grid_points': steps * steps,
+    }
+    cache.set(key, frontier)
+    return frontier
+
+
+def pareto_front(fuels, moisture_range, excess_air_range, steps, objectives, furnace_load_gj_hour=1.0,
+                 max_points=MAX_PLOTTED_POINTS):
+    """
+    Combined frontier for several fuels: the non-dominated points among the per-fuel frontiers
+    (the global frontier is always a subset of their union). Returns columnar lists for plotting,
+    at most `max_points` of them.
+    """
+    fuels = list(fuels)
+    frontiers = [fuel_frontier(fuel, moisture_range, excess_air_range, steps, objectives, furnace_load_gj_hour)
+                 for fuel in fuels]
+    columns = ['moisture_percent', 'excess_air_percent'] + list(PARETO_OBJECTIVES)
+    merged = {name: np.concatenate([frontier[name] for frontier in frontiers]) for name in columns}
+    fuel_index = np.concatenate([np.full(len(frontier['excess_air_percent']), i)
+                                 for i, frontier in enumerate(frontiers)])
+
+    costs = np.column_stack([PARETO_OBJECTIVES[name] * merged[name] for name in objectives])
+    keep = pareto_mask(costs)
+    order = np.argsort(merged[objectives[0]][keep] * PARETO_OBJECTIVES[objectives[0]], kind='stable')
+    if len(order) > max_points:
+        # Evenly spaced along the first objective, ends included
+        order = order[np.linspace(0, len(order) - 1, max_points).round().astype(np.int64)]
+
+    return {
+        'objectives': list(objectives),
+        'fuels': [fuel.name for fuel in fuels],
+        'evaluated_points': int(sum(frontier['grid_points'] for frontier in frontiers)),
+        'frontier_size': int(keep.sum()),
+        'plotted_points': len(order),
+        'points': {
+            'fuel': fuel_index[keep][order].tolist(),
+            **{name: merged[name][keep][order].tolist() for name in columns},
+        },
+    }
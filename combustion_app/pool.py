@@ -0,0 +1,39 @@
+# combustion_app/pool.py
+# Process-pool entry points. Nothing here may import Django models at module level:
+# spawned worker processes unpickle these functions before Django is set up.
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def init_worker_process():
+    """Process pool initializer: each worker process sets up Django on its own."""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'furnace_project.settings')
+    django.setup()
+
+
+def make_process_pool(workers):
+    """A pool of `workers` freshly spawned processes, each with its own DB connection."""
+    context = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker_process)
+
+
+_compute_pools = {}
+
+
+def get_compute_pool(workers):
+    """
+    A long-lived pool for pure NumPy work (no Django in the workers), shared by
+    requests so that process start-up is paid once per server process.
+    """
+    pool = _compute_pools.get(workers)
+    if pool is None or getattr(pool, '_broken', False):
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        _compute_pools[workers] = pool
+    return pool
+
+
+def execute_job(job_id):
+    from .jobs import execute_job as _execute_job
+    return _execute_job(job_id)
@@ -0,0 +1,221 @@
+# combustion_app/runs.py
+# Batch evaluation and bulk storage of FurnaceRun rows (JSON API, CSV / JSONL imports).
+import csv
+import datetime
+import json
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .furnace_model import DEFAULT_FIDELITY, run_combustion_model_batch, stack_fuel_profiles
+from .models import FurnaceRun
+from .catalogue import get_fuel_catalogue
+from .scoring import parse_fuel_id
+
+# Rows parsed, evaluated and inserted per transaction during an import
+IMPORT_CHUNK_SIZE = 5000
+# Bad-row messages kept for the import report
+MAX_REPORTED_ERRORS = 20
+
+INPUT_COLUMNS = ('moisture_percent', 'excess_air_percent', 'furnace_load_gj_hour')
+
+# Model output -> FurnaceRun field
+RUN_RESULT_FIELDS = {
+    'efficiency': 'calculated_efficiency',
+    'exhaust_temp_c': 'exhaust_temp_c',
+    'flue_gas_co2_percent': 'flue_gas_co2_percent',
+    't_adiabatic_c': 't_adiabatic_c',
+    'cost_per_gj': 'cost_per_gj',
+    'cost_per_hour': 'cost_per_hour',
+    'emissions_co_ppm': 'emissions_co_ppm',
+    'emissions_nox_ppm': 'emissions_nox_ppm',
+}
+
+
+class UnknownFuelError(ValueError):
+    """Raised when operating points refer to fuels that do not exist."""
+
+
+def filter_runs(start_date=None, end_date=None, fuels=None):
+    """FurnaceRun rows filtered in the database; dates are inclusive, `fuels` is a list of Fuel."""
+    runs = FurnaceRun.objects.all()
+    if start_date:
+        runs = runs.filter(run_date__gte=_start_of_day(start_date))
+    if end_date:
+        runs = runs.filter(run_date__lt=_start_of_day(end_date + datetime.timedelta(days=1)))
+    if fuels:
+        runs = runs.filter(fuel_id__in=[fuel.pk for fuel in fuels])
+    return runs
+
+
+def _start_of_day(date):
+    # Bounds on run_date itself (not run_date__date) so the run_date index is used
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def evaluate_points(fuel_ids, inputs, fuels_by_id=None, fidelity=DEFAULT_FIDELITY):
+    """
+    Runs the batch model over points that may use different fuels, in one call:
+    each point gets its own fuel's properties through a stacked profile.
+    """
+    unique_ids, index = np.unique(fuel_ids, return_inverse=True)
+    if fuels_by_id is None:
+        fuels_by_id = get_fuel_catalogue().in_bulk(unique_ids.tolist())
+    unknown = [fuel_id for fuel_id in unique_ids.tolist() if fuel_id not in fuels_by_id]
+    if unknown:
+        raise UnknownFuelError("Unknown fuel id(s): " + ", ".join(map(str, unknown)) + ".")
+
+    profile = stack_fuel_profiles([fuels_by_id[fuel_id] for fuel_id in unique_ids.tolist()], index)
+    return run_combustion_model_batch(
+        profile, inputs['moisture_percent'], inputs['excess_air_percent'], inputs['furnace_load_gj_hour'],
+        fidelity=fidelity,
+    )
+
+
+def bulk_insert_runs(fuel_ids, inputs, results, names, run_dates=None):
+    """
+    Inserts one FurnaceRun per point, results included, with a single bulk_create:
+    each row is written once (the form path used to save every run twice).
+    `names` and `run_dates` may be one value for all rows or a list per row.
+    """
+    n = len(fuel_ids)
+    fuel_id_list = np.asarray(fuel_ids).tolist()
+    input_columns = {key: np.asarray(values).tolist() for key, values in inputs.items()}
+    result_columns = {field: results[key].tolist() for key, field in RUN_RESULT_FIELDS.items()}
+    if isinstance(names, str):
+        names = [names] * n
+    if run_dates is None or not isinstance(run_dates, list):
+        run_dates = [run_dates or timezone.now()] * n
+
+    runs = [
+        FurnaceRun(
+            name=names[i],
+            run_date=run_dates[i],
+            fuel_id=fuel_id_list[i],
+            **{key: values[i] for key, values in input_columns.items()},
+            **{field: values[i] for field, values in result_columns.items()},
+        )
+        for i in range(n)
+    ]
+    FurnaceRun.objects.bulk_create(runs)
+    return n
+
+
+# --- CSV / JSONL Import ---
+
+def iter_records(text_stream, file_format):
+    """Yields (line_number, record dict) from a CSV (with header) or JSONL stream."""
+    if file_format == 'csv':
+        reader = csv.DictReader(text_stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif file_format == 'jsonl':
+        for line_number, line in enumerate(text_stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, e
+                continue
+            yield line_number, record
+    else:
+        raise ValueError(f"Unsupported format '{file_format}'. Use 'csv' or 'jsonl'.")
+
+
+class FuelResolver:
+    """Maps a record's 'fuel_id' or 'fuel' (name) to a fuel id, using the fuel catalogue."""
+
+    def __init__(self):
+        fuels = get_fuel_catalogue().all()
+        self.by_id = {fuel.id: fuel for fuel in fuels}
+        self.by_name = {fuel.name.strip().lower(): fuel.id for fuel in fuels}
+
+    def resolve(self, record):
+        fuel_id = record.get('fuel_id')
+        if fuel_id not in (None, ''):
+            fuel_id = parse_fuel_id(fuel_id)
+            if fuel_id not in self.by_id:
+                raise ValueError(f"unknown fuel id {fuel_id}")
+            return fuel_id
+        name = str(record.get('fuel') or '').strip().lower()
+        if name not in self.by_name:
+            raise ValueError(f"unknown fuel '{record.get('fuel')}'")
+        return self.by_name[name]
+
+
+def _parse_run_date(value):
+    if value in (None, ''):
+        return None
+    run_date = parse_datetime(str(value))
+    if run_date is None:
+        raise ValueError(f"invalid run_date '{value}'")
+    if timezone.is_naive(run_date):
+        run_date = timezone.make_aware(run_date)
+    return run_date
+
+
+def import_runs(text_stream, file_format, default_name="Imported Run", chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Streams run inputs from CSV or JSONL, evaluates each chunk with one batch model call
+    and inserts it with bulk_create inside its own transaction.
+
+    Columns: fuel_id or fuel (name), moisture_percent, excess_air_percent,
+    optional furnace_load_gj_hour (default 1.0), name and run_date (ISO 8601).
+    Returns a report with created / bad row counts and the first few errors.
+    """
+    resolver = FuelResolver()
+    report = {'created': 0, 'bad_rows': 0, 'errors': []}
+    now = timezone.now()
+
+    def flush(chunk):
+        if not chunk['fuel_id']:
+            return
+        fuel_ids = np.array(chunk['fuel_id'], dtype=np.int64)
+        inputs = {key: np.array(chunk[key], dtype=float) for key in INPUT_COLUMNS}
+        results = evaluate_points(fuel_ids, inputs, resolver.by_id)
+        with transaction.atomic():
+            report['created'] += bulk_insert_runs(fuel_ids, inputs, results, chunk['name'], chunk['run_date'])
+
+    def new_chunk():
+        return {key: [] for key in ('fuel_id', 'name', 'run_date') + INPUT_COLUMNS}
+
+    chunk = new_chunk()
+    for line_number, record in iter_records(text_stream, file_format):
+        try:
+            if isinstance(record, Exception):
+                raise ValueError(str(record))
+            if not isinstance(record, dict):
+                raise ValueError("record is not an object")
+            fuel_id = resolver.resolve(record)
+            load = record.get('furnace_load_gj_hour')
+            values = [
+                float(record['moisture_percent']),
+                float(record['excess_air_percent']),
+                # Only a missing or blank load defaults; a load of 0 is kept, as in CSV
+                1.0 if load in (None, '') else float(load),
+            ]
+            if not all(np.isfinite(values)):
+                raise ValueError("non-finite input")
+            run_date = _parse_run_date(record.get('run_date')) or now
+        except (KeyError, TypeError, ValueError, OverflowError) as e:
+            report['bad_rows'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                missing = f"missing column {e}" if isinstance(e, KeyError) else str(e)
+                report['errors'].append(f"Line {line_number}: {missing}")
+            continue
+
+        chunk['fuel_id'].append(fuel_id)
+        for key, value in zip(INPUT_COLUMNS, values):
+            chunk[key].append(value)
+        chunk['name'].append(str(record.get('name') or default_name)[:100])
+        chunk['run_date'].append(run_date)
+
+        if len(chunk['fuel_id']) >= chunk_size:
+            flush(chunk)
+            chunk = new_chunk()
+
+    flush(chunk)
+    return report
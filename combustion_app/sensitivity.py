@@ -0,0 +1,193 @@
+# combustion_app/sensitivity.py
+# Global sensitivity analysis of the batch model: Sobol indices and Morris screening.
+# Only NumPy and model modules are imported here, so batches can run in spawned worker processes.
+import numpy as np
+
+from .furnace_model import FuelProfile, run_combustion_model_batch
+from .uncertainty import FUEL_PROPERTIES, DEFAULT_BATCH_SIZE, nominal_inputs
+
+# Inputs that can be varied, in display order
+SENSITIVITY_FACTORS = {
+    'moisture_percent': 'Moisture (%)',
+    'excess_air_percent': 'Excess Air (%)',
+    'C': 'Carbon (C)',
+    'H': 'Hydrogen (H)',
+    'O': 'Oxygen (O)',
+    'Ash': 'Ash',
+    'hhv_mj_kg': 'HHV (MJ/kg)',
+    'cost_per_tonne': 'Fuel Price (₹/tonne)',
+}
+SENSITIVITY_OUTPUTS = ('cost_per_gj', 'emissions_nox_ppm', 'efficiency', 't_adiabatic_c')
+
+METHODS = ('sobol', 'morris')
+MAX_EVALUATIONS = 2000000
+MORRIS_LEVELS = 4
+
+
+def evaluate_unit_points(nominal, bounds, unit_points, outputs=SENSITIVITY_OUTPUTS):
+    """
+    Evaluates design points given in the unit cube, one column per factor in `bounds`
+    ({factor: (low, high)}); all other inputs stay at their `nominal` values.
+    This is the function the compute pool runs.
+    """
+    values = dict(nominal)
+    for i, (name, (low, high)) in enumerate(bounds.items()):
+        values[name] = low + unit_points[:, i] * (high - low)
+
+    profile = FuelProfile(None, 'sensitivity', *(values[name] for name in FUEL_PROPERTIES),
+                          model_params=values.get('model_params'))
+    results = run_combustion_model_batch(
+        profile, values['moisture_percent'], values['excess_air_percent'], values['furnace_load_gj_hour']
+    )
+    n = len(unit_points)
+    return {key: np.broadcast_to(results[key], (n,)) for key in outputs}
+
+
+def _evaluate_design(nominal, bounds, design, batch_size, pool):
+    """Evaluates every row of `design` in batches, spread over `pool` when one is given."""
+    batches = [design[start:start + batch_size] for start in range(0, len(design), batch_size)]
+    if pool is None:
+        results = [evaluate_unit_points(nominal, bounds, batch) for batch in batches]
+    else:
+        futures = [pool.submit(evaluate_unit_points, nominal, bounds, batch) for batch in batches]
+        results = [future.result() for future in futures]
+    return {key: np.concatenate([result[key] for result in results]) for key in SENSITIVITY_OUTPUTS}
+
+
+def _check_budget(bounds, n_evaluations):
+    if not bounds:
+        raise ValueError("Choose at least one input to vary.")
+    if n_evaluations > MAX_EVALUATIONS:
+        raise ValueError(f"At most {MAX_EVALUATIONS} model evaluations are supported.")
+
+
+def sobol_indices(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour, bounds, n_base,
+                  batch_size=DEFAULT_BATCH_SIZE, pool=None, seed=None):
+    """
+    First-order (S1) and total (ST) Sobol indices of each factor, for every output.
+
+    Saltelli design: two independent sample matrices A and B plus, per factor, A with that
+    column taken from B, i.e. n_base * (factors + 2) evaluations. S1 uses the Saltelli (2010)
+    estimator and ST the Jansen estimator; the *_conf values are 95% half-widths from the
+    central limit theorem. The design is drawn up front, so results for a given seed do not
+    depend on the number of workers.
+    """
+    k = len(bounds)
+    _check_budget(bounds, n_base * (k + 2))
+    rng = np.random.default_rng(seed)
+    A = rng.random((n_base, k))
+    B = rng.random((n_base, k))
+    AB = np.repeat(A[None, :, :], k, axis=0)
+    for i in range(k):
+        AB[i, :, i] = B[:, i]
+    design = np.concatenate([A, B, AB.reshape(-1, k)])
+
+    nominal = nominal_inputs(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour)
+    evaluated = _evaluate_design(nominal, bounds, design, batch_size, pool)
+
+    outputs = {}
+    for key, values in evaluated.items():
+        f_A, f_B = values[:n_base], values[n_base:2 * n_base]
+        f_AB = values[2 * n_base:].reshape(k, n_base)
+        # Rows where the model gave a non-finite value are left out of every estimate
+        finite = np.isfinite(f_A) & np.isfinite(f_B) & np.isfinite(f_AB).all(axis=0)
+        f_A, f_B, f_AB = f_A[finite], f_B[finite], f_AB[:, finite]
+        n = len(f_A)
+        variance = float(np.var(np.concatenate([f_A, f_B]))) if n else 0.0
+        if variance <= 0.0:
+            zeros = [0.0] * k
+            outputs[key] = {'variance': variance, 'S1': zeros, 'ST': zeros, 'S1_conf': zeros, 'ST_conf': zeros}
+            continue
+
+        # Centring f_B leaves the S1 estimator unbiased but cuts its variance for large-mean outputs
+        first = (f_B - np.mean(np.concatenate([f_A, f_B]))) * (f_AB - f_A)  # E[.] / V = S1
+        total = 0.5 * np.square(f_A - f_AB)   # E[.] / V = ST
+        outputs[key] = {
+            'variance': variance,
+            'S1': (first.mean(axis=1) / variance).tolist(),
+            'ST': (total.mean(axis=1) / variance).tolist(),
+            'S1_conf': (1.96 * first.std(axis=1) / np.sqrt(n) / variance).tolist(),
+            'ST_conf': (1.96 * total.std(axis=1) / np.sqrt(n) / variance).tolist(),
+        }
+
+    return {
+        'method': 'sobol',
+        'factors': list(bounds),
+        'bounds': {name: list(bound) for name, bound in bounds.items()},
+        'n_evaluations': len(design),
+        'outputs': outputs,
+    }
+
+
+def morris_trajectories(rng, n_trajectories, k, levels=MORRIS_LEVELS):
+    """
+    Morris (1991) one-at-a-time trajectories in the unit cube, shape (trajectories, k + 1, k).
+    Consecutive points of a trajectory differ in exactly one factor, by +/- delta.
+    """
+    delta = levels / (2.0 * (levels - 1))
+    # Base points on the grid levels from which a step of +delta stays inside the cube
+    base = rng.integers(0, levels // 2, (n_trajectories, 1, k)) / (levels - 1)
+    directions = rng.choice([-1.0, 1.0], (n_trajectories, 1, k))
+    lower = np.tril(np.ones((k + 1, k)), -1)
+    trajectories = base + delta / 2.0 * ((2.0 * lower - 1.0) * directions + 1.0)
+    # Random factor order per trajectory
+    order = np.argsort(rng.random((n_trajectories, k)), axis=1)
+    return np.take_along_axis(trajectories, order[:, None, :], axis=2)
+
+
+def morris_screening(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour, bounds, n_trajectories,
+                     levels=MORRIS_LEVELS, batch_size=DEFAULT_BATCH_SIZE, pool=None, seed=None):
+    """
+    Morris elementary-effects screening: n_trajectories * (factors + 1) evaluations.
+    For every output, mu_star (mean absolute effect), mu and sigma of each factor's
+    elementary effects, in output units per change of the factor across its whole range.
+    A cheap first pass: it ranks factors but does not apportion variance like Sobol.
+    """
+    k = len(bounds)
+    _check_budget(bounds, n_trajectories * (k + 1))
+    rng = np.random.default_rng(seed)
+    trajectories = morris_trajectories(rng, n_trajectories, k, levels)
+
+    nominal = nominal_inputs(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour)
+    evaluated = _evaluate_design(nominal, bounds, trajectories.reshape(-1, k), batch_size, pool)
+
+    # Which factor moves at each step of each trajectory, and by how much
+    steps = np.diff(trajectories, axis=1)
+    moved = np.abs(steps).argmax(axis=2)
+    step_size = np.take_along_axis(steps, moved[:, :, None], axis=2)[:, :, 0]
+    rows = np.arange(n_trajectories)[:, None]
+
+    outputs = {}
+    for key, values in evaluated.items():
+        effects = np.empty((n_trajectories, k))
+        effects[rows, moved] = np.diff(values.reshape(n_trajectories, k + 1), axis=1) / step_size
+        # Effects the model could not evaluate (non-finite outputs) are left out
+        effects = np.ma.masked_invalid(effects)
+        outputs[key] = {
+            'mu_star': _finite_list(np.abs(effects).mean(axis=0)),
+            'mu': _finite_list(effects.mean(axis=0)),
+            'sigma': _finite_list(effects.std(axis=0, ddof=1)),
+        }
+
+    return {
+        'method': 'morris',
+        'factors': list(bounds),
+        'bounds': {name: list(bound) for name, bound in bounds.items()},
+        'n_evaluations': n_trajectories * (k + 1),
+        'outputs': outputs,
+    }
+
+
+def _finite_list(values):
+    """A (masked) array as a JSON-safe list, with None where there is no finite value."""
+    values = np.ma.filled(np.ma.masked_invalid(values).astype(float), np.nan)
+    return [float(value) if np.isfinite(value) else None for value in values]
+
+
+def ranked_factors(result, output):
+    """
+    Factor indexes of `result` ordered from most to least influential on `output`:
+    by total index (Sobol) or mu_star (Morris).
+    """
+    scores = result['outputs'][output]['ST' if result['method'] == 'sobol' else 'mu_star']
+    return sorted(range(len(scores)), key=lambda i: -scores[i] if scores[i] is not None else np.inf)
@@ -0,0 +1,51 @@
+# combustion_app/signals.py
+# Caches are dropped once the change is committed: dropped earlier, another request could
+# reload the old rows before the commit and keep them.
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Fuel, ModelCalibration
+from .cache import get_result_cache
+from .catalogue import get_fuel_catalogue
+from .surrogate import get_surrogate_store
+
+
+@receiver(post_save, sender=Fuel)
+@receiver(post_delete, sender=Fuel)
+def invalidate_fuel_results(sender, instance, **kwargs):
+    """Editing or deleting a fuel (e.g. in the admin) drops its cached model results."""
+    fuel_id = instance.pk
+
+    def invalidate():
+        get_result_cache().invalidate_fuel(fuel_id)
+        get_fuel_catalogue().invalidate()
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Fuel)
+@receiver(post_delete, sender=Fuel)
+def drop_surrogate_tables(sender, instance, raw=False, **kwargs):
+    """A changed fuel's lookup tables are deleted; the next real-time query builds new ones."""
+    if not raw:
+        fuel_id = instance.pk
+        transaction.on_commit(lambda: get_surrogate_store().invalidate(fuel_id))
+
+
+@receiver(post_save, sender=Fuel)
+def refresh_blends(sender, instance, created, raw=False, **kwargs):
+    """Blends made from an edited fuel are re-weighted (their saves invalidate them in turn)."""
+    if not (created or raw or instance.is_blend):
+        from .blends import refresh_blends_containing
+        refresh_blends_containing(instance)
+
+
+@receiver(post_save, sender=ModelCalibration)
+@receiver(post_delete, sender=ModelCalibration)
+def reload_calibrated_fuels(sender, instance, **kwargs):
+    """
+    Fuels pick up their active calibration when the catalogue reloads. Cached results need
+    no invalidation: the calibrated parameters are part of every result cache key.
+    """
+    transaction.on_commit(get_fuel_catalogue().invalidate)
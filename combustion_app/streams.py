@@ -0,0 +1,232 @@
+# combustion_app/streams.py
+# Async (ASGI) endpoints that stream sweep and validation results as server-sent events.
+# Model work runs on a bounded executor, so the event loop stays free for other requests.
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from contextlib import aclosing
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+
+from .forms import AnalysisForm, ValidationForm
+from .furnace_model import compile_fuel_profile, run_combustion_model_batch
+from .ingest import (MAX_CHART_POINTS, VALIDATION_X_HEADER, VALIDATION_Y_HEADER, CSVColumnsError,
+                     iter_csv_chunks, open_text_stream)
+from .pool import get_compute_pool
+from .sweeps import SAMPLING_ADAPTIVE, SAMPLING_UNIFORM, AdaptiveSampler
+
+# A streamed sweep is split into about this many chunks, one chart update each
+SWEEP_STREAM_CHUNKS = 10
+# Chunks one stream may have queued on the executor at once. Keeping this small means
+# concurrent streams take turns on the workers instead of one sweep filling the queue.
+MAX_CHUNKS_IN_FLIGHT = 2
+
+_thread_executor = None
+
+
+def get_stream_executor():
+    """
+    Executor for the CPU work of streamed requests: the shared compute pool (one process
+    per COMBUSTION_COMPUTE_WORKERS), or a single worker thread when that is 1 (the default).
+    """
+    global _thread_executor
+    workers = getattr(settings, 'COMBUSTION_COMPUTE_WORKERS', 1)
+    if workers > 1:
+        return get_compute_pool(workers)
+    if _thread_executor is None:
+        _thread_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='combustion-stream')
+    return _thread_executor
+
+
+def sse_event(event, data):
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def event_stream_response(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies (nginx) from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def map_in_order(make_call, items, limit=MAX_CHUNKS_IN_FLIGHT):
+    """
+    Runs `make_call(item)` (a picklable zero-argument callable) for each item on the stream
+    executor, at most `limit` at a time, and yields (item, result) pairs in order.
+    Calls not yet started are cancelled if the client disconnects (the generator is closed).
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_stream_executor()
+    pending = deque()
+    try:
+        for item in items:
+            pending.append((item, loop.run_in_executor(executor, make_call(item))))
+            if len(pending) >= limit:
+                item, future = pending.popleft()
+                yield item, await future
+        while pending:
+            item, future = pending.popleft()
+            yield item, await future
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+@sync_to_async
+def _validated_form(form_class, request):
+    # Form cleaning reads the fuel catalogue, i.e. the database
+    form = form_class(request.POST, request.FILES)
+    form.is_valid()
+    return form
+
+
+# --- Parametric Sweep ---
+
+@require_POST
+async def analysis_stream_view(request):
+    """
+    The analysis page's sweep, streamed: a 'start' event, one 'chunk' event per finished
+    chunk of the sweep (in order, with progress), then 'done'. With adaptive sampling each
+    chunk is one refinement pass, and the total is not known up front (null).
+    Form errors return 400 JSON.
+    """
+    form = await _validated_form(AnalysisForm, request)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    data = form.cleaned_data
+    x_axis_label = dict(form.fields['variable_to_sweep'].choices)[data['variable_to_sweep']]
+    return event_stream_response(_sweep_events(data, x_axis_label))
+
+
+async def _sweep_events(data, x_axis_label):
+    started = time.perf_counter()
+    profile = compile_fuel_profile(data['fuel'])
+
+    def evaluate(x):
+        moisture, excess_air = data['constant_moisture'], data['constant_excess_air']
+        if data['variable_to_sweep'] == 'moisture_percent':
+            moisture = x
+        else:
+            excess_air = x
+        return partial(run_combustion_model_batch, profile, moisture, excess_air, data['constant_load'],
+                       fidelity=data['fidelity'])
+
+    if data['sampling'] == SAMPLING_ADAPTIVE:
+        # Each refinement pass depends on the last, so passes run one at a time
+        sampler = AdaptiveSampler(data['start_value'], data['end_value'], data['steps'], data['tolerance'])
+        executor = get_stream_executor()
+        yield sse_event('start', {'total': None, 'x_axis_label': x_axis_label, 'sampling': SAMPLING_ADAPTIVE})
+        while len(sampler.pending()):
+            x = sampler.pending()
+            results = await asyncio.get_running_loop().run_in_executor(executor, evaluate(x))
+            sampler.add(results)
+            yield _sweep_chunk(x, results, sampler.evaluations, None)
+        yield sse_event('done', {'evaluations': sampler.evaluations, 'passes': sampler.passes,
+                                 'seconds': time.perf_counter() - started})
+        return
+
+    x_values = np.linspace(data['start_value'], data['end_value'], data['steps'])
+    size = math.ceil(len(x_values) / SWEEP_STREAM_CHUNKS)
+    chunks = [x_values[start:start + size] for start in range(0, len(x_values), size)]
+    yield sse_event('start', {'total': len(x_values), 'x_axis_label': x_axis_label, 'sampling': SAMPLING_UNIFORM})
+    done = 0
+    async with aclosing(map_in_order(evaluate, chunks)) as results_in_order:
+        async for x, results in results_in_order:
+            done += len(x)
+            yield _sweep_chunk(x, results, done, len(x_values))
+    yield sse_event('done', {'evaluations': done, 'seconds': time.perf_counter() - started})
+
+
+def _sweep_chunk(x, results, done, total):
+    return sse_event('chunk', {
+        'labels': x.tolist(),
+        'efficiency_data': results['efficiency'].tolist(),
+        'cost_data': results['cost_per_gj'].tolist(),
+        'co_data': results['emissions_co_ppm'].tolist(),
+        'done': done,
+        'total': total,
+    })
+
+
+# --- Validation ---
+
+@require_POST
+async def validation_stream_view(request):
+    """
+    The validation page's upload, streamed: the CSV is parsed and evaluated chunk by chunk,
+    each 'chunk' event carrying a share of the chart points and the fraction of the file read,
+    and 'done' carrying the error statistics over every row.
+    """
+    form = await _validated_form(ValidationForm, request)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    return event_stream_response(_validation_events(form.cleaned_data))
+
+
+async def _validation_events(data):
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    executor = get_stream_executor()
+    profile = compile_fuel_profile(data['fuel'])
+    upload = data['validation_file']
+    size = max(upload.size or 0, 1)
+    chunks = iter_csv_chunks(open_text_stream(upload), (VALIDATION_X_HEADER, VALIDATION_Y_HEADER))
+
+    rows = bad_rows = plotted = 0
+    sum_error = sum_abs_error = sum_sq_error = 0.0
+    yield sse_event('start', {'x_axis_label': VALIDATION_X_HEADER, 'y_axis_label': 'Efficiency (%)'})
+    while True:
+        # Parsing reads the upload, so it runs off the event loop too
+        try:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+        except CSVColumnsError as e:
+            yield sse_event('error', {'message': str(e)})
+            return
+        if chunk is None:
+            break
+        arrays, chunk_bad_rows = chunk
+        bad_rows += chunk_bad_rows
+        excess_air, actual = arrays[VALIDATION_X_HEADER], arrays[VALIDATION_Y_HEADER]
+        progress = min(upload.file.tell() / size, 1.0)
+        if not len(excess_air):
+            continue
+
+        results = await loop.run_in_executor(executor, partial(
+            run_combustion_model_batch, profile, data['constant_moisture'], excess_air, data['constant_load']))
+        error = results['efficiency'] - actual
+        rows += len(error)
+        sum_error += float(error.sum())
+        sum_abs_error += float(np.abs(error).sum())
+        sum_sq_error += float(np.square(error).sum())
+
+        # Spread the chart's point budget over the file in proportion to how much has been read
+        budget = max(int(MAX_CHART_POINTS * progress) - plotted, 0)
+        keep = np.linspace(0, len(error) - 1, min(budget, len(error))).astype(np.int64)
+        plotted += len(keep)
+        yield sse_event('chunk', {
+            'labels': excess_air[keep].tolist(),
+            'model_data': results['efficiency'][keep].tolist(),
+            'actual_data': actual[keep].tolist(),
+            'rows': rows,
+            'progress': progress,
+        })
+
+    yield sse_event('done', {
+        'rows': rows,
+        'bad_rows': bad_rows,
+        'plotted_rows': plotted,
+        'bias': sum_error / rows if rows else None,
+        'mae': sum_abs_error / rows if rows else None,
+        'rmse': (sum_sq_error / rows) ** 0.5 if rows else None,
+        'seconds': time.perf_counter() - started,
+    })
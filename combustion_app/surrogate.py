@@ -0,0 +1,326 @@
+# combustion_app/surrogate.py
+# Precomputed lookup tables of the model per fuel, memory-mapped and interpolated for real-time scoring.
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .cache import fuel_fingerprint
+from .catalogue import get_fuel_catalogue
+from .furnace_model import BATCH_RESULT_KEYS, DEFAULT_FIDELITY, compile_fuel_profile, run_combustion_model_batch
+from .runs import INPUT_COLUMNS, UnknownFuelError
+
+# Bump when the file layout or the model equations change: existing tables are then rebuilt
+SURROGATE_VERSION = 1
+
+# Defaults, overridable with settings.COMBUSTION_SURROGATE. Axes are (start, stop, points), in INPUT_COLUMNS order.
+DEFAULT_AXES = {
+    'moisture_percent': (0.0, 60.0, 121),
+    'excess_air_percent': (0.0, 200.0, 401),
+    # Load only scales the cost per hour, linearly, so two points interpolate it exactly
+    'furnace_load_gj_hour': (0.01, 100.0, 2),
+}
+DEFAULT_RTOL = 1e-3
+# Each cell's error estimate is multiplied by this before it is checked or reported
+SAFETY_FACTOR = 2.0
+
+
+def _corners(ndim):
+    """Slices that pick, for every cell of a grid, one of its 2**ndim corner nodes."""
+    return [tuple(slice(1, None) if upper else slice(None, -1) for upper in corner)
+            for corner in itertools.product((0, 1), repeat=ndim)]
+
+
+def _cell_max(node_values, ndim=3):
+    corners = _corners(ndim)
+    return np.maximum.reduce([node_values[corner] for corner in corners])
+
+
+def build_table_arrays(fuel, axes=DEFAULT_AXES, rtol=DEFAULT_RTOL, fidelity=DEFAULT_FIDELITY):
+    """
+    (values, covered, error_bounds) of a fuel's table:
+      values        model outputs at every grid node, shape (moisture, excess air, load, BATCH_RESULT_KEYS)
+      covered       cells whose estimated interpolation error is within rtol of the values there, for every output
+      error_bounds  {output: largest estimated error over the covered cells}
+
+    The estimate is the multilinear interpolation bound, sum over axes of h^2 / 8 * max |d2f/dx^2|,
+    with the second derivatives taken from second differences at the cell's nodes, checked
+    against the model itself at every cell centre (where interpolation error peaks) and
+    multiplied by SAFETY_FACTOR. Cells the model cannot be interpolated in (non-finite values,
+    cost near zero efficiency) are left uncovered; queries there are evaluated exactly.
+    """
+    profile = compile_fuel_profile(fuel)
+    grids = [np.linspace(*axes[name]) for name in INPUT_COLUMNS]
+    nodes = np.meshgrid(*grids, indexing='ij')
+    results = run_combustion_model_batch(profile, *nodes, fidelity=fidelity)
+    values = np.stack([np.broadcast_to(results[key], nodes[0].shape) for key in BATCH_RESULT_KEYS], axis=-1)
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        estimate = np.zeros(tuple(len(grid) - 1 for grid in grids) + (len(BATCH_RESULT_KEYS),))
+        for axis, grid in enumerate(grids):
+            if len(grid) < 3:
+                continue
+            h = grid[1] - grid[0]
+            curvature = np.abs(np.diff(values, n=2, axis=axis)) / h ** 2
+            pad = [(0, 0)] * values.ndim
+            pad[axis] = (1, 1)
+            estimate += h ** 2 / 8.0 * _cell_max(np.pad(curvature, pad, mode='edge'))
+
+        centres = np.meshgrid(*[(grid[:-1] + grid[1:]) / 2.0 for grid in grids], indexing='ij')
+        results = run_combustion_model_batch(profile, *centres, fidelity=fidelity)
+        exact = np.stack([np.broadcast_to(results[key], centres[0].shape) for key in BATCH_RESULT_KEYS], axis=-1)
+        # At a cell centre, multilinear interpolation is the mean of the corners
+        interpolated = np.mean([values[corner] for corner in _corners(3)], axis=0)
+        scale = _cell_max(np.abs(values))
+        # The last term covers rounding in outputs that are exactly (multi)linear, such as LHV
+        estimate = SAFETY_FACTOR * np.maximum(estimate, np.abs(exact - interpolated)) + 1e-12 * scale
+
+        covered = (estimate <= rtol * scale).all(axis=-1)
+
+    error_bounds = {
+        key: float(estimate[..., i][covered].max()) if covered.any() else None
+        for i, key in enumerate(BATCH_RESULT_KEYS)
+    }
+    return values, covered, error_bounds
+
+
+class SurrogateTable:
+    """
+    One fuel's table at one model fidelity, memory-mapped read-only: every process that
+    opens it shares the same pages, and a query reads only the cells it lands in.
+    """
+
+    def __init__(self, directory, meta):
+        self.digest = meta['digest']
+        self.fuel_id = meta['fuel_id']
+        self.fidelity = meta['fidelity']
+        self.axes = {name: tuple(axis) for name, axis in meta['axes'].items()}
+        self.error_bounds = meta['error_bounds']
+        self.coverage = meta['coverage']
+        self.values = np.load(directory / meta['values'], mmap_mode='r')
+        self.covered = np.load(directory / meta['covered'], mmap_mode='r')
+        axes = [self.axes[name] for name in INPUT_COLUMNS]
+        self._start = [float(start) for start, _, _ in axes]
+        self._step = [(stop - start) / (points - 1) for start, stop, points in axes]
+        self._cells = [points - 1 for _, _, points in axes]
+
+    def interpolate(self, moisture_percent, excess_air_percent, furnace_load_gj_hour):
+        """
+        ({output: values}, covered): multilinear interpolation at each point, and which points
+        fall in a covered cell of the grid. Values at the other points are not meaningful.
+        """
+        points = np.broadcast_arrays(*(np.asarray(value, dtype=float)
+                                       for value in (moisture_percent, excess_air_percent, furnace_load_gj_hour)))
+        covered = np.ones(points[0].shape, dtype=bool)
+        cells, weights = [], []
+        for value, start, step, n_cells in zip(points, self._start, self._step, self._cells):
+            position = (value - start) / step
+            inside = (position >= 0) & (position <= n_cells)  # False for NaN
+            covered &= inside
+            position = np.where(inside, position, 0.0)
+            cell = np.minimum(position.astype(np.intp), n_cells - 1)
+            cells.append(cell)
+            weights.append(position - cell)
+        i, j, k = cells
+        covered &= self.covered[i, j, k]
+
+        total = 0.0
+        for di, dj, dk in itertools.product((0, 1), repeat=3):
+            weight = ((weights[0] if di else 1.0 - weights[0])
+                      * (weights[1] if dj else 1.0 - weights[1])
+                      * (weights[2] if dk else 1.0 - weights[2]))
+            total = total + weight[..., None] * self.values[i + di, j + dj, k + dk]
+        return {key: total[..., n] for n, key in enumerate(BATCH_RESULT_KEYS)}, covered
+
+
+class SurrogateStore:
+    """
+    Lookup tables for every fuel, kept as .npy files in `directory` and memory-mapped on use.
+
+    A table's file name holds a digest of the fuel's fingerprint (composition, HHV, price and
+    calibrated parameters), the model fidelity and the grid, so an edited or recalibrated fuel never reads a
+    stale table: its new digest has no file yet and the first query builds one. Saving a Fuel
+    also deletes its tables (signals.py). Files are written under temporary names and renamed
+    into place, so several processes may build the same table at once.
+    """
+
+    def __init__(self, directory, axes=DEFAULT_AXES, rtol=DEFAULT_RTOL):
+        self.directory = Path(directory)
+        self.axes = {name: tuple(axes[name]) for name in INPUT_COLUMNS}
+        self.rtol = rtol
+        self._tables = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def digest(self, fuel, fidelity=DEFAULT_FIDELITY):
+        key = repr((SURROGATE_VERSION, fuel_fingerprint(fuel), fidelity, self.axes, self.rtol))
+        return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+    def _meta_path(self, fuel_id, digest):
+        return self.directory / f'fuel-{fuel_id}-{digest}.json'
+
+    def _open(self, fuel_id, digest):
+        try:
+            with open(self._meta_path(fuel_id, digest)) as f:
+                meta = json.load(f)
+            return SurrogateTable(self.directory, meta)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write(self, name, write):
+        """Writes a file under a temporary name and renames it to `name` once complete."""
+        fd, temporary = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(temporary, self.directory / name)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def build(self, fuel, fidelity=DEFAULT_FIDELITY):
+        """Computes and stores the fuel's table (replacing older ones) and returns it, mapped."""
+        digest = self.digest(fuel, fidelity)
+        values, covered, error_bounds = build_table_arrays(fuel, self.axes, self.rtol, fidelity)
+        stem = f'fuel-{fuel.pk}-{digest}'
+        meta = {
+            'version': SURROGATE_VERSION,
+            'digest': digest,
+            'fuel_id': fuel.pk,
+            'fuel_name': fuel.name,
+            'fidelity': fidelity,
+            'axes': {name: list(axis) for name, axis in self.axes.items()},
+            'rtol': self.rtol,
+            'outputs': list(BATCH_RESULT_KEYS),
+            'error_bounds': error_bounds,
+            'coverage': float(covered.mean()),
+            'values': f'{stem}.values.npy',
+            'covered': f'{stem}.covered.npy',
+        }
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._write(meta['values'], lambda f: np.save(f, values))
+        self._write(meta['covered'], lambda f: np.save(f, covered))
+        # The metadata goes last: a table is only found once all of its files are in place
+        self._write(f'{stem}.json', lambda f: f.write(json.dumps(meta, indent=2).encode()))
+        self._remove_stale_files(fuel.pk, fidelity, keep=digest)
+        self.builds += 1
+        return SurrogateTable(self.directory, meta)
+
+    def table(self, fuel, fidelity=DEFAULT_FIDELITY):
+        """The fuel's current table, built first if there is none."""
+        digest = self.digest(fuel, fidelity)
+        with self._lock:
+            table = self._tables.get((fuel.pk, fidelity))
+        if table is None or table.digest != digest:
+            table = self._open(fuel.pk, digest) or self.build(fuel, fidelity)
+            with self._lock:
+                self._tables[(fuel.pk, fidelity)] = table
+        return table
+
+    def evaluate(self, fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour,
+                 fidelity=DEFAULT_FIDELITY):
+        """
+        Model outputs for one fuel from its table, like run_combustion_model_batch.
+        Returns (results, exact): `exact` marks the points outside the covered grid, which
+        were evaluated with the model itself.
+        """
+        table = self.table(fuel, fidelity)
+        results, covered = table.interpolate(moisture_percent, excess_air_percent, furnace_load_gj_hour)
+        exact = ~covered
+        if exact.any():
+            points = np.broadcast_arrays(*(np.asarray(value, dtype=float)
+                                           for value in (moisture_percent, excess_air_percent, furnace_load_gj_hour)))
+            model = run_combustion_model_batch(compile_fuel_profile(fuel), *(point[exact] for point in points),
+                                               fidelity=fidelity)
+            for key in BATCH_RESULT_KEYS:
+                results[key][exact] = model[key]
+        return results, exact
+
+    def _remove_files(self, fuel_id):
+        for path in self.directory.glob(f'fuel-{fuel_id}-*'):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _remove_stale_files(self, fuel_id, fidelity, keep):
+        """Deletes the fuel's other tables at this fidelity (older versions of the fuel)."""
+        for path in self.directory.glob(f'fuel-{fuel_id}-*.json'):
+            digest = path.name[len(f'fuel-{fuel_id}-'):-len('.json')]
+            if digest == keep:
+                continue
+            try:
+                with open(path) as f:
+                    stale = json.load(f).get('fidelity', DEFAULT_FIDELITY) == fidelity
+            except (OSError, ValueError):
+                stale = True
+            if stale:
+                for stale_path in self.directory.glob(f'fuel-{fuel_id}-{digest}.*'):
+                    try:
+                        stale_path.unlink()
+                    except OSError:
+                        pass
+
+    def invalidate(self, fuel_id):
+        """Forgets and deletes a fuel's tables (called when the fuel changes); the next query rebuilds."""
+        with self._lock:
+            for key in [key for key in self._tables if key[0] == fuel_id]:
+                del self._tables[key]
+        if self.directory.is_dir():
+            self._remove_files(fuel_id)
+
+
+def evaluate_points_surrogate(fuel_ids, inputs, store=None, fidelity=DEFAULT_FIDELITY):
+    """
+    Like runs.evaluate_points, from the fuels' lookup tables.
+    Returns (results, error_bounds, exact_points): per output, the largest error any of the
+    interpolated values can have (0.0 when every point was evaluated exactly), and the
+    number of points that were outside the tables and evaluated with the model.
+    """
+    store = store or get_surrogate_store()
+    unique_ids, index = np.unique(fuel_ids, return_inverse=True)
+    fuels_by_id = get_fuel_catalogue().in_bulk(unique_ids.tolist())
+    unknown = [fuel_id for fuel_id in unique_ids.tolist() if fuel_id not in fuels_by_id]
+    if unknown:
+        raise UnknownFuelError("Unknown fuel id(s): " + ", ".join(map(str, unknown)) + ".")
+
+    n = len(index)
+    results = {key: np.empty(n) for key in BATCH_RESULT_KEYS}
+    error_bounds = dict.fromkeys(BATCH_RESULT_KEYS, 0.0)
+    exact_points = 0
+    for i, fuel_id in enumerate(unique_ids.tolist()):
+        rows = np.flatnonzero(index == i)
+        fuel = fuels_by_id[fuel_id]
+        fuel_results, exact = store.evaluate(fuel, *(inputs[name][rows] for name in INPUT_COLUMNS),
+                                             fidelity=fidelity)
+        for key in BATCH_RESULT_KEYS:
+            results[key][rows] = fuel_results[key]
+        exact_points += int(exact.sum())
+        if not exact.all():
+            table = store.table(fuel, fidelity)
+            for key in BATCH_RESULT_KEYS:
+                error_bounds[key] = max(error_bounds[key], table.error_bounds[key])
+    return results, error_bounds, exact_points
+
+
+_surrogate_store = None
+
+
+def get_surrogate_store():
+    """Returns the process-wide table store, configured from settings on first use."""
+    global _surrogate_store
+    if _surrogate_store is None:
+        config = getattr(settings, 'COMBUSTION_SURROGATE', {})
+        _surrogate_store = SurrogateStore(
+            config.get('DIR', Path(settings.BASE_DIR) / 'surrogates'),
+            axes={**DEFAULT_AXES, **config.get('AXES', {})},
+            rtol=config.get('RTOL', DEFAULT_RTOL),
+        )
+    return _surrogate_store
@@ -0,0 +1,217 @@
+# combustion_app/sweeps.py
+import numpy as np
+
+from .cache import cached_combustion_model_batch
+from .furnace_model import DEFAULT_FIDELITY
+
+# Outputs included in a grid sweep payload (heatmaps on the analysis page)
+GRID_OUTPUTS = ('efficiency', 'cost_per_gj', 'emissions_co_ppm')
+
+# Outputs charted by the analysis page, and the ones adaptive sampling refines for
+SWEEP_OUTPUTS = ('efficiency', 'cost_per_gj', 'emissions_co_ppm')
+
+SAMPLING_UNIFORM = 'uniform'
+SAMPLING_ADAPTIVE = 'adaptive'
+
+# Adaptive sampling: default tolerance (% of each output's range), evaluation budget,
+# and the narrowest interval refined (fraction of the sweep), which stops refinement at steps
+DEFAULT_ADAPTIVE_TOLERANCE = 0.5
+MAX_ADAPTIVE_EVALUATIONS = 2000
+MIN_INTERVAL_FRACTION = 1e-4
+
+
+def run_parametric_sweep(fuel, variable_to_sweep, start_value, end_value, steps,
+                         constant_moisture, constant_excess_air, constant_load, x_axis_label=None,
+                         fidelity=DEFAULT_FIDELITY):
+    """
+    Sweeps one variable (moisture_percent or excess_air_percent) with the others fixed.
+    Returns the chart payload used by the analysis page.
+    """
+    x_values = np.linspace(start_value, end_value, steps)
+
+    # One vectorized call for the whole sweep
+    sim_results = _evaluate_sweep(fuel, variable_to_sweep, x_values,
+                                  constant_moisture, constant_excess_air, constant_load, fidelity)
+    return sweep_payload(x_values, sim_results, x_axis_label or variable_to_sweep, SAMPLING_UNIFORM)
+
+
+def run_adaptive_sweep(fuel, variable_to_sweep, start_value, end_value, initial_steps,
+                       constant_moisture, constant_excess_air, constant_load, x_axis_label=None,
+                       fidelity=DEFAULT_FIDELITY, tolerance=DEFAULT_ADAPTIVE_TOLERANCE,
+                       max_evaluations=MAX_ADAPTIVE_EVALUATIONS):
+    """
+    Like run_parametric_sweep, but starts from `initial_steps` uniform points and adds points
+    only where the charted outputs bend or jump (see AdaptiveSampler).
+    """
+    sampler = AdaptiveSampler(start_value, end_value, initial_steps, tolerance, max_evaluations)
+    while len(sampler.pending()):
+        sampler.add(_evaluate_sweep(fuel, variable_to_sweep, sampler.pending(),
+                                    constant_moisture, constant_excess_air, constant_load, fidelity))
+    x_values, sim_results = sampler.samples()
+    return sweep_payload(x_values, sim_results, x_axis_label or variable_to_sweep, SAMPLING_ADAPTIVE,
+                         tolerance=tolerance)
+
+
+def _evaluate_sweep(fuel, variable_to_sweep, x_values, constant_moisture, constant_excess_air,
+                    constant_load, fidelity):
+    if variable_to_sweep == 'moisture_percent':
+        moisture = x_values
+        excess_air = constant_excess_air
+    else:
+        moisture = constant_moisture
+        excess_air = x_values
+    return cached_combustion_model_batch(fuel, moisture, excess_air, constant_load, fidelity=fidelity)
+
+
+def sweep_payload(x_values, sim_results, x_axis_label, sampling, tolerance=None):
+    return {
+        'labels': x_values.tolist(),
+        'efficiency_data': sim_results['efficiency'].tolist(),
+        'cost_data': sim_results['cost_per_gj'].tolist(),
+        'co_data': sim_results['emissions_co_ppm'].tolist(),
+        'x_axis_label': x_axis_label,
+        'sampling': sampling,
+        'tolerance': tolerance,
+        'evaluations': len(x_values),
+    }
+
+
+def run_grid_sweep(fuel, moisture_values, excess_air_values, load_values, outputs=GRID_OUTPUTS,
+                   fidelity=DEFAULT_FIDELITY):
+    """
+    Evaluates the full moisture x excess air x load mesh in one vectorized pass.
+    Result arrays have shape (n_load, n_moisture, n_excess_air), so each load
+    slice is a 2-D heatmap with moisture on the rows and excess air on the columns.
+    """
+    moisture = np.asarray(moisture_values, dtype=float)
+    excess_air = np.asarray(excess_air_values, dtype=float)
+    load = np.asarray(load_values, dtype=float)
+
+    # Broadcasting the axes avoids materialising three full meshgrids
+    results = cached_combustion_model_batch(
+        fuel,
+        moisture[None, :, None],
+        excess_air[None, None, :],
+        load[:, None, None],
+        fidelity=fidelity,
+    )
+
+    return {
+        'moisture_percent': moisture,
+        'excess_air_percent': excess_air,
+        'furnace_load_gj_hour': load,
+        'outputs': {key: results[key] for key in outputs},
+    }
+
+
+def grid_payload(grid, decimals=3):
+    """
+    Converts a grid sweep into a compact, JSON-ready payload:
+    the three axes plus one nested array per output, no per-point dicts.
+    """
+    return {
+        'moisture': grid['moisture_percent'].tolist(),
+        'excess_air': grid['excess_air_percent'].tolist(),
+        'loads': grid['furnace_load_gj_hour'].tolist(),
+        'shape': list(next(iter(grid['outputs'].values())).shape),
+        'outputs': {
+            key: np.round(values, decimals).tolist()
+            for key, values in grid['outputs'].items()
+        },
+    }
+
+
+class AdaptiveSampler:
+    """
+    Adaptive 1-D sampling of a sweep. Starting from a coarse uniform grid, each pass evaluates
+    the midpoints of the intervals still being refined and compares them with the straight line
+    between the interval's ends. Where any output deviates by more than `tolerance` percent of
+    its range over the sweep, both halves are refined in the next pass; elsewhere the interval
+    is done. Refinement also stops at intervals narrower than MIN_INTERVAL_FRACTION of the
+    sweep (steps never converge) and once `max_evaluations` points have been evaluated,
+    spending the last of the budget on the worst intervals first.
+
+    The caller evaluates: `pending()` gives the x values of the next pass (empty when done),
+    and `add(results)` takes the model results for them.
+    """
+
+    def __init__(self, start, end, initial_steps, tolerance=DEFAULT_ADAPTIVE_TOLERANCE,
+                 max_evaluations=MAX_ADAPTIVE_EVALUATIONS, outputs=SWEEP_OUTPUTS):
+        self.tolerance = tolerance / 100.0
+        self.max_evaluations = max(max_evaluations, initial_steps)
+        self.min_width = abs(end - start) * MIN_INTERVAL_FRACTION
+        self.outputs = outputs
+        self.descending = end < start
+        self.passes = 0
+        self.x = np.empty(0)  # ascending
+        self.results = None
+        self._pending = np.sort(np.linspace(start, end, initial_steps))
+        # Intervals whose midpoints are pending: their ends and the outputs at them
+        self._left = self._right = None
+        self._left_y = self._right_y = None
+
+    @property
+    def evaluations(self):
+        return len(self.x)
+
+    def pending(self):
+        return self._pending[::-1] if self.descending else self._pending
+
+    def add(self, results):
+        """Model results (a dict of arrays, as the batch model returns) for the pending x values."""
+        mid = self._pending
+        if self.descending:
+            results = {key: np.asarray(values, dtype=float)[::-1] for key, values in results.items()}
+        results = {key: np.broadcast_to(np.asarray(values, dtype=float), mid.shape) for key, values in results.items()}
+        self.passes += 1
+
+        if self.results is None:
+            self.x = mid
+            self.results = {key: values.copy() for key, values in results.items()}
+            ys = {key: results[key] for key in self.outputs}
+            self._queue(mid[:-1], mid[1:], {k: v[:-1] for k, v in ys.items()}, {k: v[1:] for k, v in ys.items()},
+                        np.full(len(mid) - 1, np.inf))
+            return
+
+        self._merge(mid, results)
+        mid_y = {key: results[key] for key in self.outputs}
+        error = np.zeros(len(mid))
+        for key in self.outputs:
+            low, high = np.nanmin(self.results[key]), np.nanmax(self.results[key])
+            scale = max(high - low, 1e-12 * max(abs(low), abs(high), 1.0))
+            chord = (self._left_y[key] + self._right_y[key]) / 2.0
+            error = np.fmax(error, np.abs(mid_y[key] - chord) / scale)
+
+        refine = error > self.tolerance
+        self._queue(
+            np.concatenate([self._left[refine], mid[refine]]),
+            np.concatenate([mid[refine], self._right[refine]]),
+            {key: np.concatenate([self._left_y[key][refine], mid_y[key][refine]]) for key in self.outputs},
+            {key: np.concatenate([mid_y[key][refine], self._right_y[key][refine]]) for key in self.outputs},
+            np.concatenate([error[refine], error[refine]]),
+        )
+
+    def samples(self):
+        """The evaluated x values, in sweep order, and the results at them."""
+        if self.descending:
+            return self.x[::-1], {key: values[::-1] for key, values in self.results.items()}
+        return self.x, self.results
+
+    def _merge(self, x_new, results):
+        order = np.argsort(np.concatenate([self.x, x_new]), kind='stable')
+        self.x = np.concatenate([self.x, x_new])[order]
+        self.results = {key: np.concatenate([self.results[key], results[key]])[order] for key in self.results}
+
+    def _queue(self, left, right, left_y, right_y, priority):
+        keep = (right - left) > self.min_width
+        budget = self.max_evaluations - self.evaluations
+        if keep.sum() > budget:
+            # Out of budget: refine only the intervals with the largest errors
+            candidates = np.flatnonzero(keep)
+            keep[:] = False
+            keep[candidates[np.argsort(-priority[candidates], kind='stable')[:budget]]] = True
+        order = np.argsort(left[keep], kind='stable')
+        self._left, self._right = left[keep][order], right[keep][order]
+        self._left_y = {key: values[keep][order] for key, values in left_y.items()}
+        self._right_y = {key: values[keep][order] for key, values in right_y.items()}
+        self._pending = (self._left + self._right) / 2.0
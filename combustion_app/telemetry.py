@@ -0,0 +1,338 @@
+# combustion_app/telemetry.py
+# Replays historian time series through the batch model: rolling aggregates and downsampled chart series.
+import csv
+import datetime
+
+import numpy as np
+from django.utils import timezone
+
+from .furnace_model import DEFAULT_FIDELITY, compile_fuel_profile, run_combustion_model_batch
+from .ingest import DEFAULT_CHUNK_ROWS, CSVColumnsError
+from .runs import INPUT_COLUMNS
+
+TIMESTAMP_COLUMN = 'timestamp'
+MEASURED_COLUMN = 'measured_efficiency'
+
+# Model outputs traced over time, with chart labels
+TELEMETRY_OUTPUTS = {
+    'efficiency': 'Efficiency (%)',
+    'cost_per_gj': 'Cost (₹/GJ)',
+    'emissions_co_ppm': 'CO (ppm)',
+    'emissions_nox_ppm': 'NOx (ppm)',
+}
+
+# Points per series sent to the browser
+DEFAULT_CHART_POINTS = 2000
+# Min/max preselection keeps this many points per output point before the final LTTB pass
+PRESELECT_FACTOR = 4
+DEFAULT_WINDOW_SECONDS = 3600
+
+
+def parse_timestamp(value, default_timezone=None):
+    """
+    Seconds since the epoch from a number (already epoch seconds) or an ISO 8601 string.
+    Strings without an offset are read in `default_timezone` (the site's TIME_ZONE by default).
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    moment = datetime.datetime.fromisoformat(value.strip())
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=default_timezone or timezone.get_default_timezone())
+    return moment.timestamp()
+
+
+def iter_telemetry_chunks(text_stream, chunk_size=DEFAULT_CHUNK_ROWS):
+    """
+    Parses a telemetry CSV (timestamp, moisture_percent, excess_air_percent, furnace_load_gj_hour
+    and optionally measured_efficiency) in bounded-size chunks, like ingest.iter_csv_chunks.
+    Yields (timestamps, arrays, bad_rows); `arrays` has measured_efficiency only if the file does,
+    NaN where a row's cell is blank (the model inputs alone make the row usable).
+    """
+    reader = csv.reader(text_stream)
+    header = next(reader, None)
+    if header is None:
+        raise CSVColumnsError("The CSV file is empty.")
+
+    header = [name.strip() for name in header]
+    required = (TIMESTAMP_COLUMN,) + INPUT_COLUMNS
+    if any(name not in header for name in required):
+        raise CSVColumnsError(
+            "CSV file must contain columns named " + ", ".join(f"'{name}'" for name in required) + "."
+        )
+    columns = INPUT_COLUMNS + ((MEASURED_COLUMN,) if MEASURED_COLUMN in header else ())
+    indexes = [header.index(name) for name in INPUT_COLUMNS]
+    measured_at = header.index(MEASURED_COLUMN) if MEASURED_COLUMN in header else None
+    time_index = header.index(TIMESTAMP_COLUMN)
+    default_timezone = timezone.get_default_timezone()
+
+    timestamps = np.empty(chunk_size)
+    buffers = np.empty((len(columns), chunk_size))
+    filled = 0
+    bad_rows = 0
+
+    for row in reader:
+        if not row:
+            continue
+        try:
+            timestamps[filled] = parse_timestamp(row[time_index], default_timezone)
+            values = [float(row[index]) for index in indexes]
+            if measured_at is not None:
+                values.append(float(row[measured_at]) if row[measured_at].strip() else np.nan)
+            buffers[:, filled] = values
+        except (ValueError, IndexError):
+            bad_rows += 1
+            continue
+        filled += 1
+
+        if filled == chunk_size:
+            yield _chunk(columns, timestamps, buffers, filled, bad_rows)
+            filled = 0
+            bad_rows = 0
+
+    if filled or bad_rows:
+        yield _chunk(columns, timestamps, buffers, filled, bad_rows)
+
+
+def _chunk(columns, timestamps, buffers, filled, bad_rows):
+    inputs = len(INPUT_COLUMNS)
+    finite = np.isfinite(timestamps[:filled]) & np.isfinite(buffers[:inputs, :filled]).all(axis=0)
+    arrays = {name: buffers[i, :filled][finite].copy() for i, name in enumerate(columns)}
+    if MEASURED_COLUMN in arrays:
+        measured = arrays[MEASURED_COLUMN]
+        measured[~np.isfinite(measured)] = np.nan
+    return timestamps[:filled][finite].copy(), arrays, bad_rows + int(filled - finite.sum())
+
+
+class RollingMean:
+    """
+    Trailing time-window means over a stream of chunks: each point gets the mean of the
+    points in (t - window, t]. Only the last `window` seconds are carried between chunks.
+    """
+
+    def __init__(self, window_seconds, n_series):
+        self.window = float(window_seconds)
+        self._times = np.empty(0)
+        self._values = np.empty((n_series, 0))
+
+    def add(self, times, values):
+        """Rolling means for the new points; `values` has one row per series. Times must increase."""
+        offset = len(self._times)
+        times = np.concatenate([self._times, times])
+        values = np.concatenate([self._values, values], axis=1)
+        sums = np.concatenate([np.zeros((len(values), 1)), np.cumsum(values, axis=1)], axis=1)
+
+        end = np.arange(offset, len(times)) + 1
+        start = np.searchsorted(times, times[offset:] - self.window, side='right')
+        means = (sums[:, end] - sums[:, start]) / (end - start)
+
+        keep = times > times[-1] - self.window if len(times) else slice(0)
+        self._times, self._values = times[keep], values[:, keep]
+        return means
+
+
+def _minmax_groups(x, y, size):
+    """
+    Reduces consecutive groups of `size` points to two each, the group's minimum and maximum
+    (in time order; the first and last point for a flat group). len(x) must divide by size.
+    """
+    if not len(x):
+        return x, y
+    groups = y.reshape(-1, size)
+    low, high = groups.argmin(axis=1), groups.argmax(axis=1)
+    high = np.where(low == high, size - 1 - (low == size - 1), high)
+    first, second = np.minimum(low, high), np.maximum(low, high)
+    base = np.arange(len(groups)) * size
+    index = np.column_stack([base + first, base + second]).ravel()
+    return x[index], y[index]
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013): keeps the first and
+    last points and, from each of n_out - 2 buckets, the point forming the largest triangle
+    with the point kept before it and the mean of the next bucket. Returns indexes into x.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.intp) + 1
+    edges[-1] = n - 1
+    # Mean of every bucket, and of the last point (the "next bucket" of the final bucket)
+    counts = np.diff(np.append(edges, n))
+    mean_x = np.add.reduceat(x, edges) / counts
+    mean_y = np.add.reduceat(y, edges) / counts
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (mean_y[i + 1] - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+class SeriesDownsampler:
+    """
+    Shape-preserving downsampling of an arbitrarily long series in bounded memory (MinMaxLTTB).
+
+    Incoming points are reduced to the minimum and maximum of each group of `block` points;
+    when more than `capacity` points are kept, neighbouring groups are merged the same way and
+    `block` doubles. result() runs LTTB over the kept points plus the first and last point
+    seen, so the series keeps its full time span and its peaks and dips survive.
+    """
+
+    def __init__(self, n_out=DEFAULT_CHART_POINTS, preselect=PRESELECT_FACTOR):
+        self.n_out = n_out
+        self.capacity = 2 * preselect * n_out
+        self.block = 2
+        self.seen = 0
+        self._ends = None
+        self._x, self._y = np.empty(0), np.empty(0)
+        self._pending_x, self._pending_y = np.empty(0), np.empty(0)
+
+    def add(self, x, y):
+        if not len(x):
+            return
+        first = self._ends[0] if self._ends else (x[0], y[0])
+        self._ends = (first, (x[-1], y[-1]))
+        self.seen += len(x)
+        x = np.concatenate([self._pending_x, x])
+        y = np.concatenate([self._pending_y, y])
+        complete = len(x) - len(x) % self.block
+        reduced_x, reduced_y = _minmax_groups(x[:complete], y[:complete], self.block)
+        self._x = np.concatenate([self._x, reduced_x])
+        self._y = np.concatenate([self._y, reduced_y])
+        self._pending_x, self._pending_y = x[complete:], y[complete:]
+
+        while len(self._x) > self.capacity:
+            # Two kept pairs (four points) become one pair; an odd last pair stays as it is
+            merged = len(self._x) - len(self._x) % 4
+            merged_x, merged_y = _minmax_groups(self._x[:merged], self._y[:merged], 4)
+            self._x = np.concatenate([merged_x, self._x[merged:]])
+            self._y = np.concatenate([merged_y, self._y[merged:]])
+            self.block *= 2
+
+    def result(self):
+        """(x, y) of at most n_out points."""
+        if self._ends is None:
+            return np.empty(0), np.empty(0)
+        (first_x, first_y), (last_x, last_y) = self._ends
+        x = np.concatenate([self._x, self._pending_x])
+        y = np.concatenate([self._y, self._pending_y])
+        inner = (x > first_x) & (x < last_x)
+        x = np.concatenate([[first_x], x[inner], [last_x]])
+        y = np.concatenate([[first_y], y[inner], [last_y]])
+        if last_x == first_x:
+            x, y = x[:1], y[:1]
+        keep = lttb(x, y, self.n_out)
+        return x[keep], y[keep]
+
+
+def replay_telemetry(fuel, text_stream, window_seconds=DEFAULT_WINDOW_SECONDS, fidelity=DEFAULT_FIDELITY,
+                     chunk_size=DEFAULT_CHUNK_ROWS, max_points=DEFAULT_CHART_POINTS, progress_callback=None):
+    """
+    Streams a telemetry CSV through the batch model, one chunk at a time.
+
+    Returns statistics over every row (mean / min / max of each output, and the error against
+    measured efficiency over the rows that have it) plus, for each output, its rolling mean over
+    `window_seconds` and the measured efficiency, a chart series of at most `max_points`
+    points: {'x': epoch seconds, 'y': values}. Rows whose timestamp is not later than the
+    previous row's are skipped and counted as out of order. Memory stays bounded by the chunk
+    size, the rolling window and the downsamplers, however long the series.
+    """
+    profile = compile_fuel_profile(fuel)
+    rolling = RollingMean(window_seconds, len(TELEMETRY_OUTPUTS))
+    samplers = {}
+    totals = {key: {'sum': 0.0, 'min': np.inf, 'max': -np.inf} for key in TELEMETRY_OUTPUTS}
+    rows = bad_rows = out_of_order = measured_rows = 0
+    errors = {'sum': 0.0, 'abs': 0.0, 'sq': 0.0}
+    has_measured = False
+    first = last = None
+
+    for timestamps, arrays, chunk_bad_rows in iter_telemetry_chunks(text_stream, chunk_size):
+        bad_rows += chunk_bad_rows
+        # Keep only rows later than every row before them
+        previous = np.maximum.accumulate(np.concatenate([[-np.inf if last is None else last], timestamps]))[:-1]
+        ordered = timestamps > previous
+        out_of_order += int((~ordered).sum())
+        timestamps = timestamps[ordered]
+        if not len(timestamps):
+            continue
+        arrays = {name: values[ordered] for name, values in arrays.items()}
+
+        results = run_combustion_model_batch(profile, *(arrays[name] for name in INPUT_COLUMNS), fidelity=fidelity)
+        outputs = np.vstack([np.broadcast_to(results[key], timestamps.shape) for key in TELEMETRY_OUTPUTS])
+        means = rolling.add(timestamps, outputs)
+
+        series = {}
+        for i, key in enumerate(TELEMETRY_OUTPUTS):
+            series[key] = outputs[i]
+            series[f'rolling_{key}'] = means[i]
+            total = totals[key]
+            total['sum'] += float(outputs[i].sum())
+            total['min'] = min(total['min'], float(outputs[i].min()))
+            total['max'] = max(total['max'], float(outputs[i].max()))
+        for name, values in series.items():
+            samplers.setdefault(name, SeriesDownsampler(max_points)).add(timestamps, values)
+        if MEASURED_COLUMN in arrays:
+            has_measured = True
+            measured = ~np.isnan(arrays[MEASURED_COLUMN])
+            error = outputs[0][measured] - arrays[MEASURED_COLUMN][measured]
+            measured_rows += len(error)
+            errors['sum'] += float(error.sum())
+            errors['abs'] += float(np.abs(error).sum())
+            errors['sq'] += float(np.square(error).sum())
+            samplers.setdefault(MEASURED_COLUMN, SeriesDownsampler(max_points)).add(
+                timestamps[measured], arrays[MEASURED_COLUMN][measured])
+
+        rows += len(timestamps)
+        first = float(timestamps[0]) if first is None else first
+        last = float(timestamps[-1])
+        if progress_callback is not None:
+            progress_callback(rows)
+
+    summary = {
+        'rows': rows,
+        'bad_rows': bad_rows,
+        'out_of_order_rows': out_of_order,
+        'start': first,
+        'end': last,
+        'window_seconds': window_seconds,
+        'fidelity': fidelity,
+        'stats': {
+            key: {'mean': total['sum'] / rows, 'min': total['min'], 'max': total['max']} if rows else None
+            for key, total in totals.items()
+        },
+        'has_measured': has_measured,
+        'measured_rows': measured_rows,
+        'bias': errors['sum'] / measured_rows if measured_rows else None,
+        'mae': errors['abs'] / measured_rows if measured_rows else None,
+        'rmse': (errors['sq'] / measured_rows) ** 0.5 if measured_rows else None,
+        'series': {},
+    }
+    for name, sampler in samplers.items():
+        x, y = sampler.result()
+        summary['series'][name] = {'x': x, 'y': y}
+    summary['plotted_points'] = max((len(series['x']) for series in summary['series'].values()), default=0)
+    return summary
+
+
+def telemetry_chart_data(summary, decimals=3):
+    """Chart payload for the telemetry page: times in epoch milliseconds, one {x, y} list per series."""
+    return {
+        'labels': dict(TELEMETRY_OUTPUTS, measured_efficiency='Measured Efficiency (%)'),
+        'window_seconds': summary['window_seconds'],
+        'series': {
+            name: {
+                'x': np.round(series['x'] * 1000).astype(np.int64).tolist(),
+                'y': np.round(series['y'], decimals).tolist(),
+            }
+            for name, series in summary['series'].items()
+        },
+    }
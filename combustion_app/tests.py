@@ -1,3 +1,1440 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
 
-# Create your tests here.
+import numpy as np
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Fuel, FuelBlendComponent, FurnaceRun, ModelCalibration, SimulationJob
+from .furnace_model import run_combustion_model, run_combustion_model_batch, BATCH_RESULT_KEYS, FuelProfile, ModelParameters
+from .furnace_model import gas_mixture_coefficients, mixture_enthalpy, solve_adiabatic_temperature
+from .sweeps import run_grid_sweep, run_parametric_sweep, run_adaptive_sweep, AdaptiveSampler
+from .ingest import iter_csv_chunks, run_validation_stream, ReservoirSample
+from .cache import ResultCache, cached_combustion_model, get_result_cache
+from .uncertainty import run_monte_carlo
+from . import pool as job_pool
+from .pool import get_compute_pool
+from .jobs import ProgressReporter, fail_stale_jobs
+from .management.commands.run_simulation_worker import Command as WorkerCommand
+from .optimize import optimize_excess_air
+from .pareto import pareto_mask, pareto_front
+from .runs import import_runs
+from .export import read_columnar
+from .history import history_page
+from .benchmarks import generate_dataset, run_benchmarks, compare_to_baseline
+from .instrumentation import latency_stats
+from .catalogue import get_fuel_catalogue
+from .calibration import fit_model_parameters, CalibrationError, CALIBRATION_PARAMETERS
+from .sensitivity import sobol_indices, morris_screening, ranked_factors
+from .blends import create_blend, optimize_blend, simplex_grid, candidate_count, BlendError
+from . import surrogate
+from .surrogate import SurrogateStore
+from .telemetry import RollingMean, SeriesDownsampler, lttb, replay_telemetry
+from .scoring import ProfileTable, score_stream
+from .runs import evaluate_points
+from .forms import AnalysisForm, GridAnalysisForm, ParetoForm
+
+
+class BatchModelTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+
+    def test_batch_matches_scalar(self):
+        moisture = np.array([5.0, 10.0, 25.0, 40.0])
+        excess_air = np.array([10.0, 30.0, 60.0, 150.0])
+        load = np.array([0.5, 1.0, 2.0, 10.0])
+        batch = run_combustion_model_batch(self.fuel, moisture, excess_air, load)
+
+        for i in range(len(moisture)):
+            scalar = run_combustion_model(self.fuel, moisture[i], excess_air[i], load[i])
+            for key in BATCH_RESULT_KEYS:
+                self.assertAlmostEqual(batch[key][i], scalar[key], places=9, msg=key)
+
+    def test_batch_broadcasts_and_handles_zero_cases(self):
+        # 100% moisture leaves no dry fuel; zero load has no cost
+        batch = run_combustion_model_batch(self.fuel, [10.0, 100.0], 40.0, [0.0, 1.0])
+        scalar_wet = run_combustion_model(self.fuel, 100.0, 40.0, 1.0)
+
+        self.assertEqual(batch['efficiency'].shape, (2,))
+        self.assertEqual(batch['cost_per_gj'][0], 0.0)
+        self.assertEqual(batch['t_adiabatic_c'][1], scalar_wet['t_adiabatic_c'])
+        self.assertEqual(batch['efficiency'][1], scalar_wet['efficiency'])
+
+
+class FuelProfileTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Wood Chips')
+
+    def test_profile_gives_identical_results(self):
+        profile = self.fuel.get_profile()
+        self.assertEqual(run_combustion_model(profile, 15, 35, 2), run_combustion_model(self.fuel, 15, 35, 2))
+        batch = run_combustion_model_batch(profile, [15, 30], 35, 2)
+        self.assertEqual(batch['cost_per_gj'][0], run_combustion_model(self.fuel, 15, 35, 2)['cost_per_gj'])
+
+    def test_profile_is_immutable_and_versioned(self):
+        profile = self.fuel.get_profile()
+        self.assertIsInstance(profile, FuelProfile)
+        self.assertIs(self.fuel.get_profile(), profile)
+        with self.assertRaises(AttributeError):
+            profile.C = 0.9
+
+        self.fuel.hhv_mj_kg = 20.0
+        self.assertIsNot(self.fuel.get_profile(), profile)
+        self.assertEqual(self.fuel.get_profile().hhv_kj_kg, 20000.0)
+
+
+class AnalysisViewTests(TestCase):
+    def test_sweep_renders_chart_data(self):
+        fuel = Fuel.objects.get(name='Wood Chips')
+        response = self.client.post('/analysis/', {
+            'fuel': fuel.id, 'variable_to_sweep': 'excess_air_percent',
+            'start_value': 10, 'end_value': 100, 'steps': 20,
+            'constant_moisture': 10, 'constant_excess_air': 40, 'constant_load': 1,
+        })
+        self.assertEqual(response.status_code, 200)
+        chart_data = json.loads(response.context['chart_data'])
+        self.assertEqual(len(chart_data['efficiency_data']), 20)
+
+
+class GridSweepTests(TestCase):
+    def test_grid_matches_batch_model(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        moisture = np.linspace(5, 50, 7)
+        excess_air = np.linspace(10, 200, 9)
+        grid = run_grid_sweep(fuel, moisture, excess_air, [1.0, 3.0])
+
+        self.assertEqual(grid['outputs']['efficiency'].shape, (2, 7, 9))
+        point = run_combustion_model(fuel, moisture[3], excess_air[4], 3.0)
+        self.assertAlmostEqual(grid['outputs']['cost_per_gj'][1, 3, 4], point['cost_per_gj'], places=9)
+
+    def test_grid_view_returns_compact_payload(self):
+        fuel = Fuel.objects.get(name='Wood Chips')
+        response = self.client.post('/analysis/grid/', {
+            'fuel': fuel.id,
+            'moisture_start': 5, 'moisture_end': 50, 'moisture_steps': 200,
+            'excess_air_start': 10, 'excess_air_end': 200, 'excess_air_steps': 200,
+            'loads': '1, 2.5',
+        })
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.context['chart_data'])
+        self.assertEqual(payload['shape'], [2, 200, 200])
+        self.assertEqual(len(payload['outputs']['emissions_co_ppm'][1][199]), 200)
+
+    def test_non_finite_loads_are_rejected(self):
+        fuel = Fuel.objects.get(name='Wood Chips')
+        for loads in ('1, nan', 'inf', '2, -inf'):
+            form = GridAnalysisForm({
+                'fuel': fuel.id,
+                'moisture_start': 5, 'moisture_end': 50, 'moisture_steps': 10,
+                'excess_air_start': 10, 'excess_air_end': 200, 'excess_air_steps': 10,
+                'loads': loads,
+            })
+            self.assertFalse(form.is_valid())
+            self.assertEqual(form.errors['loads'], ["Furnace loads must be finite numbers."])
+
+
+class StreamingValidationTests(TestCase):
+    CSV = (
+        "excess_air,measured_efficiency\n"
+        "10,79.2\n"
+        "20,75.0\n"
+        "thirty,71.5\n"
+        "40,\n"
+        "\n"
+        "50,nan\n"
+        "60,64.1\n"
+    )
+
+    def test_chunks_are_bounded_and_bad_rows_counted(self):
+        chunks = list(iter_csv_chunks(io.StringIO(self.CSV), ('excess_air', 'measured_efficiency'), chunk_size=2))
+        self.assertEqual([len(arrays['excess_air']) for arrays, _ in chunks], [2, 1])
+        self.assertEqual(sum(bad for _, bad in chunks), 3)
+
+    def test_stream_statistics_match_scalar_model(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        summary = run_validation_stream(fuel, 10, 1, io.StringIO(self.CSV), chunk_size=2)
+
+        errors = [
+            run_combustion_model(fuel, 10, x, 1)['efficiency'] - y
+            for x, y in [(10, 79.2), (20, 75.0), (60, 64.1)]
+        ]
+        self.assertEqual(summary['rows'], 3)
+        self.assertEqual(summary['bad_rows'], 3)
+        self.assertAlmostEqual(summary['mae'], sum(abs(e) for e in errors) / 3)
+
+    def test_reservoir_keeps_bounded_sample(self):
+        sample = ReservoirSample(100, ('x',))
+        for start in range(0, 10000, 1000):
+            sample.add({'x': np.arange(start, start + 1000, dtype=float)})
+        self.assertEqual(sample.seen, 10000)
+        self.assertEqual(len(np.unique(sample.as_dict()['x'])), 100)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0)
+    def test_view_streams_upload_from_disk(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        upload = SimpleUploadedFile('plant.csv', self.CSV.encode('utf-8'), content_type='text/csv')
+        response = self.client.post('/validation/', {
+            'fuel': fuel.id, 'constant_moisture': 10, 'constant_load': 1, 'validation_file': upload,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['summary']['bad_rows'], 3)
+        self.assertEqual(len(json.loads(response.context['chart_data'])['labels']), 3)
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+        self.cache = get_result_cache()
+        self.cache.clear()
+
+    def test_repeat_point_is_a_hit(self):
+        first = cached_combustion_model(self.fuel, 10, 40, 1)
+        second = cached_combustion_model(self.fuel, 10, 40, 1)
+        self.assertIs(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_lru_evicts_oldest_entry(self):
+        cache = ResultCache(max_entries=2)
+        for inputs in [(1,), (2,), (1,), (3,)]:
+            key = cache.make_key(self.fuel, 'point', inputs)
+            if cache.get(key) is None:
+                cache.set(key, inputs)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNotNone(cache.get(cache.make_key(self.fuel, 'point', (1,))))
+        self.assertIsNone(cache.get(cache.make_key(self.fuel, 'point', (2,))))
+
+    def test_batches_are_bounded_by_stored_points(self):
+        cache = ResultCache(max_points=1000)
+        for i, size in enumerate((400, 400, 1, 400)):
+            cache.set(cache.make_key(self.fuel, 'batch', i), {'efficiency': np.zeros(size)}, size)
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['points'], cache.evictions), (3, 801, 1))
+        self.assertIsNone(cache.get(cache.make_key(self.fuel, 'batch', 0)))
+
+        cache.set(cache.make_key(self.fuel, 'batch', 'huge'), {'efficiency': np.zeros(5000)}, 5000)
+        self.assertIsNone(cache.get(cache.make_key(self.fuel, 'batch', 'huge')))
+        cache.invalidate_fuel(self.fuel.pk)
+        self.assertEqual(cache.stats()['points'], 0)
+
+    def test_editing_fuel_invalidates_entries(self):
+        before = cached_combustion_model(self.fuel, 10, 40, 1)
+        self.fuel.cost_per_tonne = 80.0
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fuel.save()
+            # Until the edit commits, other requests still read the old row, so entries stay
+            self.assertEqual(self.cache.stats()['entries'], 1)
+        self.addCleanup(get_fuel_catalogue().invalidate)  # the edit is rolled back after the test
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+        after = cached_combustion_model(self.fuel, 10, 40, 1)
+        self.assertAlmostEqual(after['cost_per_gj'], before['cost_per_gj'] * 80.0 / 50.0)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_shared_backend_versioned_invalidation(self):
+        cache = ResultCache(alias='default')
+        key = cache.make_key(self.fuel, 'point', (10.0, 40.0, 1.0))
+        cache.set(key, {'efficiency': 70.0})
+        self.assertEqual(cache.get(key), {'efficiency': 70.0})
+
+        cache.invalidate_fuel(self.fuel.pk)
+        self.assertIsNone(cache.get(cache.make_key(self.fuel, 'point', (10.0, 40.0, 1.0))))
+
+    def test_results_page_uses_stored_values(self):
+        run = FurnaceRun.objects.create(fuel=self.fuel, moisture_percent=10, excess_air_percent=40)
+        run.run_and_save_simulation()
+        self.cache.clear()
+
+        response = self.client.get(f'/results/{run.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.cache.misses, 0)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SimulationJobTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+
+    def run_worker(self):
+        call_command('run_simulation_worker', workers=0, once=True, stdout=io.StringIO())
+
+    def test_background_grid_sweep_round_trip(self):
+        response = self.client.post('/analysis/grid/', {
+            'fuel': self.fuel.id,
+            'moisture_start': 5, 'moisture_end': 50, 'moisture_steps': 20,
+            'excess_air_start': 10, 'excess_air_end': 200, 'excess_air_steps': 30,
+            'loads': '1, 2', 'run_in_background': 'on',
+        })
+        job = SimulationJob.objects.get()
+        self.assertRedirects(response, f'/jobs/{job.id}/')
+        self.assertEqual(self.client.get(f'/jobs/{job.id}/status/').json()['status'], 'queued')
+
+        self.run_worker()
+        status = self.client.get(f'/jobs/{job.id}/status/').json()
+        self.assertEqual((status['status'], status['progress']), ('succeeded', 1.0))
+        result = self.client.get(f'/jobs/{job.id}/result/').json()
+        self.assertEqual(result['chart_data']['shape'], [2, 20, 30])
+        self.assertEqual(self.client.get(f'/jobs/{job.id}/').status_code, 200)
+
+    def test_background_validation_reads_saved_upload(self):
+        upload = SimpleUploadedFile('plant.csv', b"excess_air,measured_efficiency\n10,79.2\nbad,1\n60,64.1\n")
+        self.client.post('/validation/', {
+            'fuel': self.fuel.id, 'constant_moisture': 10, 'constant_load': 1,
+            'validation_file': upload, 'run_in_background': 'on',
+        })
+        job = SimulationJob.objects.get()
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, SimulationJob.STATUS_SUCCEEDED)
+        self.assertEqual((job.result['summary']['rows'], job.result['summary']['bad_rows']), (2, 1))
+
+    def test_finished_and_stale_jobs_delete_their_input_files(self):
+        with tempfile.TemporaryDirectory() as media, override_settings(MEDIA_ROOT=media):
+            upload = SimpleUploadedFile('plant.csv', b"excess_air,measured_efficiency\n10,79.2\n")
+            self.client.post('/validation/', {
+                'fuel': self.fuel.id, 'constant_moisture': 10, 'constant_load': 1,
+                'validation_file': upload, 'run_in_background': 'on',
+            })
+            job = SimulationJob.objects.get()
+            path = job.input_file.path
+            self.assertTrue(os.path.exists(path))
+            self.run_worker()
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.input_file.name), (SimulationJob.STATUS_SUCCEEDED, ''))
+            self.assertFalse(os.path.exists(path))
+
+            # A job claimed by a worker that then died
+            stale = SimulationJob.objects.create(kind=SimulationJob.KIND_VALIDATION, params={'fuel_id': self.fuel.id},
+                                                 status=SimulationJob.STATUS_RUNNING)
+            stale.input_file.save('stale.csv', SimpleUploadedFile('stale.csv', b"x\n"))
+            fresh = SimulationJob.objects.create(kind=SimulationJob.KIND_ANALYSIS, params={'fuel_id': self.fuel.id},
+                                                 status=SimulationJob.STATUS_RUNNING, started_at=timezone.now())
+            SimulationJob.objects.filter(id=stale.id).update(started_at=timezone.now() - timedelta(hours=2))
+
+            status = self.client.get(f'/jobs/{stale.id}/status/').json()
+            self.assertEqual(status['status'], 'failed')
+            stale.refresh_from_db()
+            self.assertEqual(stale.input_file.name, '')
+            self.assertEqual(os.listdir(os.path.join(media, 'job_inputs')), [])
+            fresh.refresh_from_db()
+            self.assertEqual(fresh.status, SimulationJob.STATUS_RUNNING)
+
+    def test_jobs_reporting_progress_are_not_stale(self):
+        started = timezone.now() - timedelta(hours=2)
+        quiet, busy = [SimulationJob.objects.create(
+            kind=SimulationJob.KIND_TELEMETRY, params={'fuel_id': self.fuel.id},
+            status=SimulationJob.STATUS_RUNNING, started_at=started, heartbeat_at=started) for _ in range(2)]
+        ProgressReporter(busy.id)(0.5)
+
+        self.assertEqual(fail_stale_jobs(), 1)
+        quiet.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual((quiet.status, busy.status), (SimulationJob.STATUS_FAILED, SimulationJob.STATUS_RUNNING))
+        self.assertEqual(busy.progress, 0.5)
+
+    def test_broken_process_pool_fails_only_its_unfinished_jobs(self):
+        crashed, finished = [SimulationJob.objects.create(
+            kind=SimulationJob.KIND_ANALYSIS, params={'fuel_id': self.fuel.id},
+            status=SimulationJob.STATUS_RUNNING, started_at=timezone.now()) for _ in range(2)]
+        # The second job stored its result just before another process in the pool died
+        SimulationJob.objects.filter(id=finished.id).update(status=SimulationJob.STATUS_SUCCEEDED)
+        running = {}
+        for job in (crashed, finished):
+            future = Future()
+            future.set_exception(BrokenProcessPool("A process in the process pool was terminated abruptly"))
+            running[future] = job.id
+
+        command = WorkerCommand(stdout=io.StringIO(), stderr=io.StringIO())
+        pool = job_pool.make_process_pool(1)
+        new_pool = command._replace_broken_pool(pool, running, 1)
+        self.addCleanup(new_pool.shutdown)
+
+        self.assertIsNot(new_pool, pool)
+        self.assertEqual(running, {})
+        crashed.refresh_from_db()
+        finished.refresh_from_db()
+        self.assertEqual((crashed.status, finished.status), (SimulationJob.STATUS_FAILED, SimulationJob.STATUS_SUCCEEDED))
+        self.assertIn("terminated abruptly", crashed.error)
+
+    def test_failed_job_records_error(self):
+        job = SimulationJob.objects.create(kind=SimulationJob.KIND_ANALYSIS, params={'fuel_id': 999})
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, SimulationJob.STATUS_FAILED)
+        self.assertEqual(self.client.get(f'/jobs/{job.id}/result/').status_code, 409)
+
+
+class MonteCarloTests(TestCase):
+    UNCERTAINTIES = {
+        'C': ('normal', 0.02),
+        'hhv_mj_kg': ('uniform', 1.0),
+        'moisture_percent': ('triangular', 3.0),
+    }
+
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Wood Chips')
+
+    def test_no_uncertainty_collapses_to_deterministic_result(self):
+        summary = run_monte_carlo(self.fuel, 10, 40, 1, {}, 1000, batch_size=300)
+        expected = run_combustion_model(self.fuel, 10, 40, 1)['cost_per_gj']
+        bands = summary['outputs']['cost_per_gj']['percentiles']
+        self.assertAlmostEqual(bands['p5'], expected)
+        self.assertAlmostEqual(bands['p95'], expected)
+
+    def test_bands_are_ordered_and_reproducible_across_workers(self):
+        serial = run_monte_carlo(self.fuel, 10, 40, 1, self.UNCERTAINTIES, 40000, batch_size=10000, seed=7)
+        parallel = run_monte_carlo(self.fuel, 10, 40, 1, self.UNCERTAINTIES, 40000, batch_size=10000, seed=7,
+                                   pool=get_compute_pool(2))
+        bands = serial['outputs']['efficiency']['percentiles']
+        self.assertLess(bands['p5'], bands['p50'])
+        self.assertLess(bands['p50'], bands['p95'])
+        self.assertEqual(serial['outputs'], parallel['outputs'])
+
+    def test_view_renders_percentile_table(self):
+        response = self.client.post('/uncertainty/', {
+            'fuel': self.fuel.id, 'moisture': 10, 'excess_air': 40, 'load': 1,
+            'n_samples': 10000, 'distribution': 'normal',
+            'composition_spread': 5, 'hhv_spread': 3, 'cost_spread': 10,
+            'moisture_spread': 2, 'excess_air_spread': 5,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['bands']), 5)
+        self.assertEqual(json.loads(response.context['chart_data'])['n_samples'], 10000)
+
+
+class ExcessAirOptimizerTests(TestCase):
+    def test_matches_dense_scan_on_constraint_boundary(self):
+        fuels = list(Fuel.objects.order_by('name'))
+        result = optimize_excess_air(fuels, 10, 1, 'min_cost', co_limit_ppm=100, nox_limit_ppm=None)
+
+        for fuel, row in zip(fuels, result['optima']):
+            scan = np.linspace(0, 200, 200001)
+            batch = run_combustion_model_batch(fuel, 10, scan, 1)
+            ok = (batch['emissions_co_ppm'] <= 100) & (batch['efficiency'] > 0)
+            expected = scan[ok][np.argmin(batch['cost_per_gj'][ok])]
+            self.assertTrue(row['feasible'])
+            self.assertAlmostEqual(row['excess_air_percent'], expected, delta=0.01)
+            self.assertLessEqual(row['emissions_co_ppm'], 100)
+        self.assertLess(result['evaluations'], 200001)
+
+    def test_impossible_limits_are_reported(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        result = optimize_excess_air([fuel], 10, 1, 'max_efficiency', co_limit_ppm=10)
+        self.assertEqual(result['optima'][0]['feasible'], False)
+
+    def test_library_mode_view(self):
+        response = self.client.post('/optimize/', {
+            'fuel': '', 'objective': 'max_efficiency', 'moisture': 10, 'load': 1,
+            'co_limit': 100, 'nox_limit': '', 'excess_air_min': 0, 'excess_air_max': 200,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['optimization']['optima']), Fuel.objects.count())
+
+
+class ParetoTests(TestCase):
+    def brute_force_mask(self, costs):
+        keep = np.ones(len(costs), dtype=bool)
+        for i in range(len(costs)):
+            for j in range(len(costs)):
+                if i != j and np.all(costs[j] <= costs[i]) and (np.any(costs[j] < costs[i]) or j < i):
+                    keep[i] = False
+                    break
+        return keep
+
+    def test_mask_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        for d in (2, 3, 4):
+            # Integer costs produce plenty of ties and duplicates
+            costs = rng.integers(0, 5, (200, d)).astype(float)
+            self.assertEqual(pareto_mask(costs).sum(), self.brute_force_mask(costs).sum())
+            self.assertEqual(set(map(tuple, costs[pareto_mask(costs)])),
+                             set(map(tuple, costs[self.brute_force_mask(costs)])))
+
+    def test_front_is_cached_per_fuel_and_range(self):
+        fuels = list(Fuel.objects.all())
+        get_result_cache().clear()
+        first = pareto_front(fuels, (5, 40), (0, 200), 60, ['cost_per_gj', 'emissions_co_ppm', 'emissions_nox_ppm'])
+        hits = get_result_cache().hits
+        second = pareto_front(fuels, (5, 40), (0, 200), 60, ['cost_per_gj', 'emissions_co_ppm', 'emissions_nox_ppm'])
+
+        self.assertEqual(first, second)
+        self.assertEqual(get_result_cache().hits, hits + len(fuels))
+        self.assertLess(first['frontier_size'], first['evaluated_points'])
+
+    def test_view_returns_only_frontier_points(self):
+        response = self.client.post('/pareto/', {
+            'fuels': [fuel.id for fuel in Fuel.objects.all()],
+            'objectives': ['cost_per_gj', 'emissions_nox_ppm'],
+            'moisture_start': 5, 'moisture_end': 40, 'excess_air_start': 0, 'excess_air_end': 200, 'steps': 100,
+        })
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.context['chart_data'])
+        self.assertEqual(len(payload['points']['cost_per_gj']), payload['frontier_size'])
+
+    def test_large_frontiers_are_fast_and_plotted_downsampled(self):
+        fuels = list(Fuel.objects.all())
+        started = time.perf_counter()
+        front = pareto_front(fuels, (5, 40), (0, 200), 200, ['cost_per_gj', 'emissions_co_ppm', 'emissions_nox_ppm'],
+                             max_points=1000)
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertGreater(front['frontier_size'], 1000)
+        self.assertEqual(front['plotted_points'], 1000)
+        self.assertEqual(len(front['points']['fuel']), 1000)
+
+        data = {'fuels': [fuel.id for fuel in fuels], 'objectives': [name for name, _ in ParetoForm.OBJECTIVE_CHOICES],
+                'moisture_start': 5, 'moisture_end': 40, 'excess_air_start': 0, 'excess_air_end': 200, 'steps': 100}
+        self.assertIn('steps', ParetoForm(data).errors)
+        self.assertTrue(ParetoForm(dict(data, objectives=data['objectives'][:3])).is_valid())
+
+
+class SimulateAPITests(TestCase):
+    def post(self, payload):
+        return self.client.post('/api/simulate/', json.dumps(payload), content_type='application/json')
+
+    def test_mixed_fuel_columnar_batch_matches_scalar_model(self):
+        husk = Fuel.objects.get(name='Rice Husk')
+        chips = Fuel.objects.get(name='Wood Chips')
+        response = self.post({
+            'points': {
+                'fuel_id': [husk.id, chips.id, husk.id],
+                'moisture_percent': [10, 20, 30],
+                'excess_air_percent': 40,
+            },
+            'outputs': ['efficiency', 'cost_per_gj'],
+        })
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['count'], 3)
+        self.assertEqual(set(body['results']), {'efficiency', 'cost_per_gj'})
+        expected = run_combustion_model(chips, 20, 40, 1.0)['cost_per_gj']
+        self.assertAlmostEqual(body['results']['cost_per_gj'][1], expected)
+        self.assertEqual(FurnaceRun.objects.count(), 0)
+
+    def test_rows_with_persist_bulk_creates_runs(self):
+        fuel = Fuel.objects.get(name='Wood Chips')
+        response = self.post({
+            'fuel_id': fuel.id,
+            'points': [{'moisture_percent': 10, 'excess_air_percent': ea} for ea in (20, 40, 60)],
+            'persist': True, 'name': 'SCADA',
+        })
+        self.assertEqual(response.json()['persisted'], 3)
+        run = FurnaceRun.objects.get(excess_air_percent=40)
+        self.assertEqual((run.name, run.fuel_id), ('SCADA', fuel.id))
+        self.assertAlmostEqual(run.calculated_efficiency, run_combustion_model(fuel, 10, 40)['efficiency'])
+
+    def test_client_errors_are_400(self):
+        self.assertEqual(self.post({'points': {'fuel_id': 999, 'moisture_percent': 10, 'excess_air_percent': 40}}).status_code, 400)
+        self.assertEqual(self.post({'points': {'fuel_id': 1, 'moisture_percent': [1, 2], 'excess_air_percent': [1, 2, 3]}}).status_code, 400)
+        self.assertEqual(self.client.post('/api/simulate/', 'nope', content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.get('/api/simulate/').status_code, 405)
+
+    def test_rows_may_differ_in_optional_columns(self):
+        husk = Fuel.objects.get(name='Rice Husk')
+        chips = Fuel.objects.get(name='Wood Chips')
+        response = self.post({
+            'fuel_id': husk.id,
+            'points': [{'moisture_percent': 10, 'excess_air_percent': 40},
+                       {'moisture_percent': 10, 'excess_air_percent': 40, 'furnace_load_gj_hour': 5, 'fuel_id': chips.id}],
+            'outputs': ['cost_per_hour'],
+        })
+        self.assertEqual(response.status_code, 200)
+        costs = response.json()['results']['cost_per_hour']
+        self.assertAlmostEqual(costs[0], run_combustion_model(husk, 10, 40, 1.0)['cost_per_hour'])
+        self.assertAlmostEqual(costs[1], run_combustion_model(chips, 10, 40, 5)['cost_per_hour'])
+
+        # Without a top-level default, a fuel id in only some rows is an error
+        response = self.post({'points': [{'moisture_percent': 10, 'excess_air_percent': 40},
+                                         {'fuel_id': chips.id, 'moisture_percent': 10, 'excess_air_percent': 40}]})
+        self.assertEqual(response.status_code, 400)
+
+    def test_persist_is_refused_for_non_default_modes(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        point = {'fuel_id': fuel.id, 'moisture_percent': 10, 'excess_air_percent': 40}
+        for options in ({'fidelity': 'variable_cp'}, {'surrogate': True}):
+            response = self.post(dict({'points': [point], 'persist': True}, **options))
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(FurnaceRun.objects.count(), 0)
+
+    def test_malformed_payloads_are_400_not_500(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        point = {'fuel_id': fuel.id, 'moisture_percent': 10, 'excess_air_percent': 40}
+        for payload in ({'points': [1, 2]},
+                        {'points': [point, 'oops']},
+                        {'points': [point], 'outputs': 5},
+                        {'points': [point], 'outputs': 'efficiency'},
+                        {'points': dict(point, fuel_id=fuel.id + 0.7)},
+                        {'points': [point], 'persist': 'false'}):
+            response = self.post(payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertIn('error', response.json())
+        self.assertEqual(FurnaceRun.objects.count(), 0)
+        response = self.client.post('/api/simulate/', b'\xff\xfe\x00', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class RunImportTests(TestCase):
+    def test_csv_import_evaluates_chunks_and_reports_bad_rows(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        lines = ["fuel,moisture_percent,excess_air_percent,run_date"]
+        lines += [f"rice husk,{10 + i % 5},{20 + i},2020-01-0{1 + i % 9}T08:00:00" for i in range(25)]
+        lines += ["Unknown Fuel,10,40,", "Rice Husk,wet,40,"]
+        report = import_runs(io.StringIO("\n".join(lines)), 'csv', chunk_size=10)
+
+        self.assertEqual((report['created'], report['bad_rows'], len(report['errors'])), (25, 2, 2))
+        run = FurnaceRun.objects.get(excess_air_percent=30)
+        self.assertEqual((run.fuel_id, run.name, run.run_date.year), (fuel.id, 'Imported Run', 2020))
+        self.assertAlmostEqual(run.calculated_efficiency, run_combustion_model(fuel, 10, 30, 1.0)['efficiency'])
+
+    def test_command_imports_jsonl(self):
+        fuel = Fuel.objects.get(name='Wood Chips')
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+            for ea in (20, 40, 60):
+                f.write(json.dumps({'fuel_id': fuel.id, 'moisture_percent': 15, 'excess_air_percent': ea,
+                                    'furnace_load_gj_hour': 2, 'name': f'Log {ea}'}) + "\n")
+            f.write("not json\n")
+        out = io.StringIO()
+        call_command('import_runs', f.name, stdout=out, stderr=io.StringIO())
+
+        self.assertIn("Imported 3 run(s), skipped 1 row(s).", out.getvalue())
+        run = FurnaceRun.objects.get(name='Log 60')
+        self.assertAlmostEqual(run.cost_per_hour, run_combustion_model(fuel, 15, 60, 2)['cost_per_hour'])
+
+    def test_zero_load_is_kept_in_both_formats(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        import_runs(io.StringIO(f"fuel_id,moisture_percent,excess_air_percent,furnace_load_gj_hour\n{fuel.id},10,40,0\n"), 'csv')
+        import_runs(io.StringIO(json.dumps({'fuel_id': fuel.id, 'moisture_percent': 10, 'excess_air_percent': 50,
+                                            'furnace_load_gj_hour': 0}) + "\n"), 'jsonl')
+        import_runs(io.StringIO(json.dumps({'fuel_id': fuel.id, 'moisture_percent': 10, 'excess_air_percent': 60}) + "\n"), 'jsonl')
+        loads = dict(FurnaceRun.objects.values_list('excess_air_percent', 'furnace_load_gj_hour'))
+        self.assertEqual(loads, {40: 0.0, 50: 0.0, 60: 1.0})
+
+    def test_fractional_and_infinite_fuel_ids_are_bad_rows(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        text = (f"fuel_id,moisture_percent,excess_air_percent\n{fuel.id}.7,10,40\ninf,10,40\n"
+                f"{fuel.id},1e999,40\n{fuel.id}.0,10,40\n")
+        report = import_runs(io.StringIO(text), 'csv')
+        jsonl = import_runs(io.StringIO(json.dumps({'fuel_id': fuel.id, 'moisture_percent': 10 ** 400,
+                                                    'excess_air_percent': 40}) + "\n"), 'jsonl')
+
+        self.assertEqual((report['created'], report['bad_rows']), (1, 3))
+        self.assertIn(f"Line 2: invalid fuel id '{fuel.id}.7'", report['errors'])
+        self.assertIn("Line 3: invalid fuel id 'inf'", report['errors'])
+        self.assertEqual((jsonl['created'], jsonl['bad_rows']), (0, 1))
+        self.assertEqual(FurnaceRun.objects.get().fuel_id, fuel.id)
+
+    def test_upload_view_and_single_write_form_path(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        upload = SimpleUploadedFile('runs.csv', f"fuel_id,moisture_percent,excess_air_percent\n{fuel.id},10,40\n".encode())
+        response = self.client.post('/runs/import/', {'runs_file': upload, 'file_format': 'csv', 'default_name': 'Upload'})
+        self.assertEqual(response.context['report']['created'], 1)
+
+        get_fuel_catalogue().get(fuel.id)  # warm
+        with self.assertNumQueries(1):  # one INSERT: no UPDATE, and fuels come from the catalogue
+            self.client.post('/', {'name': 'Form', 'fuel': fuel.id, 'moisture_percent': 10,
+                                   'excess_air_percent': 40, 'furnace_load_gj_hour': 1})
+        self.assertEqual(FurnaceRun.objects.filter(name='Form').count(), 1)
+
+
+class RunExportTests(TestCase):
+    def setUp(self):
+        husk = Fuel.objects.get(name='Rice Husk')
+        chips = Fuel.objects.get(name='Wood Chips')
+        lines = ["fuel_id,moisture_percent,excess_air_percent,run_date,name"]
+        lines += [f"{husk.id},10,{20 + i},2021-03-{1 + i:02d}T12:00:00,Husk {i}" for i in range(10)]
+        lines += [f"{chips.id},15,40,2021-04-01T12:00:00,Chips"]
+        import_runs(io.StringIO("\n".join(lines)), 'csv')
+        self.husk, self.chips = husk, chips
+
+    def get(self, **params):
+        response = self.client.get('/runs/export/', params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv_filters_by_date_and_fuel(self):
+        rows = self.get(format='csv', start_date='2021-03-03', end_date='2021-03-05').decode().splitlines()
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(rows[0].startswith('id,name,run_date,fuel_id,fuel_name'))
+        self.assertIn('Husk 2', rows[1])
+
+        rows = self.get(format='csv', fuel=self.chips.id).decode().splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertIn('Wood Chips', rows[1])
+
+    def test_jsonl_and_columnar_round_trip(self):
+        records = [json.loads(line) for line in self.get(format='jsonl').decode().splitlines()]
+        self.assertEqual(len(records), 11)
+        self.assertEqual(records[-1]['fuel_name'], 'Wood Chips')
+
+        columns = read_columnar(io.BytesIO(self.get(format='columnar')))
+        self.assertEqual(columns['name'], [record['name'] for record in records])
+        np.testing.assert_allclose(columns['cost_per_gj'], [record['cost_per_gj'] for record in records])
+        self.assertEqual(columns['fuel_id'].tolist(), [record['fuel_id'] for record in records])
+
+    def test_invalid_filters_are_400(self):
+        self.assertEqual(self.client.get('/runs/export/', {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/runs/export/', {'format': 'csv', 'start_date': '2021-05-01', 'end_date': '2021-01-01'}).status_code, 400)
+
+
+class RunHistoryTests(TestCase):
+    def setUp(self):
+        husk = Fuel.objects.get(name='Rice Husk')
+        chips = Fuel.objects.get(name='Wood Chips')
+        lines = ["fuel_id,moisture_percent,excess_air_percent,run_date"]
+        # Pairs of runs share a timestamp, so paging must break ties on id
+        lines += [f"{husk.id if i % 3 else chips.id},10,{20 + i},2022-01-{1 + i // 2:02d}T00:00:00" for i in range(25)]
+        import_runs(io.StringIO("\n".join(lines)), 'csv')
+        self.chips = chips
+
+    def test_keyset_pages_cover_every_run_once(self):
+        seen, cursor = [], None
+        while True:
+            page, cursor = history_page(FurnaceRun.objects.all(), cursor, page_size=4)
+            seen += [run.id for run in page]
+            if cursor is None:
+                break
+        expected = list(FurnaceRun.objects.order_by('-run_date', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_history_view_filters_and_selects_fuel(self):
+        with self.assertNumQueries(1):  # one page with fuels joined; the fuel filter uses the catalogue
+            response = self.client.get('/runs/', {'fuel': self.chips.id, 'end_date': '2022-01-06'})
+            names = [run.fuel.name for run in response.context['runs']]
+        self.assertEqual(names, ['Wood Chips'] * 4)
+
+    def test_compare_summarises_large_selections(self):
+        run_ids = list(FurnaceRun.objects.values_list('id', flat=True))
+        response = self.client.get('/compare/', {'run_ids': run_ids})
+        self.assertIsNone(response.context['runs'])
+        summary = response.context['summary']
+        self.assertEqual(summary['count'], 25)
+        self.assertEqual(sum(row['count'] for row in summary['by_fuel']), 25)
+        excess_air = summary['metrics'][7]
+        self.assertEqual((excess_air['min'], excess_air['max'], excess_air['mean']), (20.0, 44.0, 32.0))
+
+        response = self.client.get('/compare/', {'run_ids': run_ids[:3]})
+        self.assertEqual(len(response.context['runs']), 3)
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_quick_suite_covers_every_url_and_flags_regressions(self):
+        generate_dataset(n_runs=300)
+        report = run_benchmarks(quick=True)
+        self.assertEqual(report['skipped_urls'], [])
+        self.assertIn('request.simulate_api.median', report['results'])
+        json.dumps(report)
+
+        baseline = json.loads(json.dumps(report))
+        baseline['results']['model.scalar_per_point']['value'] /= 2  # was twice as fast
+        baseline['results']['validation.throughput']['value'] /= 2  # was half as fast
+        statuses = {key: status for key, _, _, _, status in compare_to_baseline(report, baseline)}
+        self.assertEqual(statuses['model.scalar_per_point'], 'regression')
+        self.assertEqual(statuses['validation.throughput'], 'improved')
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        latency_stats.clear()
+        get_result_cache().clear()
+
+    def test_server_timing_breaks_down_model_db_and_render(self):
+        fuel = Fuel.objects.get(name='Rice Husk')
+        response = self.client.post('/analysis/', {
+            'fuel': fuel.id, 'variable_to_sweep': 'excess_air_percent', 'start_value': 10, 'end_value': 100,
+            'steps': 20, 'constant_moisture': 10, 'constant_excess_air': 40, 'constant_load': 1,
+        })
+        header = response['Server-Timing']
+        for phase in ('model;', 'serialize;', 'render;', 'total;'):
+            self.assertIn(phase, header)
+        self.assertIn('desc="20 points"', header)
+        self.assertIn('db;', self.client.get('/runs/')['Server-Timing'])
+
+    def test_timing_stats_histograms_per_view_and_logs(self):
+        with self.assertLogs('combustion_app.timing', level='INFO') as logs:
+            for _ in range(3):
+                self.client.get('/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual((record['view'], record['status']), ('simulation_input', 200))
+
+        stats = self.client.get('/stats/timing/').json()['views']['simulation_input']
+        self.assertEqual(stats['count'], 3)
+        self.assertEqual(sum(stats['histogram'].values()), 3)
+        self.assertGreater(stats['mean_queries'], 0)
+
+
+class FuelCatalogueTests(TestCase):
+    def setUp(self):
+        self.catalogue = get_fuel_catalogue()
+        self.catalogue.invalidate()
+        self.addCleanup(self.catalogue.invalidate)
+
+    def fuel_queries(self, func):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as captured:
+            func()
+        return [q['sql'] for q in captured.captured_queries if 'FROM "combustion_app_fuel"' in q['sql']]
+
+    def test_warm_catalogue_makes_no_fuel_queries(self):
+        self.client.get('/analysis/')  # warms the catalogue
+        fuel = self.catalogue.all()[0]
+        for url in ('/analysis/', '/validation/', '/optimize/', '/pareto/'):
+            self.assertEqual(self.fuel_queries(lambda: self.client.get(url)), [], url)
+
+        post = lambda: self.client.post('/', {'name': 'Run', 'fuel': fuel.id, 'moisture_percent': 10,
+                                              'excess_air_percent': 40, 'furnace_load_gj_hour': 1})
+        self.assertEqual(self.fuel_queries(post), [])
+        self.assertEqual(FurnaceRun.objects.get(name='Run').fuel_id, fuel.id)
+
+    def test_forms_clean_to_catalogue_fuels_and_saving_a_fuel_reloads(self):
+        fuel = Fuel.objects.get(name='Wood Chips')
+        form = AnalysisForm({'fuel': fuel.id, 'variable_to_sweep': 'excess_air_percent', 'start_value': 10,
+                             'end_value': 50, 'steps': 5, 'constant_moisture': 10, 'constant_excess_air': 40,
+                             'constant_load': 1})
+        self.assertTrue(form.is_valid())
+        self.assertIs(form.cleaned_data['fuel'], self.catalogue.get(fuel.id))
+        self.assertFalse(AnalysisForm({'fuel': 999}).is_valid())
+
+        loads = self.catalogue.loads
+        fuel.cost_per_tonne = 75.0
+        with self.captureOnCommitCallbacks(execute=True):
+            fuel.save()
+        self.assertEqual(self.catalogue.get(fuel.id).cost_per_tonne, 75.0)
+        self.assertEqual(self.catalogue.loads, loads + 1)
+
+
+class CalibrationTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+        self.true_params = ModelParameters(q_loss_fraction=0.07, t_exhaust_k=560.0)
+        rng = np.random.default_rng(7)
+        self.excess_air = rng.uniform(10, 150, 100000)
+        profile = self.fuel.get_profile().with_params(self.true_params)
+        self.measured = run_combustion_model_batch(profile, 15, self.excess_air, 1)['efficiency'] \
+            + rng.normal(0, 0.3, len(self.excess_air))
+        get_fuel_catalogue().invalidate()
+        self.addCleanup(get_fuel_catalogue().invalidate)
+
+    def test_default_parameters_leave_results_unchanged(self):
+        profile = self.fuel.get_profile()
+        default = run_combustion_model(profile.with_params(ModelParameters()), 10, 40, 1)
+        self.assertEqual(run_combustion_model(self.fuel, 10, 40, 1), default)
+        self.assertEqual(default['exhaust_temp_c'], 250.0)
+
+    def test_fit_recovers_parameters_from_100k_rows_quickly(self):
+        fit = fit_model_parameters(self.fuel, self.excess_air, self.measured, 15, 1,
+                                   ['q_loss_fraction', 't_exhaust_k'])
+        self.assertTrue(fit['converged'])
+        self.assertTrue(fit['identifiable'])
+        self.assertAlmostEqual(fit['parameters'].q_loss_fraction, 0.07, places=3)
+        self.assertAlmostEqual(fit['parameters'].t_exhaust_k, 560.0, delta=1.0)
+        self.assertEqual(fit['parameters'].cp_fg_dry, ModelParameters().cp_fg_dry)
+        self.assertAlmostEqual(fit['rmse_after'], 0.3, places=2)
+        self.assertGreater(fit['rmse_before'], fit['rmse_after'])
+        self.assertLess(fit['seconds'], 5)
+
+        # Heat loss, Cp and exhaust temperature together are not separable from efficiency alone
+        fit = fit_model_parameters(self.fuel, self.excess_air, self.measured, 15, 1, list(CALIBRATION_PARAMETERS))
+        self.assertFalse(fit['identifiable'])
+        self.assertAlmostEqual(fit['rmse_after'], 0.3, places=2)
+
+        with self.assertRaises(CalibrationError):
+            fit_model_parameters(self.fuel, self.excess_air, self.measured, 15, 1, ['hhv'])
+
+    def test_active_calibration_is_used_by_later_simulations(self):
+        lines = ["excess_air,measured_efficiency"] + [
+            f"{x},{y}" for x, y in zip(self.excess_air[:5000].tolist(), self.measured[:5000].tolist())
+        ]
+        upload = SimpleUploadedFile('plant.csv', ("\n".join(lines) + "\n").encode(), content_type='text/csv')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/calibration/', {
+                'fuel': self.fuel.id, 'constant_moisture': 15, 'constant_load': 1, 'calibration_file': upload,
+                'parameters': ['q_loss_fraction', 't_exhaust_k'], 'name': 'Plant A', 'activate': 'on',
+            })
+        self.assertEqual(response.status_code, 200)
+        calibration = ModelCalibration.objects.get(name='Plant A')
+        self.assertTrue(calibration.is_active)
+        self.assertEqual(calibration.rows, 5000)
+        self.assertAlmostEqual(calibration.parameters['t_exhaust_k'], 560.0, delta=3.0)
+
+        # Simulations through the form pick up the fitted exhaust temperature
+        self.client.post('/', {'name': 'Calibrated', 'fuel': self.fuel.id, 'moisture_percent': 15,
+                               'excess_air_percent': 40, 'furnace_load_gj_hour': 1})
+        run = FurnaceRun.objects.get(name='Calibrated')
+        self.assertAlmostEqual(run.exhaust_temp_c, calibration.parameters['t_exhaust_k'] - 273.15)
+
+        # Deactivating returns the fuel to the defaults
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/calibration/{calibration.id}/activate/', {'active': '0'})
+        fuel = get_fuel_catalogue().get(self.fuel.id)
+        self.assertIsNone(fuel.model_params)
+        self.assertEqual(cached_combustion_model(fuel, 15, 40, 1)['exhaust_temp_c'], 250.0)
+
+    def test_recomputed_older_run_uses_the_active_calibration(self):
+        ModelCalibration.objects.create(fuel=self.fuel, parameters=self.true_params.as_dict(),
+                                        moisture_percent=15, furnace_load_gj_hour=1, is_active=True)
+        run = FurnaceRun.objects.create(name='Old', fuel=self.fuel, moisture_percent=15,
+                                        excess_air_percent=40, furnace_load_gj_hour=1)
+        self.assertIsNone(run.calculated_efficiency)
+
+        self.client.get(f'/results/{run.id}/')
+        run.refresh_from_db()
+        self.assertAlmostEqual(run.exhaust_temp_c, 560.0 - 273.15)
+
+
+class SensitivityTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+        self.bounds = {
+            'moisture_percent': (5, 30),
+            'excess_air_percent': (10, 100),
+            'C': (self.fuel.C * 0.9, self.fuel.C * 1.1),
+            'cost_per_tonne': (self.fuel.cost_per_tonne * 0.8, self.fuel.cost_per_tonne * 1.2),
+        }
+
+    def test_sobol_indices_attribute_variance_and_are_reproducible_across_workers(self):
+        serial = sobol_indices(self.fuel, 10, 40, 1, self.bounds, 4096, batch_size=5000, seed=3)
+        parallel = sobol_indices(self.fuel, 10, 40, 1, self.bounds, 4096, batch_size=5000, seed=3,
+                                 pool=get_compute_pool(2))
+        self.assertEqual(serial['outputs'], parallel['outputs'])
+        self.assertEqual(serial['n_evaluations'], 4096 * 6)
+
+        nox = serial['outputs']['emissions_nox_ppm']
+        # NOx does not depend on the fuel price; excess air matters most
+        self.assertEqual(nox['ST'][3], 0.0)
+        self.assertEqual(ranked_factors(serial, 'emissions_nox_ppm')[0], 1)
+        for s1, st, conf in zip(nox['S1'], nox['ST'], nox['S1_conf']):
+            self.assertLessEqual(s1, st + conf)
+        self.assertEqual(serial['factors'][ranked_factors(serial, 'cost_per_gj')[0]], 'cost_per_tonne')
+
+    def test_morris_screening_ranks_like_sobol(self):
+        result = morris_screening(self.fuel, 10, 40, 1, self.bounds, 200, seed=3)
+        self.assertEqual(result['n_evaluations'], 200 * 5)
+        nox = result['outputs']['emissions_nox_ppm']
+        self.assertEqual(nox['mu_star'][3], 0.0)
+        self.assertEqual(ranked_factors(result, 'emissions_nox_ppm')[0], 1)
+        self.assertEqual(result['factors'][ranked_factors(result, 'cost_per_gj')[0]], 'cost_per_tonne')
+
+    def test_view_renders_ranked_charts(self):
+        response = self.client.post('/sensitivity/', {
+            'fuel': self.fuel.id, 'method': 'morris', 'n_evaluations': 10000,
+            'factors': ['moisture_percent', 'excess_air_percent', 'cost_per_tonne'],
+            'moisture_min': 5, 'moisture_max': 30, 'excess_air_min': 10, 'excess_air_max': 100, 'load': 1,
+            'composition_spread': 10, 'hhv_spread': 5, 'cost_spread': 20,
+        })
+        self.assertEqual(response.status_code, 200)
+        charts = json.loads(response.context['chart_data'])
+        cost = next(chart for chart in charts if chart['key'] == 'cost_per_gj')
+        self.assertEqual(cost['factors'][0], 'Fuel Price (₹/tonne)')
+        self.assertEqual(len(cost['primary']), 3)
+
+
+class BlendTests(TestCase):
+    def setUp(self):
+        self.fuels = list(Fuel.objects.filter(name__in=['Rice Husk', 'Wood Chips']).order_by('name'))
+        self.addCleanup(get_fuel_catalogue().invalidate)
+
+    def test_simplex_grid_covers_every_blend_once(self):
+        grid = simplex_grid(3, 4)
+        self.assertEqual(len(grid), candidate_count(3, 4))
+        self.assertTrue(np.allclose(grid.sum(axis=1), 1.0))
+        self.assertEqual(len({tuple(row) for row in np.round(grid * 4).astype(int)}), len(grid))
+        self.assertTrue((grid >= 0).all())
+
+    def test_blend_is_mass_weighted_usable_and_follows_its_components(self):
+        rice, wood = self.fuels
+        with self.captureOnCommitCallbacks(execute=True):
+            blend = create_blend('Husk-Chip Mix', [rice, wood], [30, 10])
+        self.assertTrue(blend.is_blend)
+        for name in ('C', 'H', 'O', 'Ash', 'hhv_mj_kg', 'cost_per_tonne'):
+            self.assertAlmostEqual(getattr(blend, name), 0.75 * getattr(rice, name) + 0.25 * getattr(wood, name))
+        with self.assertRaises(BlendError):
+            create_blend('Nested', [blend, rice], [1, 1])
+
+        # Selectable like any fuel
+        self.assertEqual(get_fuel_catalogue().get(blend.id).name, 'Husk-Chip Mix')
+        response = self.client.post('/', {'name': 'Blend Run', 'fuel': blend.id, 'moisture_percent': 10,
+                                          'excess_air_percent': 40, 'furnace_load_gj_hour': 1})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(FurnaceRun.objects.get(name='Blend Run').fuel_id, blend.id)
+
+        wood.cost_per_tonne = 9000.0
+        with self.captureOnCommitCallbacks(execute=True):
+            wood.save()
+        blend.refresh_from_db()
+        self.assertAlmostEqual(blend.cost_per_tonne, 0.75 * rice.cost_per_tonne + 0.25 * 9000.0)
+        self.assertAlmostEqual(get_fuel_catalogue().get(blend.id).cost_per_tonne, blend.cost_per_tonne)
+
+    def test_optimizer_beats_pure_fuels_within_limits(self):
+        limits = {'co_limit_ppm': 100, 'nox_limit_ppm': 20}
+        result = optimize_blend(self.fuels, 10, 1, divisions=20, **limits)
+        pure = optimize_excess_air(self.fuels, 10, 1, 'min_cost', **limits)['optima']
+
+        self.assertEqual(result['candidates'], 21)
+        best = result['blends'][0]
+        self.assertAlmostEqual(sum(best['fractions']), 1.0)
+        self.assertLessEqual(best['emissions_co_ppm'], 100)
+        self.assertLessEqual(best['emissions_nox_ppm'], 20)
+        for row in pure:
+            if row['feasible']:
+                self.assertLessEqual(best['cost_per_gj'], row['cost_per_gj'] + 1e-9)
+        costs = [blend['cost_per_gj'] for blend in result['blends']]
+        self.assertEqual(costs, sorted(costs))
+
+    def test_views_optimize_and_save_a_blend(self):
+        response = self.client.post('/blends/optimize/', {
+            'fuels': [fuel.id for fuel in self.fuels], 'moisture': 10, 'load': 1, 'co_limit': 100,
+            'nox_limit': '', 'excess_air_min': 0, 'excess_air_max': 200, 'divisions': 10,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('best', json.loads(response.context['chart_data']))
+        # The cheapest candidate that is a real mix of both fuels
+        mix = next(blend for blend in response.context['optimization']['blends'] if min(blend['fractions']) > 0)
+
+        data = {'name': mix['name']}
+        data.update({field: percent for _, field, percent in mix['recipe']})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertRedirects(self.client.post('/blends/', data), '/blends/')
+        blend = Fuel.objects.get(name=mix['name'])
+        self.assertEqual(FuelBlendComponent.objects.filter(blend=blend).count(), 2)
+        self.assertContains(self.client.get('/blends/'), mix['name'])
+
+
+class SurrogateTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = SurrogateStore(directory.name)
+        # Signals and the API use the process-wide store
+        previous, surrogate._surrogate_store = surrogate._surrogate_store, self.store
+        self.addCleanup(setattr, surrogate, '_surrogate_store', previous)
+        self.addCleanup(get_fuel_catalogue().invalidate)
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+
+    def test_interpolation_stays_within_stated_bounds(self):
+        rng = np.random.default_rng(5)
+        n = 20000
+        moisture, excess_air, load = rng.uniform(0, 70, n), rng.uniform(-10, 200, n), rng.uniform(0.5, 5, n)
+        results, exact = self.store.evaluate(self.fuel, moisture, excess_air, load)
+        expected = run_combustion_model_batch(self.fuel, moisture, excess_air, load)
+        table = self.store.table(self.fuel)
+
+        self.assertTrue(exact[(moisture > 60) | (excess_air < 0)].all())
+        self.assertGreater(table.coverage, 0.8)
+        for key in BATCH_RESULT_KEYS:
+            error = np.abs(results[key] - expected[key])
+            np.testing.assert_array_equal(results[key][exact], expected[key][exact])
+            self.assertLessEqual(error[~exact].max(), table.error_bounds[key], key)
+
+    def test_tables_are_shared_files_and_follow_fuel_edits(self):
+        table = self.store.table(self.fuel)
+        self.assertIsInstance(table.values, np.memmap)
+        # Another process (a second store on the same directory) maps the file instead of building
+        other = SurrogateStore(self.store.directory)
+        self.assertEqual(other.table(self.fuel).digest, table.digest)
+        self.assertEqual(other.builds, 0)
+
+        self.fuel.cost_per_tonne *= 2
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fuel.save()
+        self.assertEqual(list(self.store.directory.glob(f'fuel-{self.fuel.pk}-*')), [])
+        results, _ = other.evaluate(self.fuel, 10.0, 40.0, 1.0)
+        self.assertEqual(other.builds, 1)
+        self.assertAlmostEqual(float(results['cost_per_gj']),
+                               run_combustion_model(self.fuel, 10, 40, 1.0)['cost_per_gj'], places=4)
+
+    def test_api_surrogate_mode_reports_error_bounds(self):
+        response = self.client.post('/api/simulate/', json.dumps({
+            'points': {'fuel_id': self.fuel.id, 'moisture_percent': [10, 20, 80], 'excess_air_percent': 40},
+            'outputs': ['efficiency', 'emissions_nox_ppm'],
+            'surrogate': True,
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(set(body['error_bounds']), {'efficiency', 'emissions_nox_ppm'})
+        self.assertEqual(body['exact_points'], 1)
+        expected = run_combustion_model_batch(self.fuel, [10, 20, 80], 40, 1.0)['efficiency']
+        np.testing.assert_allclose(body['results']['efficiency'], expected,
+                                   atol=body['error_bounds']['efficiency'] + 1e-12)
+
+
+class VariableCpTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Wood Chips')
+
+    def test_newton_solver_matches_bisection(self):
+        rng = np.random.default_rng(2)
+        n = 500
+        mixture = gas_mixture_coefficients({'CO2': rng.uniform(0.5, 2, n), 'H2O': rng.uniform(0.2, 1, n),
+                                            'O2': rng.uniform(0, 1, n), 'N2': rng.uniform(3, 12, n)})
+        heat = rng.uniform(2000, 20000, n)
+        solved = solve_adiabatic_temperature(mixture, heat, np.full(n, 1000.0))
+
+        low, high = np.full(n, 250.0), np.full(n, 4000.0)
+        for _ in range(60):
+            middle = (low + high) / 2
+            above = mixture_enthalpy(mixture, middle) > heat
+            high, low = np.where(above, middle, high), np.where(above, low, middle)
+        np.testing.assert_allclose(solved, (low + high) / 2, atol=1e-6)
+
+    def test_variable_cp_lowers_flame_temperature_of_dry_fuel(self):
+        moisture, excess_air = np.array([0.0, 10.0, 40.0]), np.array([10.0, 40.0, 100.0])
+        constant = run_combustion_model_batch(self.fuel, moisture, excess_air, 1.0)
+        variable = run_combustion_model_batch(self.fuel, moisture, excess_air, 1.0, fidelity='variable_cp')
+
+        # Heat capacities rise with temperature, most of all at the hottest (driest) point
+        drop = constant['t_adiabatic_c'] - variable['t_adiabatic_c']
+        self.assertTrue((drop > 0).all())
+        self.assertEqual(int(np.argmax(drop)), 0)
+        self.assertTrue((variable['emissions_nox_ppm'] < constant['emissions_nox_ppm']).all())
+        np.testing.assert_allclose(variable['efficiency'], constant['efficiency'], atol=2.0)
+
+        scalar = run_combustion_model(self.fuel, 10.0, 40.0, 1.0, fidelity='variable_cp')
+        self.assertAlmostEqual(scalar['t_adiabatic_c'], variable['t_adiabatic_c'][1])
+        with self.assertRaises(ValueError):
+            run_combustion_model_batch(self.fuel, 10, 40, 1.0, fidelity='exact')
+
+    def test_sweep_and_api_select_fidelity(self):
+        response = self.client.post('/analysis/', {
+            'fuel': self.fuel.id, 'variable_to_sweep': 'excess_air_percent', 'start_value': 10, 'end_value': 50,
+            'steps': 5, 'constant_moisture': 10, 'constant_excess_air': 40, 'constant_load': 1,
+            'fidelity': 'variable_cp',
+        })
+        chart = json.loads(response.context['chart_data'])
+        expected = run_combustion_model_batch(self.fuel, 10, np.linspace(10, 50, 5), 1, fidelity='variable_cp')
+        np.testing.assert_allclose(chart['efficiency_data'], expected['efficiency'])
+
+        payload = {'points': {'fuel_id': self.fuel.id, 'moisture_percent': [10], 'excess_air_percent': [40]},
+                   'outputs': ['t_adiabatic_c'], 'fidelity': 'variable_cp'}
+        body = self.client.post('/api/simulate/', json.dumps(payload), content_type='application/json').json()
+        self.assertAlmostEqual(body['results']['t_adiabatic_c'][0], expected['t_adiabatic_c'][3])
+        payload['fidelity'] = 'exact'
+        response = self.client.post('/api/simulate/', json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class TelemetryTests(TestCase):
+    CSV = (
+        "timestamp,moisture_percent,excess_air_percent,furnace_load_gj_hour,measured_efficiency\n"
+        "2024-01-01T00:00:00+00:00,10,20,1,75\n"
+        "1704067260,10,40,1,70\n"
+        "2024-01-01T00:00:30+00:00,10,60,1,65\n"
+        "2024-01-01T00:03:00+00:00,bad,60,1,65\n"
+        "2024-01-01T00:04:00+00:00,12,60,1,66\n"
+    )
+
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+
+    def test_rolling_mean_matches_brute_force_across_chunks(self):
+        rng = np.random.default_rng(0)
+        times = np.cumsum(rng.uniform(0.1, 3, 500))
+        values = rng.normal(size=(2, 500))
+        rolling = RollingMean(10, 2)
+        means = np.hstack([rolling.add(times[i:i + 37], values[:, i:i + 37]) for i in range(0, 500, 37)])
+
+        expected = np.array([values[:, (times > t - 10) & (times <= t)].mean(axis=1) for t in times]).T
+        np.testing.assert_allclose(means, expected)
+
+    def test_downsampler_is_bounded_and_keeps_extremes(self):
+        rng = np.random.default_rng(1)
+        sampler = SeriesDownsampler(n_out=200)
+        for start in range(0, 300000, 10000):
+            y = rng.normal(size=10000)
+            if start == 150000:
+                y[1234], y[4321] = 50.0, -50.0
+            sampler.add(np.arange(start, start + 10000, dtype=float), y)
+            self.assertLessEqual(len(sampler._x), sampler.capacity)
+
+        x, y = sampler.result()
+        self.assertEqual(len(x), 200)
+        self.assertEqual((x[0], x[-1]), (0.0, 299999.0))
+        self.assertTrue((np.diff(x) > 0).all())
+        self.assertIn(50.0, y)
+        self.assertIn(-50.0, y)
+        self.assertEqual(len(lttb(x, y, 500)), 200)
+
+    def test_replay_statistics_and_out_of_order_rows(self):
+        summary = replay_telemetry(self.fuel, io.StringIO(self.CSV), window_seconds=120, chunk_size=2)
+        self.assertEqual((summary['rows'], summary['bad_rows'], summary['out_of_order_rows']), (3, 1, 1))
+
+        expected = run_combustion_model_batch(self.fuel, np.array([10, 10, 12.0]), np.array([20, 40, 60.0]), 1)
+        series = summary['series']
+        np.testing.assert_allclose(series['efficiency']['y'], expected['efficiency'])
+        np.testing.assert_allclose(series['efficiency']['x'], [1704067200, 1704067260, 1704067440])
+        # The last point is more than two minutes after the others
+        np.testing.assert_allclose(series['rolling_efficiency']['y'][2], expected['efficiency'][2])
+        self.assertAlmostEqual(series['rolling_efficiency']['y'][1], expected['efficiency'][:2].mean())
+        self.assertAlmostEqual(summary['stats']['cost_per_gj']['mean'], expected['cost_per_gj'].mean())
+        self.assertAlmostEqual(summary['bias'], (expected['efficiency'] - [75, 70, 66]).mean())
+
+    def test_blank_measured_efficiency_keeps_the_row(self):
+        text = self.CSV.replace(",70\n", ",\n")
+        summary = replay_telemetry(self.fuel, io.StringIO(text), window_seconds=120)
+        self.assertEqual((summary['rows'], summary['bad_rows'], summary['measured_rows']), (3, 1, 2))
+
+        expected = run_combustion_model_batch(self.fuel, np.array([10, 12.0]), np.array([20, 60.0]), 1)['efficiency']
+        self.assertAlmostEqual(summary['bias'], (expected - [75, 66]).mean())
+        np.testing.assert_allclose(summary['series']['measured_efficiency']['y'], [75, 66])
+        self.assertEqual(len(summary['series']['efficiency']['y']), 3)
+
+    def test_view_sends_downsampled_series(self):
+        times = 1704067200 + np.arange(5000)
+        lines = ["timestamp,moisture_percent,excess_air_percent,furnace_load_gj_hour"]
+        lines += [f"{t},10,{20 + t % 100},1" for t in times.tolist()]
+        upload = SimpleUploadedFile('historian.csv', "\n".join(lines).encode(), content_type='text/csv')
+        response = self.client.post('/telemetry/', {
+            'fuel': self.fuel.id, 'window_seconds': 60, 'fidelity': 'constant_cp', 'telemetry_file': upload,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['summary']['rows'], 5000)
+        chart = json.loads(response.context['chart_data'])
+        self.assertNotIn('measured_efficiency', chart['series'])
+        self.assertEqual(len(chart['series']['efficiency']['x']), 2000)
+        self.assertEqual(chart['series']['efficiency']['x'][-1], int(times[-1]) * 1000)
+
+
+class SimulateCommandTests(TestCase):
+    def setUp(self):
+        self.fuels = list(Fuel.objects.order_by('id'))
+
+    def simulate(self, text, suffix, **options):
+        with tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False) as handle:
+            handle.write(text)
+        self.addCleanup(os.remove, handle.name)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('simulate', handle.name, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_csv_results_match_batch_model_in_input_order(self):
+        first, second = self.fuels[0], self.fuels[1]
+        text = (
+            "id,fuel_id,fuel,moisture_percent,excess_air_percent,furnace_load_gj_hour\n"
+            f"a,{first.id},,10,40,2\n"
+            f"b,,{second.name.upper()},20,80,\n"
+            "c,999,,10,40,1\n"
+            f"d,{second.id},,wet,40,1\n"
+            f'"e,1",{first.id},,30,120,1\n'
+        )
+        stdout, stderr = self.simulate(text, '.csv', outputs='efficiency,cost_per_hour', chunk_size=2, precision=0)
+        rows = list(csv.DictReader(io.StringIO(stdout)))
+
+        expected = evaluate_points(np.array([first.id, second.id, first.id]),
+                                   {'moisture_percent': np.array([10, 20, 30.0]),
+                                    'excess_air_percent': np.array([40, 80, 120.0]),
+                                    'furnace_load_gj_hour': np.array([2, 1, 1.0])})
+        self.assertEqual([row['id'] for row in rows], ['a', 'b', 'e,1'])
+        self.assertEqual(list(rows[0]), ['id', 'fuel_id', 'moisture_percent', 'excess_air_percent',
+                                         'furnace_load_gj_hour', 'efficiency', 'cost_per_hour'])
+        np.testing.assert_array_equal([float(row['efficiency']) for row in rows], expected['efficiency'])
+        np.testing.assert_array_equal([float(row['cost_per_hour']) for row in rows], expected['cost_per_hour'])
+        self.assertIn("Line 4: unknown fuel id 999", stderr)
+        self.assertIn("Line 5: could not convert", stderr)
+        self.assertIn("Scored 3 point(s), skipped 2 row(s)", stderr)
+
+    def test_jsonl_stream_and_workers_give_identical_output(self):
+        rng = np.random.default_rng(3)
+        lines = [json.dumps({'fuel_id': self.fuels[i % len(self.fuels)].id, 'moisture_percent': m,
+                             'excess_air_percent': x}) for i, (m, x) in
+                 enumerate(zip(rng.uniform(5, 40, 500).tolist(), rng.uniform(10, 150, 500).tolist()))]
+        lines.insert(100, '{"fuel_id": 1, "moisture_percent": "NaN", "excess_air_percent": 40}')
+        text = "\n".join(lines) + "\n"
+        table = ProfileTable(get_fuel_catalogue().all())
+
+        outputs = []
+        for pool in (None, get_compute_pool(2)):
+            written, errors = [], []
+            counts = score_stream(io.StringIO(text), table, written.append, file_format='jsonl',
+                                  chunk_size=64, pool=pool, max_pending=4, on_errors=errors.extend)
+            self.assertEqual(counts, (500, 1))
+            self.assertEqual(errors, ["Line 101: non-finite input"])
+            outputs.append(''.join(written))
+        self.assertEqual(outputs[0], outputs[1])
+
+        records = [json.loads(line) for line in outputs[0].splitlines()]
+        self.assertNotIn('id', records[0])
+        self.assertAlmostEqual(records[499]['moisture_percent'], json.loads(lines[500])['moisture_percent'], places=7)
+
+    def test_fractional_and_infinite_fuel_ids_are_bad_rows(self):
+        fuel = self.fuels[0]
+        text = (
+            "fuel_id,moisture_percent,excess_air_percent\n"
+            f"{fuel.id},10,40\n"
+            f"{fuel.id}.7,10,40\n"
+            "inf,10,40\n"
+            f"{fuel.id}.0,20,80\n"
+        )
+        stdout, stderr = self.simulate(text, '.csv')
+        rows = list(csv.DictReader(io.StringIO(stdout)))
+        self.assertEqual([int(row['fuel_id']) for row in rows], [fuel.id, fuel.id])
+        self.assertIn(f"Line 3: invalid fuel id '{fuel.id}.7'", stderr)
+        self.assertIn("Line 4: invalid fuel id 'inf'", stderr)
+        self.assertIn("Scored 2 point(s), skipped 2 row(s)", stderr)
+
+    def test_jsonl_ids_are_kept_when_only_later_records_have_them(self):
+        fuel = self.fuels[0]
+        lines = [json.dumps({'fuel_id': fuel.id, 'moisture_percent': 10, 'excess_air_percent': 40})] * 3
+        lines.append(json.dumps({'id': 'late', 'fuel_id': fuel.id, 'moisture_percent': 10, 'excess_air_percent': 40}))
+        text = "\n".join(lines) + "\n"
+        huge = json.dumps({'fuel_id': fuel.id, 'moisture_percent': 10 ** 400, 'excess_air_percent': 40}) + "\n"
+
+        stdout, stderr = self.simulate(text + huge, '.jsonl', chunk_size=2)
+        self.assertIn("Line 5: int too large", stderr)
+        records = [json.loads(line) for line in stdout.splitlines()]
+        self.assertNotIn('id', records[0])
+        self.assertEqual([record.get('id') for record in records[2:]], [None, 'late'])
+
+        stdout, _ = self.simulate(text, '.jsonl', output_format='csv')
+        rows = list(csv.DictReader(io.StringIO(stdout)))
+        self.assertEqual([row['id'] for row in rows], ['', '', '', 'late'])
+
+    def test_unknown_output_and_missing_columns_are_command_errors(self):
+        with self.assertRaisesMessage(CommandError, "Unknown output(s): flame_colour"):
+            self.simulate("fuel_id,moisture_percent,excess_air_percent\n1,10,40\n", '.csv', outputs='flame_colour')
+        with self.assertRaisesMessage(CommandError, "Missing column(s): excess_air_percent"):
+            self.simulate("fuel_id,moisture_percent\n1,10\n", '.csv')
+
+
+class EventStreamTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+        self.client = AsyncClient()
+
+    async def _events(self, response):
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        events = []
+        for message in body.strip().split('\n\n'):
+            name, data = message.split('\n')
+            events.append((name.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+        return events
+
+    async def test_streamed_sweep_matches_the_analysis_sweep(self):
+        data = {'fuel': self.fuel.id, 'variable_to_sweep': 'excess_air_percent', 'start_value': 10,
+                'end_value': 100, 'steps': 45, 'constant_moisture': 10, 'constant_excess_air': 40,
+                'constant_load': 1}
+        events = await self._events(await self.client.post(reverse('analysis_stream'), data))
+
+        self.assertEqual(events[0], ('start', {'total': 45, 'x_axis_label': 'Excess Air', 'sampling': 'uniform'}))
+        self.assertEqual(events[-1][0], 'done')
+        chunks = [payload for name, payload in events if name == 'chunk']
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[-1]['done'], 45)
+
+        expected = await sync_to_async(run_parametric_sweep)(
+            self.fuel, 'excess_air_percent', 10, 100, 45, 10, 40, 1)
+        for key in ('labels', 'efficiency_data', 'cost_data', 'co_data'):
+            np.testing.assert_allclose(sum((chunk[key] for chunk in chunks), []), expected[key])
+
+    async def test_adaptive_sweep_streams_one_chunk_per_pass(self):
+        data = {'fuel': self.fuel.id, 'variable_to_sweep': 'excess_air_percent', 'start_value': 1,
+                'end_value': 200, 'steps': 10, 'constant_moisture': 10, 'constant_excess_air': 40,
+                'constant_load': 1, 'sampling': 'adaptive', 'tolerance': 0.5}
+        events = await self._events(await self.client.post(reverse('analysis_stream'), data))
+
+        self.assertIsNone(events[0][1]['total'])
+        chunks = [payload for name, payload in events if name == 'chunk']
+        name, done = events[-1]
+        self.assertEqual(len(chunks), done['passes'])
+        expected = await sync_to_async(run_adaptive_sweep)(
+            self.fuel, 'excess_air_percent', 1, 200, 10, 10, 40, 1, tolerance=0.5)
+        self.assertEqual(done['evaluations'], expected['evaluations'])
+        self.assertEqual(sorted(sum((chunk['labels'] for chunk in chunks), [])), expected['labels'])
+
+    async def test_streamed_validation_matches_the_batch_statistics(self):
+        rows = "".join(f"{x},{70 + x % 7}\n" for x in range(5, 300))
+        csv_text = "excess_air,measured_efficiency\n" + rows + "oops,1\n"
+        upload = SimpleUploadedFile('v.csv', csv_text.encode(), content_type='text/csv')
+        response = await self.client.post(reverse('validation_stream'), {
+            'fuel': self.fuel.id, 'constant_moisture': 10, 'constant_load': 1, 'validation_file': upload})
+        events = await self._events(response)
+
+        name, done = events[-1]
+        self.assertEqual(name, 'done')
+        expected = await sync_to_async(run_validation_stream)(self.fuel, 10, 1, io.StringIO(csv_text))
+        for key in ('rows', 'bad_rows', 'bias', 'mae', 'rmse'):
+            self.assertAlmostEqual(done[key], expected[key])
+        plotted = sum(len(payload['labels']) for name, payload in events if name == 'chunk')
+        self.assertEqual(plotted, done['plotted_rows'])
+
+    async def test_invalid_form_and_missing_columns(self):
+        response = await self.client.post(reverse('analysis_stream'), {'fuel': self.fuel.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('steps', json.loads(response.content)['errors'])
+
+        upload = SimpleUploadedFile('v.csv', b"a,b\n1,2\n", content_type='text/csv')
+        response = await self.client.post(reverse('validation_stream'), {
+            'fuel': self.fuel.id, 'constant_moisture': 10, 'constant_load': 1, 'validation_file': upload})
+        events = await self._events(response)
+        self.assertEqual(events[-1][0], 'error')
+        self.assertIn('excess_air', events[-1][1]['message'])
+
+
+class AdaptiveSweepTests(TestCase):
+    def setUp(self):
+        self.fuel = Fuel.objects.get(name='Rice Husk')
+
+    def _interpolation_error(self, x, sweep, dense):
+        # Worst deviation of the linearly interpolated chart from a dense sweep, relative to range
+        errors = []
+        for key in ('efficiency_data', 'cost_data', 'co_data'):
+            truth = np.asarray(dense[key])
+            errors.append(np.max(np.abs(np.interp(dense['labels'], x, sweep[key]) - truth)) / np.ptp(truth))
+        return max(errors)
+
+    def test_adaptive_sweep_is_accurate_with_fewer_evaluations(self):
+        args = (self.fuel, 'excess_air_percent', 0, 200)
+        constants = (10, 40, 1)
+        dense = run_parametric_sweep(*args, 20001, *constants)
+        adaptive = run_adaptive_sweep(*args, 10, *constants, tolerance=0.5)
+
+        self.assertEqual(adaptive['sampling'], 'adaptive')
+        self.assertEqual(adaptive['evaluations'], len(adaptive['labels']))
+        self.assertTrue(np.all(np.diff(adaptive['labels']) > 0))
+        adaptive_error = self._interpolation_error(adaptive['labels'], adaptive, dense)
+        self.assertLess(adaptive_error, 0.01)
+
+        # A uniform grid with four times the evaluations is still less accurate
+        uniform = run_parametric_sweep(*args, 4 * adaptive['evaluations'], *constants)
+        self.assertGreater(self._interpolation_error(uniform['labels'], uniform, dense), adaptive_error)
+        self.assertEqual(uniform['evaluations'], 4 * adaptive['evaluations'])
+
+    def test_sampler_respects_budget_and_sweep_direction(self):
+        sampler = AdaptiveSampler(200, 0, 5, tolerance=0.001, max_evaluations=60)
+        while len(sampler.pending()):
+            x = sampler.pending()
+            sampler.add({'efficiency': np.exp(-x / 10), 'cost_per_gj': x, 'emissions_co_ppm': x})
+        x, results = sampler.samples()
+
+        self.assertEqual(sampler.evaluations, 60)
+        self.assertEqual((x[0], x[-1]), (200, 0))
+        self.assertTrue(np.all(np.diff(x) < 0))
+        np.testing.assert_allclose(results['efficiency'], np.exp(-x / 10))
+        # The budget went to the steep end
+        self.assertGreater(np.sum(x < 50), np.sum(x >= 50))
+
+    def test_analysis_page_reports_adaptive_evaluations(self):
+        data = {'fuel': self.fuel.id, 'variable_to_sweep': 'excess_air_percent', 'start_value': 1,
+                'end_value': 200, 'steps': 10, 'constant_moisture': 10, 'constant_excess_air': 40,
+                'constant_load': 1, 'fidelity': 'constant_cp', 'sampling': 'adaptive', 'tolerance': 1}
+        response = self.client.post(reverse('analysis_view'), data)
+        chart_data = json.loads(response.context['chart_data'])
+        self.assertEqual(chart_data['sampling'], 'adaptive')
+        self.assertEqual(chart_data['tolerance'], 1)
+        self.assertGreater(chart_data['evaluations'], 10)
+        self.assertContains(response, 'js-evaluations')
+
+        job_response = self.client.post(reverse('analysis_view'), dict(data, run_in_background='on'))
+        job = SimulationJob.objects.latest('id')
+        self.assertRedirects(job_response, reverse('job_detail', kwargs={'job_id': job.id}))
+        self.assertEqual(job.params['sampling'], 'adaptive')
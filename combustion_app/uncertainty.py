@@ -0,0 +1,132 @@
+# combustion_app/uncertainty.py
+# Monte Carlo propagation of fuel assay and operating-input scatter through the batch model.
+# Only NumPy and furnace_model are imported here, so batches can run in spawned worker processes.
+import numpy as np
+
+from .furnace_model import FuelProfile, compile_fuel_profile, run_combustion_model_batch
+
+FUEL_PROPERTIES = ('C', 'H', 'O', 'N', 'S', 'Ash', 'hhv_mj_kg', 'cost_per_tonne')
+OPERATING_INPUTS = ('moisture_percent', 'excess_air_percent', 'furnace_load_gj_hour')
+
+DISTRIBUTIONS = ('normal', 'uniform', 'triangular')
+
+UNCERTAINTY_OUTPUTS = ('efficiency', 'cost_per_gj', 't_adiabatic_c', 'emissions_co_ppm', 'emissions_nox_ppm')
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Samples evaluated per vectorized batch (and per task sent to a worker)
+DEFAULT_BATCH_SIZE = 100000
+MAX_SAMPLES = 2000000
+
+# Physical bounds applied to sampled values
+LOWER_BOUNDS = {'moisture_percent': 0.0, 'excess_air_percent': 0.0}
+UPPER_BOUNDS = {'moisture_percent': 99.0}
+
+
+def sample_values(rng, nominal, distribution, spread, n):
+    """
+    Draws n values around `nominal`. `spread` is the standard deviation for 'normal'
+    and the half-width for 'uniform' and 'triangular'.
+    """
+    if distribution == 'normal':
+        return rng.normal(nominal, spread, n)
+    if distribution == 'uniform':
+        return rng.uniform(nominal - spread, nominal + spread, n)
+    if distribution == 'triangular':
+        return rng.triangular(nominal - spread, nominal, nominal + spread, n)
+    raise ValueError(f"Unknown distribution '{distribution}'. Use one of {', '.join(DISTRIBUTIONS)}.")
+
+
+def nominal_inputs(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour):
+    """Central values of every model input (and the fuel's calibrated parameters), keyed by name."""
+    profile = compile_fuel_profile(fuel)
+    nominal = {name: getattr(profile, name) for name in FUEL_PROPERTIES}
+    nominal.update({
+        'model_params': profile.model_params,
+        'moisture_percent': moisture_percent,
+        'excess_air_percent': excess_air_percent,
+        'furnace_load_gj_hour': furnace_load_gj_hour,
+    })
+    return nominal
+
+
+def evaluate_sample_batch(nominal, uncertainties, n, seed, outputs=UNCERTAINTY_OUTPUTS):
+    """
+    Samples n points and evaluates them in one batch model call.
+    `nominal` maps every name in FUEL_PROPERTIES and OPERATING_INPUTS to its central value
+    (and 'model_params' to the fuel's calibrated ModelParameters, if any);
+    `uncertainties` maps a subset of them to (distribution, spread).
+    """
+    rng = np.random.default_rng(seed)
+    values = {}
+    for name, central in nominal.items():
+        if name in uncertainties:
+            distribution, spread = uncertainties[name]
+            sampled = sample_values(rng, central, distribution, spread, n)
+            # Compositions, HHV, cost and load cannot go negative
+            sampled = np.clip(sampled, LOWER_BOUNDS.get(name, 0.0), UPPER_BOUNDS.get(name, np.inf))
+            values[name] = sampled
+        else:
+            values[name] = central
+
+    profile = FuelProfile(None, 'sampled', *(values[name] for name in FUEL_PROPERTIES),
+                          model_params=nominal.get('model_params'))
+    results = run_combustion_model_batch(
+        profile, values['moisture_percent'], values['excess_air_percent'], values['furnace_load_gj_hour']
+    )
+    return {key: np.broadcast_to(results[key], (n,)) for key in outputs}
+
+
+def summarize_samples(samples, bins=40):
+    """Mean, spread, percentile bands and a histogram for each output."""
+    summary = {}
+    for key, values in samples.items():
+        finite = values[np.isfinite(values)]
+        if not len(finite):
+            summary[key] = {'mean': None, 'std': None, 'percentiles': {}, 'histogram': {'edges': [], 'counts': []}}
+            continue
+        bands = np.percentile(finite, PERCENTILES)
+        counts, edges = np.histogram(finite, bins=bins)
+        summary[key] = {
+            'mean': float(finite.mean()),
+            'std': float(finite.std()),
+            'percentiles': {f'p{p}': float(value) for p, value in zip(PERCENTILES, bands)},
+            'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()},
+        }
+    return summary
+
+
+def run_monte_carlo(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour,
+                    uncertainties, n_samples, batch_size=DEFAULT_BATCH_SIZE, pool=None, seed=None):
+    """
+    Propagates input uncertainty through the model with n_samples Monte Carlo samples.
+    Samples are evaluated in vectorized batches; pass a process pool (see pool.get_compute_pool)
+    to spread the batches across CPU cores. Each batch gets an independent random stream,
+    so results for a given seed do not depend on the number of workers.
+    """
+    if n_samples > MAX_SAMPLES:
+        raise ValueError(f"At most {MAX_SAMPLES} samples are supported.")
+
+    nominal = nominal_inputs(fuel, moisture_percent, excess_air_percent, furnace_load_gj_hour)
+    profile = compile_fuel_profile(fuel)
+
+    sizes = [batch_size] * (n_samples // batch_size)
+    if n_samples % batch_size:
+        sizes.append(n_samples % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if pool is None:
+        batches = [evaluate_sample_batch(nominal, uncertainties, size, child)
+                   for size, child in zip(sizes, seeds)]
+    else:
+        futures = [pool.submit(evaluate_sample_batch, nominal, uncertainties, size, child)
+                   for size, child in zip(sizes, seeds)]
+        batches = [future.result() for future in futures]
+
+    samples = {key: np.concatenate([batch[key] for batch in batches]) for key in UNCERTAINTY_OUTPUTS}
+    deterministic = run_combustion_model_batch(profile, moisture_percent, excess_air_percent, furnace_load_gj_hour)
+
+    return {
+        'n_samples': n_samples,
+        'nominal': {key: float(deterministic[key]) for key in UNCERTAINTY_OUTPUTS},
+        'outputs': summarize_samples(samples),
+    }
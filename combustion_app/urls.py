@@ -1,12 +1,32 @@
 # combustion_app/urls.py
 from django.urls import path
-from . import views
+from . import views, api, streams
 
 urlpatterns = [
     path('', views.simulation_input, name='simulation_input'),
     path('results/<int:run_id>/', views.simulation_results, name='simulation_results'),
     path('analysis/', views.analysis_view, name='analysis_view'), 
+    path('analysis/stream/', streams.analysis_stream_view, name='analysis_stream'),
+    path('analysis/grid/', views.grid_analysis_view, name='grid_analysis_view'),
     path('compare/', views.compare_view, name='compare_view'), 
     path('validation/', views.validation_view, name='validation_view'), 
-
+    path('validation/stream/', streams.validation_stream_view, name='validation_stream'),
+    path('telemetry/', views.telemetry_view, name='telemetry_view'),
+    path('calibration/', views.calibration_view, name='calibration_view'),
+    path('calibration/<int:calibration_id>/activate/', views.calibration_activate_view, name='calibration_activate'),
+    path('runs/', views.history_view, name='history_view'),
+    path('runs/import/', views.import_runs_view, name='import_runs_view'),
+    path('runs/export/', views.export_runs_view, name='export_runs'),
+    path('uncertainty/', views.uncertainty_view, name='uncertainty_view'),
+    path('sensitivity/', views.sensitivity_view, name='sensitivity_view'),
+    path('optimize/', views.optimize_view, name='optimize_view'),
+    path('pareto/', views.pareto_view, name='pareto_view'),
+    path('blends/', views.blends_view, name='blends_view'),
+    path('blends/optimize/', views.blend_optimizer_view, name='blend_optimizer_view'),
+    path('stats/cache/', views.cache_stats_view, name='cache_stats'),
+    path('stats/timing/', views.timing_stats_view, name='timing_stats'),
+    path('jobs/<int:job_id>/', views.job_detail_view, name='job_detail'),
+    path('jobs/<int:job_id>/status/', views.job_status_view, name='job_status'),
+    path('jobs/<int:job_id>/result/', views.job_result_view, name='job_result'),
+    path('api/simulate/', api.simulate_api, name='simulate_api'),
 ]
\ No newline at end of file
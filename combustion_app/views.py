@@ -1,16 +1,38 @@
 # combustion_app/views.py
 import json
 import numpy as np
-import csv 
-import io  
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 
-from .forms import FurnaceRunForm, AnalysisForm, ValidationForm
-from .models import FurnaceRun
-from .furnace_model import run_combustion_model
+from .forms import FurnaceRunForm, AnalysisForm, GridAnalysisForm, ValidationForm, TelemetryForm, CalibrationForm, RunImportForm, RunExportForm, RunFilterForm, UncertaintyForm, SensitivityForm, BlendForm, BlendOptimizationForm, OptimizationForm, ParetoForm
+from .models import FurnaceRun, FuelBlendComponent, ModelCalibration, SimulationJob
+from .furnace_model import VALIDATION_DATA
+from .cache import get_result_cache
+from .sweeps import run_parametric_sweep, run_adaptive_sweep, run_grid_sweep, grid_payload, SAMPLING_ADAPTIVE
+from .ingest import open_text_stream, run_validation_stream, validation_chart_data, CSVColumnsError
+from .telemetry import replay_telemetry, telemetry_chart_data
+from .calibration import (load_calibration_data, fit_model_parameters, calibration_chart_data,
+                          CalibrationError, CALIBRATION_PARAMETERS)
+from .jobs import submit_job, fail_stale_jobs
+from .uncertainty import run_monte_carlo, DEFAULT_BATCH_SIZE
+from .sensitivity import sobol_indices, morris_screening, ranked_factors, SENSITIVITY_FACTORS, SENSITIVITY_OUTPUTS
+from .pool import get_compute_pool
+from .optimize import optimize_excess_air
+from .blends import create_blend, optimize_blend, BlendError
+from .pareto import pareto_front
+from .instrumentation import timed, latency_stats
+from .catalogue import get_fuel_catalogue
+from .runs import import_runs, filter_runs
+from .export import EXPORT_FORMATS
+from .history import history_page, compare_summary, COMPARE_MAX_COLUMNS, MAX_COMPARE_RUNS
+
+# Template rendering and chart JSON are timed per request (see middleware.py)
+render = timed('render')(render)
+json_dumps = timed('serialize')(json.dumps)
+
 
 def simulation_input(request):
     
@@ -20,9 +42,8 @@ def simulation_input(request):
         
         if form.is_valid():
             furnace_run = form.save(commit=False)
-            furnace_run.save() # Save the run *first*
             
-            # Now run the simulation, which saves the results
+            # Run the simulation; this saves the run once, results included
             results = furnace_run.run_and_save_simulation()
             
             if results is None:
@@ -36,7 +57,7 @@ def simulation_input(request):
         else:
             # Form is invalid. We must re-render the page,
             # but we MUST include the history and the invalid form (to show errors).
-            history_runs = FurnaceRun.objects.all().order_by('-run_date')[:10]
+            history_runs, _ = history_page(FurnaceRun.objects.all(), page_size=10)
             context = {
                 'form': form, # Pass the invalid form back
                 'title': 'Furnace Model Input',
@@ -49,7 +70,7 @@ def simulation_input(request):
     # If the request is not POST, it must be GET.
     form = FurnaceRunForm()
     # Fetches the 10 most recent runs
-    history_runs = FurnaceRun.objects.all().order_by('-run_date')[:10]
+    history_runs, _ = history_page(FurnaceRun.objects.all(), page_size=10)
     
     context = {
         'form': form, 
@@ -62,18 +83,20 @@ def simulation_input(request):
 # --- (Rest of your views.py file) ---
 
 def simulation_results(request, run_id):
-    run = get_object_or_404(FurnaceRun, id=run_id)
+    run = get_object_or_404(FurnaceRun.objects.select_related('fuel'), id=run_id)
     
     if not run.fuel:
         messages.error(request, f"Cannot display results for Run ID {run.id}. This run has no associated fuel. Please run a new simulation.")
         return redirect('simulation_input')
         
-    try:
-        results = run_combustion_model(run.fuel, run.moisture_percent, run.excess_air_percent, run.furnace_load_gj_hour)
-        validation_data = results['validation_data']
-    except Exception as e:
-        messages.error(request, f"Error calculating results: {e}")
-        return redirect('simulation_input')
+    # Results are stored on the run; only older runs without them need the model
+    if run.calculated_efficiency is None:
+        try:
+            run.run_and_save_simulation()
+        except Exception as e:
+            messages.error(request, f"Error calculating results: {e}")
+            return redirect('simulation_input')
+    validation_data = VALIDATION_DATA
         
     chart_data = {
         'labels': validation_data['excess_air_points'],
@@ -85,7 +108,7 @@ def simulation_results(request, run_id):
     context = {
         'run': run,
         'title': 'Simulation Results & Validation',
-        'chart_data': json.dumps(chart_data)
+        'chart_data': json_dumps(chart_data)
     }
     return render(request, 'combustion_app/results.html', context)
 
@@ -98,35 +121,23 @@ def analysis_view(request):
         form = AnalysisForm(request.POST)
         if form.is_valid():
             data = form.cleaned_data
-            x_values = np.linspace(data['start_value'], data['end_value'], data['steps'])
+            x_axis_label = dict(form.fields['variable_to_sweep'].choices)[data['variable_to_sweep']]
             
-            results_efficiency = []
-            results_cost = []
-            results_co = []
-            
-            for x_val in x_values:
-                if data['variable_to_sweep'] == 'moisture_percent':
-                    moisture = x_val
-                    excess_air = data['constant_excess_air']
-                else:
-                    moisture = data['constant_moisture']
-                    excess_air = x_val
-                
-                sim_results = run_combustion_model(
-                    data['fuel'], moisture, excess_air, data['constant_load']
-                )
-                
-                results_efficiency.append(sim_results['efficiency'])
-                results_cost.append(sim_results['cost_per_gj'])
-                results_co.append(sim_results['emissions_co_ppm'])
+            if data['run_in_background']:
+                job = submit_job(SimulationJob.KIND_ANALYSIS, dict(data, x_axis_label=x_axis_label))
+                return redirect('job_detail', job_id=job.id)
             
-            chart_data = json.dumps({
-                'labels': list(x_values),
-                'efficiency_data': results_efficiency,
-                'cost_data': results_cost,
-                'co_data': results_co,
-                'x_axis_label': dict(form.fields['variable_to_sweep'].choices)[data['variable_to_sweep']]
-            })
+            sweep_args = (
+                data['fuel'], data['variable_to_sweep'],
+                data['start_value'], data['end_value'], data['steps'],
+                data['constant_moisture'], data['constant_excess_air'], data['constant_load'],
+            )
+            if data['sampling'] == SAMPLING_ADAPTIVE:
+                sweep = run_adaptive_sweep(*sweep_args, x_axis_label=x_axis_label, fidelity=data['fidelity'],
+                                           tolerance=data['tolerance'])
+            else:
+                sweep = run_parametric_sweep(*sweep_args, x_axis_label=x_axis_label, fidelity=data['fidelity'])
+            chart_data = json_dumps(sweep)
 
     context = {
         'title': 'Parametric Analysis',
@@ -136,18 +147,340 @@ def analysis_view(request):
     return render(request, 'combustion_app/analysis.html', context)
 
 
+def grid_analysis_view(request):
+    form = GridAnalysisForm()
+    chart_data = None
+
+    if request.method == 'POST':
+        form = GridAnalysisForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            if data['run_in_background']:
+                job = submit_job(SimulationJob.KIND_GRID_ANALYSIS, data)
+                return redirect('job_detail', job_id=job.id)
+            
+            moisture_values = np.linspace(data['moisture_start'], data['moisture_end'], data['moisture_steps'])
+            excess_air_values = np.linspace(data['excess_air_start'], data['excess_air_end'], data['excess_air_steps'])
+            
+            # Whole mesh in a single vectorized model call
+            grid = run_grid_sweep(data['fuel'], moisture_values, excess_air_values, data['loads'],
+                                  fidelity=data['fidelity'])
+            chart_data = json_dumps(grid_payload(grid))
+
+    context = {
+        'title': 'Grid Analysis',
+        'form': form,
+        'chart_data': chart_data
+    }
+    return render(request, 'combustion_app/grid_analysis.html', context)
+
+
+def cache_stats_view(request):
+    # Hit / miss / eviction counters for sizing the result cache
+    return JsonResponse(get_result_cache().stats())
+
+
+def timing_stats_view(request):
+    # Per-view latency histograms and mean model / db / render time for this process
+    return JsonResponse({'views': latency_stats.snapshot()})
+
+
+# Display names for model outputs
+OUTPUT_LABELS = {
+    'efficiency': 'Efficiency (%)',
+    'cost_per_gj': 'Cost of Energy (₹/GJ)',
+    't_adiabatic_c': 'Adiabatic Temp (°C)',
+    'emissions_co_ppm': 'CO (ppm)',
+    'emissions_nox_ppm': 'NOx (ppm)',
+}
+
+
+def _compute_pool(n_batches):
+    # Only worth handing work to other processes when there is more than one batch
+    workers = getattr(settings, 'COMBUSTION_COMPUTE_WORKERS', 1)
+    if workers <= 1 or n_batches <= 1:
+        return None
+    return get_compute_pool(workers)
+
+
+def uncertainty_view(request):
+    form = UncertaintyForm()
+    chart_data = None
+    summary = None
+    bands = None
+
+    if request.method == 'POST':
+        form = UncertaintyForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            fuel = data['fuel']
+            distribution = data['distribution']
+            
+            uncertainties = {
+                name: (distribution, getattr(fuel, name) * data['composition_spread'] / 100.0)
+                for name in ('C', 'H', 'O', 'Ash')
+            }
+            uncertainties['hhv_mj_kg'] = (distribution, fuel.hhv_mj_kg * data['hhv_spread'] / 100.0)
+            uncertainties['cost_per_tonne'] = (distribution, fuel.cost_per_tonne * data['cost_spread'] / 100.0)
+            uncertainties['moisture_percent'] = (distribution, data['moisture_spread'])
+            uncertainties['excess_air_percent'] = (distribution, data['excess_air_spread'])
+            
+            n_batches = -(-data['n_samples'] // DEFAULT_BATCH_SIZE)
+            summary = run_monte_carlo(
+                fuel, data['moisture'], data['excess_air'], data['load'],
+                uncertainties, data['n_samples'], pool=_compute_pool(n_batches),
+            )
+            chart_data = json_dumps(summary)
+            bands = [
+                {'key': key, 'label': label, 'nominal': summary['nominal'][key], **summary['outputs'][key]}
+                for key, label in OUTPUT_LABELS.items() if key in summary['outputs']
+            ]
+
+    context = {
+        'title': 'Uncertainty Analysis',
+        'form': form,
+        'chart_data': chart_data,
+        'summary': summary,
+        'bands': bands
+    }
+    return render(request, 'combustion_app/uncertainty.html', context)
+
+
+def sensitivity_view(request):
+    form = SensitivityForm()
+    chart_data = None
+    analysis = None
+    rankings = None
+
+    if request.method == 'POST':
+        form = SensitivityForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            fuel = data['fuel']
+
+            ranges = {
+                'moisture_percent': (data['moisture_min'], data['moisture_max']),
+                'excess_air_percent': (data['excess_air_min'], data['excess_air_max']),
+            }
+            for name, spread in (('C', 'composition_spread'), ('H', 'composition_spread'),
+                                 ('O', 'composition_spread'), ('Ash', 'composition_spread'),
+                                 ('hhv_mj_kg', 'hhv_spread'), ('cost_per_tonne', 'cost_spread')):
+                value = getattr(fuel, name)
+                ranges[name] = (value * (1 - data[spread] / 100.0), value * (1 + data[spread] / 100.0))
+            bounds = {name: ranges[name] for name in SENSITIVITY_FACTORS if name in data['factors']}
+
+            # Inputs that are not varied sit in the middle of their range
+            moisture = sum(ranges['moisture_percent']) / 2
+            excess_air = sum(ranges['excess_air_percent']) / 2
+            pool = _compute_pool(-(-data['n_evaluations'] // DEFAULT_BATCH_SIZE))
+            if data['method'] == 'sobol':
+                analysis = sobol_indices(fuel, moisture, excess_air, data['load'], bounds,
+                                         max(data['n_evaluations'] // (len(bounds) + 2), 2), pool=pool)
+                columns = (('ST', 'Total Index (ST)'), ('S1', 'First-Order Index (S1)'))
+            else:
+                analysis = morris_screening(fuel, moisture, excess_air, data['load'], bounds,
+                                            max(data['n_evaluations'] // (len(bounds) + 1), 2), pool=pool)
+                columns = (('mu_star', 'Mean |Effect| (mu*)'), ('sigma', 'Effect Spread (sigma)'))
+
+            rankings = []
+            for key in SENSITIVITY_OUTPUTS:
+                indexes = ranked_factors(analysis, key)
+                values = analysis['outputs'][key]
+                rankings.append({
+                    'key': key,
+                    'label': OUTPUT_LABELS[key],
+                    'columns': [label for _, label in columns],
+                    'factors': [SENSITIVITY_FACTORS[analysis['factors'][i]] for i in indexes],
+                    'rows': [
+                        (SENSITIVITY_FACTORS[analysis['factors'][i]], [values[column][i] for column, _ in columns])
+                        for i in indexes
+                    ],
+                    'primary': [values[columns[0][0]][i] for i in indexes],
+                    'secondary': [values[columns[1][0]][i] for i in indexes],
+                })
+            chart_data = json_dumps([
+                {name: ranking[name] for name in ('key', 'label', 'columns', 'factors', 'primary', 'secondary')}
+                for ranking in rankings
+            ])
+
+    context = {
+        'title': 'Sensitivity Analysis',
+        'form': form,
+        'chart_data': chart_data,
+        'analysis': analysis,
+        'rankings': rankings
+    }
+    return render(request, 'combustion_app/sensitivity.html', context)
+
+
+def optimize_view(request):
+    form = OptimizationForm()
+    optimization = None
+
+    if request.method == 'POST':
+        form = OptimizationForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            # No fuel selected means: optimise every fuel in the library at once
+            fuels = [data['fuel']] if data['fuel'] else sorted(get_fuel_catalogue().all(), key=lambda fuel: fuel.name)
+            
+            optimization = optimize_excess_air(
+                fuels, data['moisture'], data['load'],
+                objective=data['objective'],
+                co_limit_ppm=data['co_limit'],
+                nox_limit_ppm=data['nox_limit'],
+                excess_air_min=data['excess_air_min'],
+                excess_air_max=data['excess_air_max'],
+            )
+
+    context = {
+        'title': 'Excess Air Optimizer',
+        'form': form,
+        'optimization': optimization
+    }
+    return render(request, 'combustion_app/optimize.html', context)
+
+
+def blends_view(request):
+    form = BlendForm()
+
+    if request.method == 'POST':
+        form = BlendForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            fuels, shares = zip(*data['components'])
+            try:
+                blend = create_blend(data['name'], fuels, shares)
+            except BlendError as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, f"Saved blend '{blend.name}'. It can now be selected like any other fuel.")
+                return redirect('blends_view')
+
+    blends = [fuel for fuel in get_fuel_catalogue().all() if fuel.is_blend]
+    components = {}
+    for component in FuelBlendComponent.objects.filter(blend__in=blends).select_related('component'):
+        components.setdefault(component.blend_id, []).append(component)
+
+    context = {
+        'title': 'Fuel Blends',
+        'form': form,
+        'blends': [(blend, components.get(blend.pk, [])) for blend in sorted(blends, key=lambda fuel: fuel.name)],
+    }
+    return render(request, 'combustion_app/blends.html', context)
+
+
+def blend_optimizer_view(request):
+    form = BlendOptimizationForm()
+    optimization = None
+    chart_data = None
+
+    if request.method == 'POST':
+        form = BlendOptimizationForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            fuels = data['fuels']
+            optimization = optimize_blend(
+                fuels, data['moisture'], data['load'],
+                divisions=data['divisions'],
+                co_limit_ppm=data['co_limit'],
+                nox_limit_ppm=data['nox_limit'],
+                excess_air_min=data['excess_air_min'],
+                excess_air_max=data['excess_air_max'],
+            )
+            # Percentages per fuel, and the fields that save a blend from the blends page form
+            for blend in optimization['blends']:
+                blend['recipe'] = [
+                    (fuel.name, f'fraction_{fuel.pk}', round(fraction * 100, 2))
+                    for fuel, fraction in zip(fuels, blend['fractions'])
+                ]
+                blend['name'] = " / ".join(
+                    f"{name} {percent:g}%" for name, _, percent in blend['recipe'] if percent
+                )[:100]
+            chart_data = json_dumps(dict(
+                optimization['cloud'],
+                best=[[blend['cost_per_gj'], blend['emissions_nox_ppm']] for blend in optimization['blends']],
+            ))
+
+    context = {
+        'title': 'Blend Optimizer',
+        'form': form,
+        'optimization': optimization,
+        'chart_data': chart_data
+    }
+    return render(request, 'combustion_app/blend_optimizer.html', context)
+
+
+def pareto_view(request):
+    form = ParetoForm()
+    chart_data = None
+    frontier = None
+
+    if request.method == 'POST':
+        form = ParetoForm(request.POST)
+        if form.is_valid():
+            data = form.cleaned_data
+            frontier = pareto_front(
+                data['fuels'],
+                (data['moisture_start'], data['moisture_end']),
+                (data['excess_air_start'], data['excess_air_end']),
+                data['steps'],
+                data['objectives'],
+            )
+            chart_data = json_dumps(dict(
+                frontier,
+                axis_labels=[OUTPUT_LABELS[name] for name in data['objectives']],
+            ))
+
+    context = {
+        'title': 'Pareto Explorer',
+        'form': form,
+        'chart_data': chart_data,
+        'frontier': frontier
+    }
+    return render(request, 'combustion_app/pareto.html', context)
+
+
+def history_view(request):
+    form = RunFilterForm(request.GET)
+    runs = FurnaceRun.objects.none()
+    if form.is_valid():
+        data = form.cleaned_data
+        runs = filter_runs(data['start_date'], data['end_date'], data['fuel'])
+    page, next_cursor = history_page(runs, request.GET.get('after'))
+
+    # Keep the filters in the "next page" link, but not the old cursor
+    query = request.GET.copy()
+    query.pop('after', None)
+
+    context = {
+        'title': 'Run History',
+        'form': form,
+        'runs': page,
+        'next_cursor': next_cursor,
+        'filter_query': query.urlencode(),
+        'is_first_page': 'after' not in request.GET,
+    }
+    return render(request, 'combustion_app/history.html', context)
+
+
 def compare_view(request):
     run_ids = request.GET.getlist('run_ids')
     
     if not run_ids or len(run_ids) < 2:
         messages.error(request, "You must select at least two runs to compare.")
         return redirect('simulation_input')
+    if len(run_ids) > MAX_COMPARE_RUNS:
+        messages.error(request, f"You can compare at most {MAX_COMPARE_RUNS} runs at once.")
+        return redirect('history_view')
         
-    runs = FurnaceRun.objects.filter(id__in=run_ids).order_by('run_date')
+    runs = FurnaceRun.objects.filter(id__in=run_ids)
     
     context = {
         'title': 'Comparison Results',
-        'runs': runs
+        'summary': compare_summary(runs),
+        # Side-by-side columns only while they still fit on the page
+        'runs': runs.select_related('fuel').order_by('run_date') if len(run_ids) <= COMPARE_MAX_COLUMNS else None,
     }
     return render(request, 'combustion_app/compare_results.html', context)
 
@@ -155,6 +488,7 @@ def compare_view(request):
 def validation_view(request):
     form = ValidationForm()
     chart_data = None
+    summary = None
 
     if request.method == 'POST':
         form = ValidationForm(request.POST, request.FILES)
@@ -162,56 +496,267 @@ def validation_view(request):
             data = form.cleaned_data
             csv_file = data['validation_file']
             
+            if data['run_in_background']:
+                job = submit_job(SimulationJob.KIND_VALIDATION, data, input_file=csv_file)
+                return redirect('job_detail', job_id=job.id)
+            
             try:
-                decoded_file = csv_file.read().decode('utf-8')
-                io_string = io.StringIO(decoded_file)
-                
-                reader = csv.DictReader(io_string)
-                
-                actual_x_data = []
-                actual_y_data = []
-                model_y_data = []
+                # Stream the upload in bounded chunks instead of reading it whole
+                summary = run_validation_stream(
+                    data['fuel'],
+                    data['constant_moisture'],
+                    data['constant_load'],
+                    open_text_stream(csv_file),
+                )
                 
-                X_HEADER = 'excess_air'
-                Y_HEADER = 'measured_efficiency'
-
-                if X_HEADER not in reader.fieldnames or Y_HEADER not in reader.fieldnames:
-                    messages.error(request, f"CSV file must contain columns named '{X_HEADER}' and '{Y_HEADER}'.")
-                    return redirect('validation_view')
-
-                for row in reader:
-                    try:
-                        x_val = float(row[X_HEADER])
-                        y_val_actual = float(row[Y_HEADER])
-                        
-                        sim_results = run_combustion_model(
-                            data['fuel'],
-                            data['constant_moisture'],
-                            x_val,
-                            data['constant_load']
-                        )
-                        
-                        actual_x_data.append(x_val)
-                        actual_y_data.append(y_val_actual)
-                        model_y_data.append(sim_results['efficiency'])
-                        
-                    except (ValueError, TypeError):
-                        pass
+                if summary['bad_rows']:
+                    messages.warning(request, f"Skipped {summary['bad_rows']} row(s) that could not be parsed as numbers.")
                 
-                chart_data = json.dumps({
-                    'labels': actual_x_data,
-                    'model_data': model_y_data,
-                    'actual_data': actual_y_data,
-                    'x_axis_label': X_HEADER,
-                    'y_axis_label': 'Efficiency (%)'
-                })
+                chart_data = json_dumps(validation_chart_data(summary))
 
+            except CSVColumnsError as e:
+                messages.error(request, str(e))
+                return redirect('validation_view')
             except Exception as e:
                 messages.error(request, f"An error occurred processing the file: {e}")
             
     context = {
         'title': 'Model Validation',
         'form': form,
-        'chart_data': chart_data
+        'chart_data': chart_data,
+        'summary': summary
+    }
+    return render(request, 'combustion_app/validation.html', context)
+
+
+def telemetry_view(request):
+    form = TelemetryForm()
+    chart_data = None
+    summary = None
+
+    if request.method == 'POST':
+        form = TelemetryForm(request.POST, request.FILES)
+        if form.is_valid():
+            data = form.cleaned_data
+
+            if data['run_in_background']:
+                job = submit_job(SimulationJob.KIND_TELEMETRY, data, input_file=data['telemetry_file'])
+                return redirect('job_detail', job_id=job.id)
+
+            try:
+                summary = replay_telemetry(
+                    data['fuel'],
+                    open_text_stream(data['telemetry_file']),
+                    data['window_seconds'],
+                    fidelity=data['fidelity'],
+                )
+
+                if summary['bad_rows']:
+                    messages.warning(request, f"Skipped {summary['bad_rows']} row(s) that could not be parsed.")
+                if summary['out_of_order_rows']:
+                    messages.warning(request, f"Skipped {summary['out_of_order_rows']} row(s) whose timestamp "
+                                              f"was not later than the row before.")
+
+                chart_data = json_dumps(telemetry_chart_data(summary))
+
+            except CSVColumnsError as e:
+                messages.error(request, str(e))
+                return redirect('telemetry_view')
+            except Exception as e:
+                messages.error(request, f"An error occurred processing the file: {e}")
+
+    context = {
+        'title': 'Telemetry Replay',
+        'form': form,
+        'chart_data': chart_data,
+        'summary': summary
+    }
+    return render(request, 'combustion_app/telemetry.html', context)
+
+
+def calibration_view(request):
+    form = CalibrationForm()
+    chart_data = None
+    fit = None
+    report = None
+
+    if request.method == 'POST':
+        form = CalibrationForm(request.POST, request.FILES)
+        if form.is_valid():
+            data = form.cleaned_data
+            fuel = data['fuel']
+            try:
+                excess_air, measured, rows, bad_rows = load_calibration_data(open_text_stream(data['calibration_file']))
+                fit = fit_model_parameters(fuel, excess_air, measured, data['constant_moisture'],
+                                           data['constant_load'], data['parameters'])
+
+                calibration = ModelCalibration.objects.create(
+                    fuel=fuel,
+                    name=data['name'],
+                    parameters=fit['parameters'].as_dict(),
+                    fitted=fit['fitted'],
+                    standard_errors=fit['standard_errors'],
+                    rows=rows,
+                    moisture_percent=data['constant_moisture'],
+                    furnace_load_gj_hour=data['constant_load'],
+                    rmse_before=fit['rmse_before'],
+                    rmse_after=fit['rmse_after'],
+                )
+                if data['activate']:
+                    calibration.activate()
+
+                if bad_rows:
+                    messages.warning(request, f"Skipped {bad_rows} row(s) that could not be parsed as numbers.")
+                if rows > fit['rows']:
+                    messages.info(request, f"Fitted a random sample of {fit['rows']} of {rows} rows.")
+                if not fit['identifiable']:
+                    messages.warning(request, "This data cannot separate the chosen parameters; "
+                                              "fit fewer of them for unique values.")
+
+                chart_data = json_dumps(calibration_chart_data(
+                    fuel, fit, excess_air, measured, data['constant_moisture'], data['constant_load']
+                ))
+                start, fitted = fit['start'].as_dict(), fit['parameters'].as_dict()
+                report = [
+                    {
+                        'label': label,
+                        'start': start[name],
+                        'fitted': fitted[name],
+                        'is_fitted': name in fit['fitted'],
+                        'standard_error': fit['standard_errors'].get(name),
+                    }
+                    for name, (label, _, _) in CALIBRATION_PARAMETERS.items()
+                ]
+
+            except (CSVColumnsError, CalibrationError) as e:
+                messages.error(request, str(e))
+                return redirect('calibration_view')
+            except Exception as e:
+                messages.error(request, f"An error occurred processing the file: {e}")
+
+    context = {
+        'title': 'Model Calibration',
+        'form': form,
+        'chart_data': chart_data,
+        'fit': fit,
+        'report': report,
+        'parameter_labels': [label for label, _, _ in CALIBRATION_PARAMETERS.values()],
+        # Latest calibrations with their values in CALIBRATION_PARAMETERS order
+        'calibrations': [
+            (calibration, [calibration.parameters.get(name) for name in CALIBRATION_PARAMETERS])
+            for calibration in ModelCalibration.objects.select_related('fuel')[:20]
+        ],
+    }
+    return render(request, 'combustion_app/calibration.html', context)
+
+
+def calibration_activate_view(request, calibration_id):
+    """POST: active=1 makes a calibration the fuel's active one, active=0 returns the fuel to the defaults."""
+    calibration = get_object_or_404(ModelCalibration.objects.select_related('fuel'), id=calibration_id)
+    if request.method == 'POST':
+        if request.POST.get('active') == '1':
+            calibration.activate()
+            messages.success(request, f"Simulations of {calibration.fuel} now use '{calibration.name}'.")
+        else:
+            calibration.deactivate()
+            messages.success(request, f"Simulations of {calibration.fuel} use the default model parameters.")
+    return redirect('calibration_view')
+
+
+def import_runs_view(request):
+    form = RunImportForm()
+    report = None
+
+    if request.method == 'POST':
+        form = RunImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            data = form.cleaned_data
+            try:
+                # Rows are evaluated and inserted chunk by chunk as the upload streams in
+                report = import_runs(
+                    open_text_stream(data['runs_file']), data['file_format'], default_name=data['default_name']
+                )
+                messages.success(request, f"Imported {report['created']} run(s).")
+                if report['bad_rows']:
+                    messages.warning(request, f"Skipped {report['bad_rows']} row(s) that could not be imported.")
+            except Exception as e:
+                messages.error(request, f"An error occurred processing the file: {e}")
+
+    context = {
+        'title': 'Import / Export Runs',
+        'form': form,
+        'export_form': RunExportForm(),
+        'report': report
+    }
+    return render(request, 'combustion_app/import_runs.html', context)
+
+
+def export_runs_view(request):
+    """Streams the filtered run history; rows are never all in memory at once."""
+    form = RunExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text(), content_type='text/plain')
+
+    data = form.cleaned_data
+    runs = filter_runs(data['start_date'], data['end_date'], data['fuel']).order_by('run_date', 'id')
+    stream, content_type, extension = EXPORT_FORMATS[data['format'] or 'csv']
+
+    response = StreamingHttpResponse(stream(runs), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="furnace_runs.{extension}"'
+    return response
+
+
+# --- Background Jobs ---
+
+# Page used to show a finished job's result, per job kind
+JOB_RESULT_PAGES = {
+    SimulationJob.KIND_ANALYSIS: ('combustion_app/analysis.html', AnalysisForm, 'Parametric Analysis'),
+    SimulationJob.KIND_GRID_ANALYSIS: ('combustion_app/grid_analysis.html', GridAnalysisForm, 'Grid Analysis'),
+    SimulationJob.KIND_VALIDATION: ('combustion_app/validation.html', ValidationForm, 'Model Validation'),
+    SimulationJob.KIND_TELEMETRY: ('combustion_app/telemetry.html', TelemetryForm, 'Telemetry Replay'),
+}
+
+
+def job_detail_view(request, job_id):
+    job = get_object_or_404(SimulationJob, id=job_id)
+    
+    if job.status == SimulationJob.STATUS_SUCCEEDED:
+        # Render the result on the same page the job was submitted from
+        template_name, form_class, title = JOB_RESULT_PAGES[job.kind]
+        context = {
+            'title': title,
+            'form': form_class(),
+            'chart_data': json_dumps(job.result['chart_data']),
+            'summary': job.result.get('summary'),
+            'job': job,
+        }
+        return render(request, template_name, context)
+    
+    context = {
+        'title': 'Simulation Job',
+        'job': job,
     }
-    return render(request, 'combustion_app/validation.html', context)
\ No newline at end of file
+    return render(request, 'combustion_app/job_detail.html', context)
+
+
+def job_status_view(request, job_id):
+    # Polling pages end even when no worker is left to notice a dead job
+    fail_stale_jobs()
+    job = get_object_or_404(SimulationJob, id=job_id)
+    return JsonResponse({
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error.split('\n', 1)[0] if job.error else None,
+        'created_at': job.created_at.isoformat(),
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    })
+
+
+def job_result_view(request, job_id):
+    job = get_object_or_404(SimulationJob, id=job_id)
+    if job.status != SimulationJob.STATUS_SUCCEEDED:
+        return JsonResponse({'status': job.status, 'error': 'Job has not finished successfully.'}, status=409)
+    return JsonResponse(job.result)
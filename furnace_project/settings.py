@@ -41,6 +41,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'combustion_app.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -118,6 +119,75 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (validation CSVs queued for background jobs)
+
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Combustion model result cache (combustion_app/cache.py)
+# Set 'ALIAS' to the name of an entry in CACHES to share results between processes.
+# The local cache is bounded by entries and by MAX_POINTS stored points (~72 bytes each).
+
+COMBUSTION_RESULT_CACHE = {
+    'MAX_ENTRIES': 4096,
+    'MAX_POINTS': 1000000,
+    'ALIAS': None,
+    'TIMEOUT': None,
+}
+
+# In-process fuel catalogue used by forms and model calls (combustion_app/catalogue.py).
+# Saves in this process refresh it at once; set 'ALIAS' to a shared cache so other
+# processes do too, otherwise they reload after MAX_AGE seconds.
+
+COMBUSTION_FUEL_CATALOGUE = {
+    'MAX_AGE': 300,
+    'ALIAS': None,
+}
+
+# Background jobs (combustion_app/jobs.py): a running job with no heartbeat (claim or
+# progress write) for STALE_AFTER seconds is marked failed (its worker is assumed to have died).
+
+COMBUSTION_JOBS = {
+    'STALE_AFTER': 3600,
+}
+
+# Worker processes for CPU-heavy model batches (Monte Carlo, sensitivity, streamed sweeps).
+# 1 keeps work in-process; deployments with spare cores can opt in, e.g. os.cpu_count().
+
+COMBUSTION_COMPUTE_WORKERS = 1
+
+# Surrogate lookup tables for real-time scoring (combustion_app/surrogate.py): one
+# memory-mapped file per fuel in DIR, built on first use or with `manage.py build_surrogates`.
+# AXES override the grid, as {input: (start, stop, points)}; RTOL is the largest interpolation
+# error a covered cell may have, relative to its values (other points are evaluated exactly).
+
+COMBUSTION_SURROGATE = {
+    'DIR': BASE_DIR / 'surrogates',
+    'AXES': {},
+    'RTOL': 1e-3,
+}
+
+# Request instrumentation (combustion_app/middleware.py): Server-Timing headers,
+# JSON timing logs and per-view latency histograms at /stats/timing/
+
+COMBUSTION_INSTRUMENTATION = {
+    'ENABLED': True,
+    'SERVER_TIMING_HEADER': True,
+    'SLOW_REQUEST_MS': 1000,
+}
+
+# Timing logs: slow requests at WARNING; lower the level to INFO to log every request
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'combustion_app.timing': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 